@@ -9,8 +9,10 @@ def create_api_blueprint() -> Blueprint:
     # Register subroutes
     from .meta import register_meta_routes
     from .jobs import register_job_routes
+    from .batches import register_batch_routes
 
     register_meta_routes(bp)
     register_job_routes(bp)
+    register_batch_routes(bp)
 
     return bp
@@ -0,0 +1,142 @@
+# backend/api/batches.py
+from __future__ import annotations
+
+import json
+import zipfile
+from typing import Any, Dict, List
+
+from flask import Response, current_app, jsonify, request, stream_with_context, url_for
+from werkzeug.utils import secure_filename
+
+from .errors import ApiError, api_error
+from .etag import conditional_json
+from .jobs import _dispatch, _fallback_presets
+from .schemas import coerce_and_clamp_params, validate_filename_ext
+
+
+def register_batch_routes(bp):
+    # -------------------------------------------------------------------------
+    # POST /api/batches → many parts (files and/or ZIPs), one preset, one pool
+    # -------------------------------------------------------------------------
+    @bp.post("/batches")
+    def create_batch():
+        from backend.services import batches  # type: ignore
+        from backend.services.storage import delete_job, new_job, save_upload, set_status, write_params  # type: ignore
+
+        uploads = [f for f in request.files.getlist("files") + request.files.getlist("file") if f and f.filename]
+        if not uploads:
+            return api_error(400, "Missing file field 'files'")
+
+        allowed = {e.lower().lstrip(".") for e in current_app.config.get("ALLOWED_EXTENSIONS", {"stl"})}
+        max_parts = int(current_app.config.get("MAX_BATCH_PARTS", 50))
+        max_unzipped = int(float(current_app.config.get("BATCH_MAX_UNZIPPED_MB", 2048)) * 1024 * 1024)
+
+        raw_params: Dict[str, Any] = {}
+        if "params" in request.form and request.form["params"].strip():
+            try:
+                raw_params = json.loads(request.form["params"])
+            except Exception:
+                return api_error(400, "Invalid JSON in 'params'")
+        preset_name = request.form.get("preset") or None
+        try:
+            try:
+                from backend.desolidify_engine.presets import PRESETS_DEFAULT  # type: ignore
+            except Exception:
+                PRESETS_DEFAULT = _fallback_presets()
+            params = coerce_and_clamp_params(raw_params, preset_name=preset_name, presets=PRESETS_DEFAULT)
+        except Exception as e:
+            return api_error(400, f"Invalid parameters: {e}")
+
+        # Validate names before anything touches the disk
+        for f in uploads:
+            name = secure_filename(f.filename)
+            if not (name.lower().endswith(".zip") or validate_filename_ext(name, allowed)):
+                return api_error(400, f"Unsupported file extension: {name}")
+        if sum(1 for f in uploads if not f.filename.lower().endswith(".zip")) > max_parts:
+            return api_error(400, f"Too many parts (max {max_parts})")
+
+        def expand():
+            for f in uploads:
+                if f.filename.lower().endswith(".zip"):
+                    yield from batches.iter_zip_parts(f, allowed=allowed, max_parts=max_parts, max_bytes=max_unzipped)
+                else:
+                    yield f
+
+        # Store every part first so a bad archive leaves nothing queued
+        staged: List[Dict[str, Any]] = []
+        taken: set = set()
+        try:
+            for part in expand():
+                if len(staged) >= max_parts:
+                    raise ValueError(f"Too many parts (max {max_parts})")
+                name = batches.unique_name(secure_filename(part.filename) or "part.stl", taken)
+                job_id = new_job()
+                staged.append({"name": name, "job_id": job_id})
+                save_upload(job_id, part, filename_hint=name)
+                write_params(job_id, params)
+        except Exception as e:
+            # Staged parts sit in "created", which the janitor never evicts: remove them here
+            for p in staged:
+                delete_job(p["job_id"])
+            if isinstance(e, zipfile.BadZipFile):
+                return api_error(400, f"Not a valid ZIP archive: {e}")
+            if isinstance(e, ValueError):
+                return api_error(400, str(e))
+            current_app.logger.exception("create_batch failed while storing parts")
+            return api_error(500, f"Failed to store upload: {e}")
+
+        # The manifest goes first so every part stays reachable through the batch
+        batch_id = batches.new_batch(params, staged)
+        parts: List[Dict[str, Any]] = []
+        for p in staged:
+            try:
+                job_id, _, extra = _dispatch(p["job_id"], params)
+            except ApiError as e:
+                # Other parts may already be queued; this one fails on its own
+                set_status(p["job_id"], state="error", progress=0.0, message=e.message)
+                job_id, extra = p["job_id"], {"error": e.message}
+            parts.append({"name": p["name"], "job_id": job_id, **extra})
+        batches.update_batch_parts(batch_id, parts)
+
+        current_app.logger.info("create_batch batch=%s parts=%d", batch_id, len(parts))
+        return jsonify({
+            "batch_id": batch_id,
+            "status_url": url_for("api.get_batch", batch_id=batch_id, _external=True),
+            "result_url": url_for("api.get_batch_result", batch_id=batch_id, _external=True),
+            "parts": parts,
+        }), 202
+
+    # -------------------------------------------------------------------------
+    # GET /api/batches/<id> → aggregate + per-part status
+    # -------------------------------------------------------------------------
+    @bp.get("/batches/<batch_id>")
+    def get_batch(batch_id: str):
+        from backend.services import batches  # type: ignore
+
+        manifest = batches.read_batch(batch_id)
+        if not manifest:
+            return api_error(404, "Batch not found")
+        return conditional_json(batches.batch_status(manifest))
+
+    # -------------------------------------------------------------------------
+    # GET /api/batches/<id>/result → ZIP streamed as parts finish
+    # -------------------------------------------------------------------------
+    @bp.get("/batches/<batch_id>/result")
+    def get_batch_result(batch_id: str):
+        from backend.services import batches  # type: ignore
+
+        manifest = batches.read_batch(batch_id)
+        if not manifest:
+            return api_error(404, "Batch not found")
+        wait = request.args.get("wait", "1").lower() not in {"0", "false", "no"}
+        stream = batches.stream_results_zip(
+            manifest,
+            wait=wait,
+            timeout_s=float(current_app.config.get("BATCH_RESULT_TIMEOUT_S", 3600)),
+        )
+        return Response(
+            stream_with_context(stream),
+            mimetype="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{batch_id}_desolid.zip"'},
+        )
+
@@ -0,0 +1,27 @@
+# backend/api/etag.py
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from flask import jsonify, request
+
+
+def json_etag(obj: Any) -> str:
+    """
+    Stable entity tag for a JSON-serializable payload (key order independent).
+    """
+    blob = json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:20]
+
+
+def conditional_json(obj: Any, etag: str | None = None):
+    """
+    jsonify ``obj`` with a strong ETag and honor ``If-None-Match`` (→ 304).
+    Clients must revalidate (no-cache) but can skip the body when unchanged.
+    """
+    resp = jsonify(obj)
+    resp.set_etag(etag or json_etag(obj))
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp.make_conditional(request)
@@ -2,15 +2,21 @@
 from __future__ import annotations
 
 import json
+import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 from flask import current_app, request, jsonify, send_file, url_for
 from werkzeug.utils import secure_filename
 
 from .errors import api_error
+from .etag import conditional_json, json_etag
 from .schemas import coerce_and_clamp_params, validate_filename_ext
 
+# Long-poll: how often status.json is re-read while a client waits
+_LONGPOLL_INTERVAL_S = 0.25
+_TERMINAL_STATES = {"finished", "error"}
+
 
 def register_job_routes(bp):
     # -------------------------------------------------------------------------
@@ -40,22 +46,16 @@ def register_job_routes(bp):
 
         preset_name = request.form.get("preset") or None
 
+        # Opt-in profiling ({"profile": true} in params); ignored unless enabled
+        profile = False
+        if (isinstance(raw_params, dict) and raw_params.get("profile") is True) or request.form.get("profile", "").lower() in {"1", "true"}:
+            from backend.services.profiler import enabled as profiling_enabled  # type: ignore
+            profile = profiling_enabled()
+
         current_app.logger.info(
             "create_job filename=%s preset=%s params=%s", filename, preset_name, raw_params
         )
 
-        # Enforce simple concurrency limit
-        max_jobs = int(current_app.config.get("MAX_CONCURRENT_JOBS", 1))
-        try:
-            from backend.services.storage import list_statuses  # type: ignore
-            running = sum(
-                1 for _, st in list_statuses() if st.get("state") in {"queued", "running"}
-            )
-            if running >= max_jobs:
-                return api_error(429, "Too many concurrent jobs. Please wait for the current job to finish.")
-        except Exception:
-            current_app.logger.exception("Failed to check concurrent jobs")
-
         # Create a new job folder & save artifacts via storage service
         try:
             # Lazy import to avoid hard dependency before services are scaffolded
@@ -63,7 +63,6 @@ def register_job_routes(bp):
                 new_job,
                 save_upload,
                 write_params,
-                set_status,
             )  # type: ignore
         except Exception:
             current_app.logger.exception("Storage service not ready")
@@ -89,32 +88,8 @@ def register_job_routes(bp):
             current_app.logger.exception("Invalid parameters for job %s", job_id)
             return api_error(400, f"Invalid parameters: {e}")
 
-        # Queue the work
-        try:
-            from backend.services.queue import submit_perforate  # type: ignore
-        except Exception:
-            current_app.logger.exception("Queue service not ready")
-            # Mark as queued but not actually submitted (scaffold phase)
-            set_status(job_id, state="queued", progress=0.0, message="Queue not available yet.")
-            task_id = None
-        else:
-            try:
-                task_id = submit_perforate(job_id, params)
-            except Exception as e:
-                current_app.logger.exception("submit_perforate failed for job %s", job_id)
-                return api_error(500, f"Failed to queue job: {e}")
-
-        set_status(job_id, state="queued", progress=0.0, message="Job enqueued.")
-
-        return jsonify(
-            {
-                "job_id": job_id,
-                "task_id": task_id,
-                "status_url": url_for("api.get_job", job_id=job_id, _external=True),
-                "result_url": url_for("api.get_job_result", job_id=job_id, _external=True),
-                "ws_room": f"job:{job_id}",
-            }
-        ), 202
+        job_id, task_id, extra = _dispatch(job_id, params, profile=profile)
+        return _job_response(job_id, task_id, **extra)
 
     # -------------------------------------------------------------------------
     # GET /api/jobs/<id> → status
@@ -130,7 +105,25 @@ def register_job_routes(bp):
         if not status:
             return api_error(404, "Job not found")
 
-        return jsonify({"job_id": job_id, **status})
+        payload = {"job_id": job_id, **status}
+        etag = json_etag(payload)
+
+        # Optional long-poll: ?wait=<seconds> blocks until the status changes
+        # (relative to the client's If-None-Match, else to the current status).
+        wait = request.args.get("wait", type=float)
+        if wait and wait > 0:
+            max_wait = float(current_app.config.get("STATUS_LONGPOLL_MAX_S", 30))
+            known = set(request.if_none_match.as_set()) or {etag}
+            deadline = time.monotonic() + min(wait, max_wait)
+            while etag in known and status.get("state") not in _TERMINAL_STATES:
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(_LONGPOLL_INTERVAL_S)
+                status = get_status(job_id) or status
+                payload = {"job_id": job_id, **status}
+                etag = json_etag(payload)
+
+        return conditional_json(payload, etag)
 
     # -------------------------------------------------------------------------
     # GET /api/jobs/<id>/result → output STL
@@ -148,7 +141,103 @@ def register_job_routes(bp):
                 st = {}
             return jsonify({"job_id": job_id, "ready": False, **st}), 202
 
-        return send_file(out_path, mimetype="model/stl", as_attachment=True, download_name=f"{job_id}_desolid.stl")
+        try:
+            from backend.services.storage import read_result_info, RESULT_GZIP_NAME  # type: ignore
+            info = read_result_info(job_id) or {}
+        except Exception:
+            info = {}
+        sha = info.get("sha256")
+        gz_path = out_path.with_name(RESULT_GZIP_NAME) if info else None
+
+        # Serve the precompressed sibling when the client accepts gzip. Range
+        # requests then address the encoded bytes (resumable either way).
+        use_gzip = bool(
+            sha and info.get("gzip_size") and gz_path is not None and gz_path.exists()
+            and request.accept_encodings.quality("gzip") > 0
+        )
+        resp = send_file(
+            gz_path if use_gzip else out_path,
+            mimetype="model/stl",
+            as_attachment=True,
+            download_name=f"{job_id}_desolid.stl",
+            conditional=True,
+            etag=(f"{sha}.gz" if use_gzip else sha) if sha else True,
+        )
+        if use_gzip:
+            resp.headers["Content-Encoding"] = "gzip"
+        resp.vary.add("Accept-Encoding")
+        try:
+            from backend.services.storage import touch_download  # type: ignore
+            touch_download(job_id)
+        except Exception:
+            pass
+        return resp
+
+    # -------------------------------------------------------------------------
+    # GET /api/jobs/<id>/thumbnail → cached PNG (rendered when the job finished)
+    # -------------------------------------------------------------------------
+    @bp.get("/jobs/<job_id>/thumbnail")
+    def get_job_thumbnail(job_id: str):
+        from backend.services.storage import (  # type: ignore
+            THUMBNAIL_NAME, get_status, has_result, job_dir, write_thumbnail,
+        )
+
+        png_path = job_dir(job_id) / THUMBNAIL_NAME
+        if not png_path.exists():
+            if not has_result(job_id):
+                st = get_status(job_id)
+                if not st:
+                    return api_error(404, "Job not found")
+                return jsonify({"job_id": job_id, "ready": False, **st}), 202
+            # Jobs finished before thumbnails existed (or while rendering was
+            # unavailable): render once now and keep it.
+            try:
+                from backend.services import previewer  # type: ignore
+                out_path = job_dir(job_id) / "output.stl"
+                try:
+                    write_thumbnail(job_id, previewer.stl_to_png_bytes(out_path.read_bytes(),
+                                                                       size=previewer.thumbnail_size()))
+                finally:
+                    # Request threads are not reused like the worker pool's: free the GL context
+                    previewer.release_renderers()
+            except Exception as e:
+                current_app.logger.exception("Thumbnail render failed for job %s", job_id)
+                return api_error(501, f"Thumbnail not available: {e}")
+
+        return send_file(png_path, mimetype="image/png", conditional=True, max_age=3600)
+
+    # -------------------------------------------------------------------------
+    # GET /api/jobs/<id>/metrics → per-stage timings (metrics.json)
+    # -------------------------------------------------------------------------
+    @bp.get("/jobs/<job_id>/metrics")
+    def get_job_metrics(job_id: str):
+        from backend.services.storage import get_status, read_metrics  # type: ignore
+
+        m = read_metrics(job_id)
+        if m is None:
+            st = get_status(job_id)
+            if not st:
+                return api_error(404, "Job not found")
+            return jsonify({"job_id": job_id, "ready": False, **st}), 202
+        return conditional_json({"job_id": job_id, **m})
+
+    # -------------------------------------------------------------------------
+    # GET /api/jobs/<id>/profile → collapsed stacks from a profiled run
+    # -------------------------------------------------------------------------
+    @bp.get("/jobs/<job_id>/profile")
+    def get_job_profile(job_id: str):
+        from backend.services.storage import PROFILE_NAME, get_status, job_dir  # type: ignore
+
+        path = job_dir(job_id) / PROFILE_NAME
+        if not path.exists():
+            st = get_status(job_id)
+            if not st:
+                return api_error(404, "Job not found")
+            if st.get("state") not in _TERMINAL_STATES:
+                return jsonify({"job_id": job_id, "ready": False, **st}), 202
+            return api_error(404, "No profile recorded for this job")
+        return send_file(path, mimetype="text/plain", as_attachment=True,
+                         download_name=f"{job_id}.folded", conditional=True)
 
     # -------------------------------------------------------------------------
     # DELETE /api/jobs → remove all job folders
@@ -157,7 +246,9 @@ def register_job_routes(bp):
     def delete_jobs():
         try:
             from backend.services.storage import purge_all_jobs  # type: ignore
+            from backend.services.batches import purge_all_batches  # type: ignore
             deleted = purge_all_jobs()
+            purge_all_batches()
         except Exception:
             current_app.logger.exception("Failed to purge jobs")
             return api_error(500, "Failed to purge jobs")
@@ -218,11 +309,114 @@ def register_job_routes(bp):
             current_app.logger.exception("Preview failed")
             return api_error(500, f"Preview failed: {e}")
 
+    # -------------------------------------------------------------------------
+    # POST /api/estimate → grid size, peak memory and runtime (engine not run)
+    # -------------------------------------------------------------------------
+    @bp.post("/estimate")
+    def estimate_job():
+        if "file" not in request.files:
+            return api_error(400, "Missing file field 'file'")
+        f = request.files["file"]
+        if not f or f.filename == "":
+            return api_error(400, "Empty filename")
+        filename = secure_filename(f.filename)
+        if not validate_filename_ext(filename, current_app.config.get("ALLOWED_EXTENSIONS", {"stl"})):
+            return api_error(400, "Unsupported file extension")
+
+        raw_params: Dict[str, Any] = {}
+        if "params" in request.form and request.form["params"].strip():
+            try:
+                raw_params = json.loads(request.form["params"])
+            except Exception:
+                return api_error(400, "Invalid JSON in 'params'")
+        try:
+            try:
+                from backend.desolidify_engine.presets import PRESETS_DEFAULT  # type: ignore
+            except Exception:
+                PRESETS_DEFAULT = _fallback_presets()
+            params = coerce_and_clamp_params(raw_params, preset_name=request.form.get("preset") or None,
+                                             presets=PRESETS_DEFAULT)
+        except Exception as e:
+            return api_error(400, f"Invalid parameters: {e}")
+
+        from backend.desolidify_engine.settings import from_params  # type: ignore
+        from backend.services import costmodel, estimate  # type: ignore
+
+        try:
+            summary = estimate.summarize_mesh(f.read(), file_type=filename.rsplit(".", 1)[-1])
+        except Exception as e:
+            return api_error(400, f"Could not read mesh: {e}")
+        result = estimate.estimate(summary, from_params(params), model=costmodel.load_model())
+        return jsonify({"params": params, **result})
+
 
 # -----------------------------------------------------------------------------
 # Local helpers
 # -----------------------------------------------------------------------------
 
+def _dispatch(job_id: str, params: Dict[str, Any], *,
+              profile: bool = False) -> Tuple[str, str | None, Dict[str, Any]]:
+    """
+    Start a job whose upload and params are on disk: answer from the result
+    cache, attach to an identical running job, or queue it.
+    Returns (effective job id, task id, extra response fields).
+    """
+    from backend.services.storage import delete_job, read_upload, set_status  # type: ignore
+
+    # Result cache: finished hit → done immediately; identical running job → attach
+    cache_key = None
+    try:
+        from backend.services import cache  # type: ignore
+        # A profiled run must actually execute, so it skips the cache
+        if cache.enabled() and not profile:
+            cache_key = cache.cache_key((read_upload(job_id) or {})["sha256"], params)
+            if cache.materialize(cache_key, job_id):
+                set_status(job_id, state="finished", progress=1.0, message="Completed (cached result)")
+                current_app.logger.info("create_job cache hit job=%s key=%s", job_id, cache_key)
+                return job_id, None, {"cached": True}
+            leader = cache.claim(cache_key, job_id)
+            if leader:
+                delete_job(job_id)
+                current_app.logger.info("create_job attached to running job=%s key=%s", leader, cache_key)
+                return leader, None, {"coalesced": True}
+    except Exception:
+        current_app.logger.exception("Result cache lookup failed for job %s", job_id)
+        cache_key = None
+
+    # Queue the work
+    try:
+        from backend.services.queue import submit_perforate  # type: ignore
+    except Exception:
+        current_app.logger.exception("Queue service not ready")
+        # Mark as queued but not actually submitted (scaffold phase)
+        set_status(job_id, state="queued", progress=0.0, message="Queue not available yet.")
+        task_id = None
+    else:
+        try:
+            task_id = submit_perforate(job_id, params, cache_key=cache_key, profile=profile)
+        except Exception as e:
+            current_app.logger.exception("submit_perforate failed for job %s", job_id)
+            if cache_key:
+                cache.release(job_id)
+            return api_error(500, f"Failed to queue job: {e}")
+
+    set_status(job_id, state="queued", progress=0.0, message="Job enqueued.")
+    return job_id, task_id, ({"profile": True} if profile else {})
+
+
+def _job_response(job_id: str, task_id: str | None, **extra: Any):
+    return jsonify(
+        {
+            "job_id": job_id,
+            "task_id": task_id,
+            "status_url": url_for("api.get_job", job_id=job_id, _external=True),
+            "result_url": url_for("api.get_job_result", job_id=job_id, _external=True),
+            "ws_room": f"job:{job_id}",
+            **extra,
+        }
+    ), 202
+
+
 def _fallback_presets() -> Dict[str, Dict[str, Any]]:
     # Mirrors CLI 1.2.5 defaults (subset sufficient for UI boot)
     return {
@@ -1,10 +1,19 @@
 # backend/api/meta.py
 from __future__ import annotations
 
-from flask import jsonify
-
+from .etag import conditional_json, json_etag
 from .schemas import PARAM_SPECS
 
+# Presets/specs are static per process; hash them once.
+_ETAGS: dict = {}
+
+
+def _cached_etag(name: str, obj) -> str:
+    tag = _ETAGS.get(name)
+    if tag is None:
+        tag = _ETAGS[name] = json_etag(obj)
+    return tag
+
 
 def register_meta_routes(bp):
     @bp.get("/meta/presets")
@@ -15,11 +24,18 @@ def register_meta_routes(bp):
             presets = PRESETS_DEFAULT
         except Exception:
             presets = _fallback_presets()
-        return jsonify(presets)
+        return conditional_json(presets, _cached_etag("presets", presets))
 
     @bp.get("/meta/params")
     def get_params():
-        return jsonify(PARAM_SPECS)
+        return conditional_json(PARAM_SPECS, _cached_etag("params", PARAM_SPECS))
+
+    @bp.get("/metrics")
+    def get_metrics():
+        # Prometheus scrape target: stage/job histograms and queue gauges
+        from flask import Response
+        from backend.services import metrics  # type: ignore
+        return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
 
 def _fallback_presets():
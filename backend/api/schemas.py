@@ -31,6 +31,11 @@ PARAM_SPECS: Dict[str, Dict[str, Any]] = {
                     "default": None, "tip": "Target open area πr²/s². Adjusts spacing unless both spacing & radius are fixed."},
     "fast":        {"type": "integer", "min": 0,    "max": 2,     "default": 1,
                     "tip": "Preview accelerator (0=off, 1≈0.9mm voxel, 2≈1.2mm voxel)."},
+    "sdf_backend": {"type": "select",  "choices": ["mesh", "section"], "default": "mesh",
+                    "tip": "Distance field source. 'section' uses 2D cross-sections (much faster for vertical-walled parts; "
+                           "slices near flat or steep-overhang faces still use 3D queries)."},
+    "volume_dtype":{"type": "select",  "choices": ["float32", "float16", "int8"], "default": "float32",
+                    "tip": "Volume storage. float16/int8 keep a truncated SDF (2×/4× less memory) for fine voxels on large parts."},
     # memory/safety
     "chunk":       {"type": "integer", "min": 100_000, "max": 2_500_000, "step": 50_000,
                     "default": 1_500_000, "tip": "Max points per signed-distance batch."},
@@ -50,7 +55,7 @@ _NUMERIC_KEYS = {
 }
 _INT_KEYS = {"fast", "chunk", "mem_tries"}
 _BOOL_KEYS = {"stagger"}
-_SELECT_KEYS = {"orientations", "grid_align"}
+_SELECT_KEYS = {"orientations", "grid_align", "sdf_backend", "volume_dtype"}
 
 
 def _default_for(key: str):
@@ -3,9 +3,13 @@ from __future__ import annotations
 
 import os
 import logging
+import time
 from pathlib import Path
 from typing import Optional
 
+# Startup clock: covers importing the web stack below and create_app()
+_IMPORT_T0 = time.perf_counter()
+
 from flask import Flask, jsonify, send_from_directory, Blueprint
 from flask_cors import CORS
 from flask_socketio import SocketIO
@@ -22,6 +26,7 @@ def create_app(config_object: str | None = None) -> Flask:
     Flask application factory.
     Loads configuration, registers blueprints, static routes, and Socket.IO.
     """
+    t0 = time.perf_counter()
     app = Flask(
         __name__,
         static_folder=None,  # We wire frontend public manually
@@ -84,12 +89,31 @@ def create_app(config_object: str | None = None) -> Flask:
                 "jobs_root": str(jobs_root),
                 "env": app.config.get("ENV_NAME", "development"),
                 "version": app.config.get("APP_VERSION", "0.1.0"),
+                "startup": app.config["STARTUP_TIMINGS"],
+                "warmup": warmup_status(),
             }
         )
 
     # CLI utilities (optional)
     _register_cli(app)
 
+    # Background disk janitor (age + size quota)
+    from backend.services import janitor
+    janitor.start(app)
+
+    # Heavy engine imports stay out of the web path; optionally pay them (and a
+    # tiny perforation) on the compute pool now instead of in the first job
+    from backend.desolidify_engine.warmup import warmup_status
+    if app.config.get("WARMUP_ON_START"):
+        from backend.services.queue import prewarm
+        with app.app_context():
+            prewarm()
+
+    now = time.perf_counter()
+    app.config["STARTUP_TIMINGS"] = {
+        "import_s": round(t0 - _IMPORT_T0, 4),
+        "create_app_s": round(now - t0, 4),
+    }
     return app
 
 
@@ -165,23 +189,164 @@ def _register_cli(app: Flask) -> None:
     import click
     @app.cli.command("purge-jobs")
     @click.option("--hours", default=app.config.get("JOB_RETENTION_HOURS", 6), help="Delete jobs older than N hours")
-    def purge_jobs(hours: int):
+    @click.option("--max-mb", type=float, default=None,
+                  help="Also evict finished jobs, least-recently-downloaded first, until job folders fit N MB")
+    def purge_jobs(hours: int, max_mb):
         """Delete old job folders."""
         try:
             from backend.services.storage import purge_old_jobs  # type: ignore
+            from backend.services.batches import purge_old_batches  # type: ignore
             deleted = purge_old_jobs(hours=hours)
+            purge_old_batches(hours=hours)
             click.echo(f"Deleted {deleted} old job(s).")
+            if max_mb:
+                from backend.services.janitor import sweep  # type: ignore
+                report = sweep(max_age_hours=0, max_bytes=int(max_mb * 1024 * 1024))
+                click.echo(f"Evicted {report['size']['jobs']} job(s) for size, "
+                           f"{report['size']['bytes'] / (1024 * 1024):.1f} MB reclaimed.")
         except Exception as e:
             click.echo(f"purge-jobs failed: {e}")
 
+    @app.cli.command("calibrate-model")
+    @click.option("--output", "-o", type=click.Path(dir_okay=False), help="Model path (default JOBS_ROOT/.memory_model.json)")
+    @click.option("--memory-limit-mb", type=float, help="Container memory limit to size MAX_WORKERS for")
+    def calibrate_model(output, memory_limit_mb):
+        """Fit the peak-memory and runtime models and progress phase weights from finished jobs' metrics.json."""
+        import json
+
+        from backend.services import costmodel  # type: ignore
+        from backend.services.memwatch import current_rss_bytes  # type: ignore
+
+        samples = costmodel.collect_samples()
+        try:
+            model = costmodel.fit(samples)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        try:
+            model["runtime"] = costmodel.fit_runtime(costmodel.collect_runtime_samples())
+        except ValueError as e:
+            click.echo(f"Runtime model skipped: {e}", err=True)
+        try:
+            model["phase_weights"] = costmodel.fit_phase_weights(costmodel.collect_phase_shares())
+        except ValueError as e:
+            click.echo(f"Phase weights skipped: {e}", err=True)
+        path = costmodel.save_model(model, output)
+        click.echo(json.dumps(model, indent=2))
+        click.echo(f"Model written to {path}")
+        if memory_limit_mb:
+            baseline_mb = current_rss_bytes() / (1024 * 1024)
+            workers = costmodel.suggest_workers(model, memory_limit_mb, baseline_mb)
+            click.echo(f"Suggested MAX_WORKERS for {memory_limit_mb:g} MB: {workers} "
+                       f"(p95 job peak {model['observed_peak_mb']['p95']} MB over a {baseline_mb:.0f} MB baseline)")
+
+    @app.cli.command("desolidify-bench")
+    @click.option("--mesh", "meshes", multiple=True, help="cylinder | planter | thin_shell | multi_body (repeatable; default all)")
+    @click.option("--size", "sizes", multiple=True, help="small | medium | large (repeatable; default small)")
+    @click.option("--orientation", "orientations", multiple=True, help="Engine orientations (repeatable; default z, xyz, radial)")
+    @click.option("--voxel", "voxels", multiple=True, type=float, help="Voxel size in mm (repeatable; default 1.2)")
+    @click.option("--repeat", default=1, show_default=True, help="Runs per case; the fastest is reported")
+    @click.option("--isolate/--no-isolate", default=True, show_default=True, help="Fresh process per case (per-case peak RSS)")
+    @click.option("--output", "-o", type=click.Path(dir_okay=False), help="Write the JSON report here instead of stdout")
+    @click.option("--compare", "baseline", type=click.Path(exists=True, dir_okay=False), help="Baseline report to compare against")
+    @click.option("--threshold", default=1.25, show_default=True, help="Ratio above which a case counts as a regression")
+    @click.option("--kernels", "kernels_only", is_flag=True, help="Only time per-slice hole kernels (NumPy vs numba)")
+    def desolidify_bench(meshes, sizes, orientations, voxels, repeat, isolate, output, baseline, threshold, kernels_only):
+        """Benchmark the engine on deterministic synthetic meshes."""
+        import json
+        import sys
+
+        from backend.desolidify_engine import bench  # type: ignore
+
+        if kernels_only:
+            click.echo(json.dumps([bench.bench_slice_kernels(n, repeat=max(repeat, 20)) for n in (256, 512, 1024)], indent=2))
+            return
+
+        cases = bench.build_cases(
+            meshes or list(bench.GENERATORS),
+            sizes or ["small"],
+            orientations or ["z", "xyz", "radial"],
+            voxels or [1.2],
+        )
+        report = bench.run_suite(cases, repeat=repeat, isolate=isolate,
+                                 log=lambda msg: click.echo(msg, err=True))
+        text = json.dumps(report, indent=2)
+        if output:
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        else:
+            click.echo(text)
+
+        if baseline:
+            rows = bench.compare_reports(bench.load_report(baseline), report, threshold=threshold)
+            for row in rows:
+                flag = "REGRESSION" if row["regression"] else "ok"
+                click.echo(f"{row['case']:<40} time x{row['time_ratio']:<6} rss x{row['rss_ratio']:<6} {flag}", err=True)
+            if any(row["regression"] for row in rows):
+                sys.exit(1)
+
+
+    @app.cli.command("desolidify-accuracy")
+    @click.option("--mesh", "meshes", multiple=True, help="Synthetic mesh (repeatable; default cylinder, thin_shell)")
+    @click.option("--size", default="small", show_default=True, help="Synthetic mesh size")
+    @click.option("--input", "files", multiple=True, type=click.Path(exists=True, dir_okay=False), help="STL file to include (repeatable)")
+    @click.option("--config", "configs", multiple=True, help='Candidate, e.g. "voxel=0.9" or "fast=2,orientations=xyz" (repeatable)')
+    @click.option("--reference", default="voxel=0.6", show_default=True, help="Reference configuration")
+    @click.option("--base", default="", help="Params applied to every run, e.g. \"orientations=radial\"")
+    @click.option("--samples", default=20000, show_default=True, help="Surface samples per mesh for distances")
+    @click.option("--output", "-o", type=click.Path(dir_okay=False), help="Write the JSON report here")
+    def desolidify_accuracy(meshes, size, files, configs, reference, base, samples, output):
+        """Compare engine configurations against a fine-voxel reference."""
+        import json
+
+        from backend.desolidify_engine import accuracy  # type: ignore
+
+        inputs = accuracy.load_inputs(meshes or ([] if files else ["cylinder", "thin_shell"]), size, files)
+        report = accuracy.run_accuracy(
+            inputs, configs or list(accuracy.DEFAULT_CONFIGS), reference=reference,
+            base=accuracy.parse_config(base), samples=samples, log=lambda msg: click.echo(msg, err=True),
+        )
+        if output:
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(json.dumps(report, indent=2) + "\n")
+        click.echo(accuracy.format_table(report))
+
+    @app.cli.command("desolidify-tile-worker")
+    @click.option("--poll", default=2.0, show_default=True, help="Seconds between scans of JOBS_ROOT for open tiles")
+    @click.option("--once", is_flag=True, help="Work the tiles open now, then exit")
+    def desolidify_tile_worker(poll, once):
+        """Compute tiles of tiled jobs on this host (shared JOBS_ROOT)."""
+        import time as _time
+
+        from backend.desolidify_engine.tiling import find_boards, worker_id  # type: ignore
+        from backend.services.storage import get_status  # type: ignore
+
+        jobs_root = Path(app.config["JOBS_ROOT"]).resolve()
+        lease_s = float(app.config.get("TILE_CLAIM_TTL_S", 120))
+        owner = worker_id()
+        click.echo(f"Tile worker {owner} watching {jobs_root}", err=True)
+        while True:
+            for board in find_boards(jobs_root):
+                if (get_status(board.root.parent.name) or {}).get("state") != "running":
+                    continue
+                try:
+                    n = board.work(owner, lease_s)
+                except Exception as e:
+                    click.echo(f"{board.root.parent.name}: tile failed: {type(e).__name__}: {e}", err=True)
+                    continue
+                if n:
+                    click.echo(f"{board.root.parent.name}: {n} tile(s) done", err=True)
+            if once:
+                break
+            _time.sleep(poll)
 
 # -----------------------------------------------------------------------------
 # Socket.IO helpers (used by services.progress)
 # -----------------------------------------------------------------------------
 
-def socketio_emit_progress(job_id: str, progress: float, message: str | None = None) -> None:
+def socketio_emit_progress(job_id: str, progress: float, message: str | None = None, **extra) -> None:
     """
-    Emit a progress update to WebSocket room 'job:<id>'.
+    Emit a progress update to WebSocket room 'job:<id>' (``extra`` fields,
+    e.g. ``eta_seconds``, are added when not None).
     """
     global socketio
     if not isinstance(socketio, SocketIO):
@@ -189,4 +354,5 @@ def socketio_emit_progress(job_id: str, progress: float, message: str | None = N
     payload = {"job_id": job_id, "progress": float(progress)}
     if message is not None:
         payload["message"] = message
+    payload.update({k: v for k, v in extra.items() if v is not None})
     socketio.emit("progress", payload, room=f"job:{job_id}")
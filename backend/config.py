@@ -41,15 +41,56 @@ class Config:
     QUEUE_BACKEND = os.getenv("QUEUE_BACKEND", "thread")  # 'thread' | 'celery'
     MAX_WORKERS = int(os.getenv("MAX_WORKERS", "1"))
     MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "1"))
+    # Import the engine and run a tiny perforation on the pool at app start
+    WARMUP_ON_START = os.getenv("WARMUP_ON_START", "0") in ("1", "true", "True")
+
+    # Status polling (GET /api/jobs/<id>?wait=N is capped at this many seconds)
+    STATUS_LONGPOLL_MAX_S = float(os.getenv("STATUS_LONGPOLL_MAX_S", "30"))
+
+    # Results (gzip sibling of output.stl for Accept-Encoding; 0 disables)
+    RESULT_GZIP_LEVEL = int(os.getenv("RESULT_GZIP_LEVEL", "6"))
+    # Content-addressed result cache under JOBS_ROOT/.cache (LRU size bound; 0 disables)
+    RESULT_CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", "2048"))
+    # Job thumbnails (rendered once when a job finishes)
+    THUMBNAIL_WIDTH = int(os.getenv("THUMBNAIL_WIDTH", "320"))
+    THUMBNAIL_HEIGHT = int(os.getenv("THUMBNAIL_HEIGHT", "240"))
+    # auto | pyrender | numpy (auto falls back to the software rasterizer without OpenGL)
+    PREVIEW_BACKEND = os.getenv("PREVIEW_BACKEND", "auto")
+
+    # Batches (POST /api/batches): parts per batch, ZIP expansion cap, and how long
+    # a streamed result ZIP waits for a part that makes no progress
+    MAX_BATCH_PARTS = int(os.getenv("MAX_BATCH_PARTS", "50"))
+    BATCH_MAX_UNZIPPED_MB = float(os.getenv("BATCH_MAX_UNZIPPED_MB", "2048"))
+    BATCH_RESULT_TIMEOUT_S = float(os.getenv("BATCH_RESULT_TIMEOUT_S", "3600"))
+
+    # Per-job memory tracking: RSS sampling period (0 disables); tracemalloc adds
+    # per-stage NumPy allocation detail at a noticeable speed cost
+    MEM_SAMPLE_MS = float(os.getenv("MEM_SAMPLE_MS", "20"))
+    MEM_TRACEMALLOC = os.getenv("MEM_TRACEMALLOC", "0") in ("1", "true", "True")
+
+    # Per-job profiling: {"profile": true} is honored only when enabled here
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") in ("1", "true", "True")
+    PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
 
     # Retention
     JOB_RETENTION_HOURS = int(os.getenv("JOB_RETENTION_HOURS", "6"))
+    # Background janitor: sweep period (0 disables) and size quota for job
+    # folders (0 = age limit only); evicts least-recently-downloaded first
+    JANITOR_INTERVAL_S = float(os.getenv("JANITOR_INTERVAL_S", "300"))
+    JOBS_MAX_MB = float(os.getenv("JOBS_MAX_MB", "0"))
 
     # Engine Safety
     ENGINE_MAX_CHUNK_PTS = int(os.getenv("ENGINE_MAX_CHUNK_PTS", "2500000"))
     ENGINE_MAX_VOXEL = float(os.getenv("ENGINE_MAX_VOXEL", "1.2"))
     ENGINE_MIN_VOXEL = float(os.getenv("ENGINE_MIN_VOXEL", "0.2"))
 
+    # XY tiling: jobs whose grid exceeds this many samples are split into
+    # overlapping tiles (0 disables). Tiles are claimed through files in the
+    # job folder, so `flask desolidify-tile-worker` on other hosts sharing
+    # JOBS_ROOT can help; a claim without a heartbeat for TILE_CLAIM_TTL_S is retaken.
+    TILE_MAX_POINTS = int(os.getenv("TILE_MAX_POINTS", "0"))
+    TILE_CLAIM_TTL_S = float(os.getenv("TILE_CLAIM_TTL_S", "120"))
+
 
 class Development(Config):
     DEBUG = True
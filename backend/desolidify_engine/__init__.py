@@ -1,22 +1,38 @@
 # backend/desolidify_engine/__init__.py
 from __future__ import annotations
 
+import importlib
+from typing import Any
+
 from backend.desolidify_engine.version import __version__
-from backend.desolidify_engine.settings import Settings, clamp_settings
-from backend.desolidify_engine.presets import PRESETS_DEFAULT
-from backend.desolidify_engine.engine import (
-    perforate_mesh_sdf,
-    load_mesh_any,
-)
-from backend.desolidify_engine.preview import run_preview_bytes, run_preview_mesh
-
-__all__ = [
-    "__version__",
-    "Settings",
-    "clamp_settings",
-    "PRESETS_DEFAULT",
-    "perforate_mesh_sdf",
-    "load_mesh_any",
-    "run_preview_bytes",
-    "run_preview_mesh",
-]
+
+# Public names → defining submodule. Resolved on first attribute access so that
+# importing a light submodule (settings, presets) does not pull in trimesh,
+# scikit-image, scipy or numba through this package.
+_LAZY = {
+    "Settings": "settings",
+    "clamp_settings": "settings",
+    "PRESETS_DEFAULT": "presets",
+    "perforate_mesh_sdf": "engine",
+    "load_mesh_any": "engine",
+    "load_mesh_bytes": "engine",
+    "run_preview_bytes": "preview",
+    "run_preview_mesh": "preview",
+    "warm_up": "warmup",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
+
+
+__all__ = ["__version__", *_LAZY]
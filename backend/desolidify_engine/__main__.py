@@ -0,0 +1,6 @@
+# backend/desolidify_engine/__main__.py
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,216 @@
+# backend/desolidify_engine/accuracy.py
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import trimesh
+
+from .bench import environment_info, synthetic_mesh
+from .instrument import StageRecorder
+from .settings import Settings, from_params
+
+# Fine-voxel configuration every candidate is measured against
+DEFAULT_REFERENCE = "voxel=0.6"
+DEFAULT_CONFIGS = ("voxel=1.2", "voxel=0.9", "fast=1", "fast=2")
+DEFAULT_SAMPLES = 20_000
+
+
+# -----------------------------------------------------------------------------
+# Configurations
+# -----------------------------------------------------------------------------
+
+def parse_config(spec: str) -> Dict[str, Any]:
+    """``"voxel=0.9,orientations=xyz"`` → params dict (values parsed as JSON when possible)."""
+    out: Dict[str, Any] = {}
+    for item in filter(None, (p.strip() for p in spec.split(","))):
+        key, sep, raw = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected key=value in config {spec!r}, got {item!r}")
+        try:
+            out[key.strip()] = json.loads(raw)
+        except json.JSONDecodeError:
+            out[key.strip()] = raw
+    return out
+
+
+def settings_for(base: Dict[str, Any], config: Dict[str, Any]) -> Settings:
+    # No memory backoff: a retry would silently change the voxel being measured
+    return from_params({**base, **config, "mem_retry_off": True})
+
+
+# -----------------------------------------------------------------------------
+# Metrics
+# -----------------------------------------------------------------------------
+
+def _surface_points(mesh: trimesh.Trimesh, count: int, seed: int) -> np.ndarray:
+    pts, _ = trimesh.sample.sample_surface(mesh, int(count), seed=seed)
+    return np.asarray(pts, dtype=np.float64)
+
+
+def surface_distances(reference: trimesh.Trimesh, mesh: trimesh.Trimesh, *,
+                      samples: int = DEFAULT_SAMPLES, seed: int = 0) -> Dict[str, float]:
+    """
+    Symmetric point-to-point distances between surface samples of both meshes
+    (mm): Chamfer is the mean of the two directed means, Hausdorff the larger
+    directed maximum, p95 the 95th percentile over both directions.
+    """
+    from scipy.spatial import cKDTree
+
+    a = _surface_points(reference, samples, seed)
+    b = _surface_points(mesh, samples, seed + 1)
+    d_ab, _ = cKDTree(b).query(a, workers=-1)
+    d_ba, _ = cKDTree(a).query(b, workers=-1)
+    both = np.concatenate([d_ab, d_ba])
+    return {
+        "chamfer_mm": round(float(0.5 * (d_ab.mean() + d_ba.mean())), 4),
+        "hausdorff_mm": round(float(max(d_ab.max(), d_ba.max())), 4),
+        "p95_mm": round(float(np.percentile(both, 95)), 4),
+    }
+
+
+def topology(mesh: trimesh.Trimesh) -> Dict[str, Any]:
+    """
+    Bodies, genus and volume. For closed surfaces χ = 2·(bodies − genus), so
+    every through-hole the engine cuts adds one to the genus.
+    """
+    bodies = int(mesh.body_count)
+    euler = int(mesh.euler_number)
+    watertight = bool(mesh.is_watertight)
+    return {
+        "bodies": bodies,
+        "genus": int(round(bodies - euler / 2.0)) if watertight else None,
+        "watertight": watertight,
+        "volume_mm3": round(float(abs(mesh.volume)), 2) if watertight else None,
+    }
+
+
+def compare_meshes(reference: trimesh.Trimesh, mesh: trimesh.Trimesh, *,
+                   samples: int = DEFAULT_SAMPLES, ref_topology: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    ref_topo = ref_topology or topology(reference)
+    topo = topology(mesh)
+    out: Dict[str, Any] = {**surface_distances(reference, mesh, samples=samples), **topo}
+    out["hole_diff"] = (topo["genus"] - ref_topo["genus"]
+                        if topo["genus"] is not None and ref_topo["genus"] is not None else None)
+    out["volume_rel"] = (round((topo["volume_mm3"] - ref_topo["volume_mm3"]) / ref_topo["volume_mm3"], 5)
+                         if topo["volume_mm3"] is not None and ref_topo["volume_mm3"] else None)
+    return out
+
+
+def pareto_flags(points: Sequence[Tuple[float, float]]) -> List[bool]:
+    """True where no other (cost, error) point is at least as good on both and better on one."""
+    flags = []
+    for i, (c, e) in enumerate(points):
+        dominated = any(
+            (c2 <= c and e2 <= e) and (c2 < c or e2 < e)
+            for j, (c2, e2) in enumerate(points) if j != i
+        )
+        flags.append(not dominated)
+    return flags
+
+
+# -----------------------------------------------------------------------------
+# Running
+# -----------------------------------------------------------------------------
+
+def _run(mesh: trimesh.Trimesh, s: Settings) -> Tuple[trimesh.Trimesh, float, Dict[str, float]]:
+    from .engine import perforate_mesh_sdf
+
+    rec = StageRecorder()
+    t0 = time.perf_counter()
+    out = perforate_mesh_sdf(mesh, s, recorder=rec)
+    return out, time.perf_counter() - t0, dict(rec.stages)
+
+
+def load_inputs(meshes: Sequence[str], size: str, files: Sequence[str]) -> List[Tuple[str, Callable[[], trimesh.Trimesh]]]:
+    """(name, loader) pairs for synthetic meshes and STL files."""
+    from .engine import load_mesh_any
+
+    out: List[Tuple[str, Callable[[], trimesh.Trimesh]]] = []
+    for name in meshes:
+        out.append((f"{name}/{size}", lambda n=name: synthetic_mesh(n, size)))
+    for path in files:
+        out.append((Path(path).name, lambda p=path: load_mesh_any(Path(p))))
+    return out
+
+
+def run_accuracy(inputs: Sequence[Tuple[str, Callable[[], trimesh.Trimesh]]], configs: Sequence[str], *,
+                 reference: str = DEFAULT_REFERENCE, base: Optional[Dict[str, Any]] = None,
+                 samples: int = DEFAULT_SAMPLES, log: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+    Run every input through the reference and each candidate configuration
+    and return the JSON-serializable report (per-run rows plus a per-config
+    summary with Pareto flags on total runtime vs. mean Chamfer distance).
+    """
+    base = dict(base or {})
+    rows: List[Dict[str, Any]] = []
+    for name, loader in inputs:
+        mesh = loader()
+        try:
+            ref, ref_s, _ = _run(mesh, settings_for(base, parse_config(reference)))
+        except Exception as e:
+            if log:
+                log(f"{name}: reference failed: {type(e).__name__}: {e}")
+            continue
+        ref_topo = topology(ref)
+        if log:
+            log(f"{name}: reference {reference} {ref_s:.1f}s, genus {ref_topo['genus']}")
+        for spec in configs:
+            s = settings_for(base, parse_config(spec))
+            row: Dict[str, Any] = {"input": name, "config": spec, "voxel": s.voxel}
+            try:
+                out, wall, stages = _run(mesh, s)
+                row.update(wall_s=round(wall, 3), speedup=round(ref_s / wall, 2) if wall > 0 else None,
+                           triangles_out=int(len(out.faces)), stages={k: round(v, 3) for k, v in stages.items()},
+                           **compare_meshes(ref, out, samples=samples, ref_topology=ref_topo))
+            except Exception as e:
+                row["error"] = f"{type(e).__name__}: {e}"
+            rows.append(row)
+            if log:
+                status = row.get("error") or (
+                    f"{row['wall_s']:.1f}s, chamfer {row['chamfer_mm']:.3f} mm, hole diff {row['hole_diff']}")
+                log(f"{name}: {spec}: {status}")
+        rows.append({"input": name, "config": reference, "reference": True, "wall_s": round(ref_s, 3),
+                     "triangles_out": int(len(ref.faces)), **ref_topo})
+
+    return {"env": environment_info(), "reference": reference, "base": base, "samples": int(samples),
+            "results": rows, "summary": summarize(rows, configs)}
+
+
+def summarize(rows: List[Dict[str, Any]], configs: Sequence[str]) -> List[Dict[str, Any]]:
+    """Per-config aggregate over inputs with a Pareto flag (total wall vs. mean Chamfer)."""
+    summary = []
+    for spec in configs:
+        ok = [r for r in rows if r["config"] == spec and not r.get("reference") and not r.get("error")]
+        if not ok:
+            continue
+        holes = [abs(r["hole_diff"]) for r in ok if r.get("hole_diff") is not None]
+        vols = [abs(r["volume_rel"]) for r in ok if r.get("volume_rel") is not None]
+        summary.append({
+            "config": spec,
+            "runs": len(ok),
+            "wall_s": round(sum(r["wall_s"] for r in ok), 3),
+            "chamfer_mm": round(float(np.mean([r["chamfer_mm"] for r in ok])), 4),
+            "hausdorff_mm": round(max(r["hausdorff_mm"] for r in ok), 4),
+            "hole_diff": max(holes) if holes else None,
+            "volume_rel": round(max(vols), 5) if vols else None,
+        })
+    for row, flag in zip(summary, pareto_flags([(r["wall_s"], r["chamfer_mm"]) for r in summary])):
+        row["pareto"] = flag
+    return summary
+
+
+def format_table(report: Dict[str, Any]) -> str:
+    rows = sorted(report["summary"], key=lambda r: r["wall_s"])
+    width = max([len(r["config"]) for r in rows] + [6])
+    lines = [f"reference: {report['reference']}",
+             f"{'config':<{width}}  {'wall s':>8}  {'chamfer':>8}  {'hausdorff':>9}  {'|holes|':>7}  {'|vol %|':>7}  pareto"]
+    for r in rows:
+        holes = "-" if r["hole_diff"] is None else str(r["hole_diff"])
+        vol = "-" if r["volume_rel"] is None else f"{100 * r['volume_rel']:.2f}"
+        lines.append(f"{r['config']:<{width}}  {r['wall_s']:>8.1f}  {r['chamfer_mm']:>8.4f}  "
+                     f"{r['hausdorff_mm']:>9.4f}  {holes:>7}  {vol:>7}  {'*' if r['pareto'] else ''}")
+    return "\n".join(lines)
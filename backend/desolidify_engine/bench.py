@@ -0,0 +1,298 @@
+# backend/desolidify_engine/bench.py
+from __future__ import annotations
+
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import trimesh
+
+from .instrument import StageRecorder
+from .settings import Settings
+from .stl_io import write_binary_stl
+from .version import __version__
+
+# -----------------------------------------------------------------------------
+# Deterministic synthetic inputs
+# -----------------------------------------------------------------------------
+
+# size name -> (revolve sections, subdivision passes)
+SIZES: Dict[str, tuple] = {
+    "small": (64, 0),
+    "medium": (256, 1),
+    "large": (512, 2),
+}
+
+
+def _revolve(profile: np.ndarray, sections: int) -> trimesh.Trimesh:
+    closed = np.vstack([profile, profile[:1]])
+    return trimesh.creation.revolve(closed, sections=sections)
+
+
+def _cylinder(sections: int) -> trimesh.Trimesh:
+    # Straight-walled pot: 60 mm tall, 3 mm wall, 3 mm floor
+    return _revolve(np.array([[0, 0], [30, 0], [30, 60], [27, 60], [27, 3], [0, 3]], float), sections)
+
+
+def _planter(sections: int) -> trimesh.Trimesh:
+    # Tapered planter: wider at the rim than at the base
+    return _revolve(np.array([[0, 0], [25, 0], [32, 60], [30, 60], [23.2, 3], [0, 3]], float), sections)
+
+
+def _thin_shell(sections: int) -> trimesh.Trimesh:
+    # Hemispherical bowl with a 1 mm wall (thinner than the default shell band)
+    t = np.linspace(0.0, np.pi / 2, max(8, sections // 8))
+    outer = np.c_[30 * np.sin(t), 30 - 30 * np.cos(t)]
+    inner = np.c_[29 * np.sin(t[::-1]), 30 - 29 * np.cos(t[::-1])]
+    return _revolve(np.vstack([outer, inner]), sections)
+
+
+def _multi_body(sections: int) -> trimesh.Trimesh:
+    # Four disjoint small pots on a 2 x 2 grid
+    pot = _revolve(np.array([[0, 0], [12, 0], [12, 30], [10, 30], [10, 2], [0, 2]], float), sections)
+    bodies = []
+    for dx in (-16.0, 16.0):
+        for dy in (-16.0, 16.0):
+            b = pot.copy()
+            b.apply_translation([dx, dy, 0.0])
+            bodies.append(b)
+    return trimesh.util.concatenate(bodies)
+
+
+GENERATORS: Dict[str, Callable[[int], trimesh.Trimesh]] = {
+    "cylinder": _cylinder,
+    "planter": _planter,
+    "thin_shell": _thin_shell,
+    "multi_body": _multi_body,
+}
+
+
+def synthetic_mesh(name: str, size: str = "small") -> trimesh.Trimesh:
+    """Build one of the benchmark meshes. Identical output on every run."""
+    if name not in GENERATORS:
+        raise ValueError(f"Unknown benchmark mesh: {name}")
+    if size not in SIZES:
+        raise ValueError(f"Unknown benchmark size: {size}")
+    sections, passes = SIZES[size]
+    mesh = GENERATORS[name](sections)
+    for _ in range(passes):
+        mesh = mesh.subdivide()
+    return mesh
+
+
+# -----------------------------------------------------------------------------
+# Running cases
+# -----------------------------------------------------------------------------
+
+@dataclass
+class BenchCase:
+    mesh: str
+    size: str
+    orientation: str
+    voxel: float
+
+    @property
+    def name(self) -> str:
+        return f"{self.mesh}/{self.size}/{self.orientation}/v{self.voxel:g}"
+
+
+@dataclass
+class BenchResult:
+    case: str
+    mesh: str
+    size: str
+    orientation: str
+    voxel: float
+    triangles_in: int = 0
+    triangles_out: int = 0
+    wall_s: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)
+    peak_rss_mb: float = 0.0
+    error: Optional[str] = None
+
+
+def _peak_rss_mb() -> float:
+    """Peak RSS of this process in MB (0 where neither resource nor psutil can tell)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil  # type: ignore
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+        except Exception:
+            return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _settings_for(case: BenchCase) -> Settings:
+    # No memory backoff: a retry would silently change voxel and timings
+    return Settings(voxel=float(case.voxel), orientations=case.orientation, mem_retry=False)
+
+
+def run_case(case: BenchCase, repeat: int = 1) -> BenchResult:
+    """Run one case ``repeat`` times and keep the fastest run's timings."""
+    from .engine import perforate_mesh_sdf
+
+    res = BenchResult(case=case.name, mesh=case.mesh, size=case.size,
+                      orientation=case.orientation, voxel=float(case.voxel))
+    best: Optional[Dict[str, float]] = None
+    best_wall = 0.0
+    try:
+        for _ in range(max(1, int(repeat))):
+            rec = StageRecorder()
+            t0 = time.perf_counter()
+            with rec.stage("generate"):
+                mesh = synthetic_mesh(case.mesh, case.size)
+            out = perforate_mesh_sdf(mesh, _settings_for(case), recorder=rec)
+            with rec.stage("export"):
+                write_binary_stl(io.BytesIO(), out.vertices, out.faces, normals=out.face_normals)
+            wall = time.perf_counter() - t0
+            if best is None or wall < best_wall:
+                best, best_wall = dict(rec.stages), wall
+            res.triangles_in = int(len(mesh.faces))
+            res.triangles_out = int(len(out.faces))
+    except Exception as e:
+        res.error = f"{type(e).__name__}: {e}"
+    if best is not None:
+        res.stages = {k: round(v, 4) for k, v in best.items()}
+        res.wall_s = round(best_wall, 4)
+    res.peak_rss_mb = round(_peak_rss_mb(), 1)
+    return res
+
+
+def _run_isolated(case: BenchCase, repeat: int) -> BenchResult:
+    # A fresh process per case so ru_maxrss is that case's own peak
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(run_case, case, repeat).result()
+
+
+def build_cases(meshes: Iterable[str], sizes: Iterable[str],
+                orientations: Iterable[str], voxels: Iterable[float]) -> List[BenchCase]:
+    return [BenchCase(m, s, o, float(v))
+            for m in meshes for s in sizes for o in orientations for v in voxels]
+
+
+def environment_info() -> Dict[str, Any]:
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).resolve().parent,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except Exception:
+        rev = None
+    try:
+        import skimage
+        skimage_version = skimage.__version__
+    except Exception:  # pragma: no cover
+        skimage_version = None
+    return {
+        "engine_version": __version__,
+        "git_rev": rev,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "trimesh": trimesh.__version__,
+        "scikit_image": skimage_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def run_suite(cases: List[BenchCase], *, repeat: int = 1, isolate: bool = True,
+              log: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Run every case and return the JSON-serializable report."""
+    results = []
+    for i, case in enumerate(cases, 1):
+        r = _run_isolated(case, repeat) if isolate else run_case(case, repeat)
+        results.append(asdict(r))
+        if log:
+            status = r.error or f"{r.wall_s:.2f}s, {r.peak_rss_mb:.0f} MB, {r.triangles_out} tris"
+            log(f"[{i}/{len(cases)}] {case.name}: {status}")
+    return {"env": environment_info(), "repeat": int(repeat), "isolated": bool(isolate), "results": results}
+
+
+# -----------------------------------------------------------------------------
+# Per-slice kernel micro-benchmark
+# -----------------------------------------------------------------------------
+
+def bench_slice_kernels(size: int = 512, repeat: int = 20, band_fraction: float = 0.15) -> Dict[str, Any]:
+    """
+    Time one slice of hole composition (all four cylinder families, shell
+    gating with ``band_fraction`` of pixels in the band) on the NumPy and,
+    when available, the numba path. Best of ``repeat`` runs, in ms.
+    """
+    from . import kernels
+
+    rng = np.random.default_rng(0)
+    n = size * size
+    sdf = rng.normal(size=n).astype(np.float32)
+    band = float(np.quantile(np.abs(sdf), band_fraction))
+    fields = dict(
+        cyl_xy=rng.normal(size=(size, size)).astype(np.float32),
+        cyl_y_k=rng.normal(size=size).astype(np.float32),
+        cyl_x_k=rng.normal(size=size).astype(np.float32),
+        radial=rng.uniform(0, 9, size=(size, size)).astype(np.float32),
+        dz_sq=0.5, radius=2.5,
+    )
+    out = np.empty_like(sdf)
+
+    def best_ms(use_numba: bool) -> float:
+        kernels.apply_slice_holes(out, sdf, size, band=band, use_numba=use_numba, **fields)  # warm-up / JIT
+        times = []
+        for _ in range(max(1, int(repeat))):
+            t0 = time.perf_counter()
+            kernels.apply_slice_holes(out, sdf, size, band=band, use_numba=use_numba, **fields)
+            times.append(time.perf_counter() - t0)
+        return round(min(times) * 1000.0, 3)
+
+    report: Dict[str, Any] = {"slice": [size, size], "band_fraction": band_fraction, "numpy_ms": best_ms(False)}
+    if kernels.numba_enabled():
+        report["numba_ms"] = best_ms(True)
+        report["speedup"] = round(report["numpy_ms"] / max(report["numba_ms"], 1e-6), 2)
+    return report
+
+
+# -----------------------------------------------------------------------------
+# Comparing reports
+# -----------------------------------------------------------------------------
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = 1.25) -> List[Dict[str, Any]]:
+    """
+    Per-case ratios (current / baseline) of wall time and peak RSS for cases
+    present in both reports. ``regression`` is set when either ratio exceeds
+    ``threshold``.
+    """
+    base = {r["case"]: r for r in baseline.get("results", []) if not r.get("error")}
+    rows = []
+    for r in current.get("results", []):
+        b = base.get(r["case"])
+        if b is None or r.get("error"):
+            continue
+        time_ratio = r["wall_s"] / b["wall_s"] if b["wall_s"] > 0 else 1.0
+        rss_ratio = r["peak_rss_mb"] / b["peak_rss_mb"] if b["peak_rss_mb"] > 0 else 1.0
+        rows.append({
+            "case": r["case"],
+            "wall_s": [b["wall_s"], r["wall_s"]],
+            "time_ratio": round(time_ratio, 3),
+            "peak_rss_mb": [b["peak_rss_mb"], r["peak_rss_mb"]],
+            "rss_ratio": round(rss_ratio, 3),
+            "triangles_out": [b["triangles_out"], r["triangles_out"]],
+            "regression": time_ratio > threshold or rss_ratio > threshold,
+        })
+    return rows
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
@@ -0,0 +1,229 @@
+# backend/desolidify_engine/cli.py
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .presets import PRESETS_DEFAULT
+from .settings import Settings, from_params, settings_fingerprint
+from .version import __version__
+
+# Per-output stamps (input identity + settings + engine version) live in one
+# file in out_dir, written only by the parent process.
+STAMP_FILE = ".desolidify-stamps.json"
+OUTPUT_SUFFIX = "_desolid.stl"
+
+
+def resolve_preset(name: str) -> Dict[str, Any]:
+    """Exact preset name, else a unique case-insensitive substring match."""
+    if name in PRESETS_DEFAULT:
+        return dict(PRESETS_DEFAULT[name])
+    hits = [k for k in PRESETS_DEFAULT if name.lower() in k.lower()]
+    if len(hits) == 1:
+        return dict(PRESETS_DEFAULT[hits[0]])
+    if not hits:
+        raise ValueError(f"Unknown preset: {name!r} (see --list-presets)")
+    raise ValueError(f"Ambiguous preset {name!r}: " + ", ".join(hits))
+
+
+def _parse_overrides(items: Sequence[str]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for item in items:
+        key, sep, raw = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected key=value, got {item!r}")
+        try:
+            out[key.strip()] = json.loads(raw)
+        except json.JSONDecodeError:
+            out[key.strip()] = raw
+    return out
+
+
+def settings_stamp(s: Settings) -> str:
+    return settings_fingerprint(s)
+
+
+def _input_identity(path: Path) -> Dict[str, int]:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _load_stamps(out_dir: Path) -> Dict[str, Any]:
+    try:
+        return json.loads((out_dir / STAMP_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_stamps(out_dir: Path, stamps: Dict[str, Any]) -> None:
+    tmp = out_dir / (STAMP_FILE + ".tmp")
+    tmp.write_text(json.dumps(stamps, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, out_dir / STAMP_FILE)
+
+
+def is_up_to_date(in_path: Path, out_path: Path, stamp: str, stamps: Dict[str, Any]) -> bool:
+    prev = stamps.get(in_path.name)
+    return bool(
+        out_path.exists() and prev
+        and prev.get("settings") == stamp
+        and prev.get("input") == _input_identity(in_path)
+    )
+
+
+def process_file(in_path: str, out_path: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker: load → perforate → stream binary STL (temp + rename). Never raises."""
+    from .engine import load_mesh_any, perforate_mesh_sdf
+    from .instrument import StageRecorder
+    from .stl_io import write_binary_stl
+
+    rec = StageRecorder()
+    t0 = time.perf_counter()
+    out = Path(out_path)
+    tmp = out.with_name(out.name + f".tmp-{os.getpid()}")
+    try:
+        with rec.stage("load"):
+            mesh = load_mesh_any(Path(in_path))
+        result = perforate_mesh_sdf(mesh, Settings(**settings), recorder=rec)
+        with rec.stage("export"):
+            with open(tmp, "wb") as f:
+                write_binary_stl(f, result.vertices, result.faces, normals=result.face_normals)
+            os.replace(tmp, out)
+        error = None
+    except Exception as e:
+        tmp.unlink(missing_ok=True)
+        error = f"{type(e).__name__}: {e}"
+    return {
+        "wall_s": round(time.perf_counter() - t0, 3),
+        "stages": {k: round(v, 3) for k, v in rec.stages.items()},
+        "triangles_in": rec.info.get("triangles_in"),
+        "triangles_out": rec.info.get("triangles_out"),
+        "error": error,
+    }
+
+
+def _failed_result(error: str) -> Dict[str, Any]:
+    return {"wall_s": 0.0, "stages": {}, "triangles_in": None, "triangles_out": None, "error": error}
+
+
+def find_inputs(in_dir: Path, pattern: str) -> List[Path]:
+    return sorted(p for p in in_dir.glob(pattern) if p.is_file())
+
+
+def run_directory(in_dir: Path, out_dir: Path, s: Settings, *, workers: int = 1, force: bool = False,
+                  pattern: str = "*.stl", log=print) -> List[Dict[str, Any]]:
+    """Perforate every matching file in ``in_dir`` into ``out_dir``; returns per-file rows."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = settings_stamp(s)
+    stamps = _load_stamps(out_dir)
+    settings = asdict(s)
+
+    rows: List[Dict[str, Any]] = []
+    todo: List[Tuple[Path, Path]] = []
+    for in_path in find_inputs(in_dir, pattern):
+        out_path = out_dir / f"{in_path.stem}{OUTPUT_SUFFIX}"
+        if not force and is_up_to_date(in_path, out_path, stamp, stamps):
+            rows.append({"file": in_path.name, "status": "skipped", "wall_s": 0.0})
+            continue
+        todo.append((in_path, out_path))
+
+    def record(in_path: Path, res: Dict[str, Any]) -> None:
+        ok = res["error"] is None
+        rows.append({"file": in_path.name, "status": "done" if ok else "failed", **res})
+        if ok:
+            stamps[in_path.name] = {"settings": stamp, "input": _input_identity(in_path)}
+            _save_stamps(out_dir, stamps)
+        log(f"[{len(rows)}/{total}] {in_path.name}: "
+            + (f"{res['wall_s']:.1f}s, {res['triangles_out']} tris" if ok else res["error"]))
+
+    total = len(rows) + len(todo)
+    if workers <= 1 or len(todo) <= 1:
+        for in_path, out_path in todo:
+            record(in_path, process_file(str(in_path), str(out_path), settings))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(process_file, str(i), str(o), settings): i for i, o in todo}
+            for fut in as_completed(futures):
+                try:
+                    res = fut.result()
+                except Exception as e:
+                    # The worker died (OOM kill → BrokenProcessPool) before process_file could report
+                    res = _failed_result(f"{type(e).__name__}: {e}")
+                record(futures[fut], res)
+    return rows
+
+
+def format_summary(rows: List[Dict[str, Any]]) -> str:
+    width = max([len(r["file"]) for r in rows] + [4])
+    lines = [f"{'file':<{width}}  {'status':<7}  {'seconds':>8}  {'tris out':>9}  slowest stage"]
+    for r in sorted(rows, key=lambda r: r["file"]):
+        stages = r.get("stages") or {}
+        slowest = max(stages.items(), key=lambda kv: kv[1]) if stages else None
+        lines.append(
+            f"{r['file']:<{width}}  {r['status']:<7}  {r.get('wall_s', 0.0):>8.1f}  "
+            f"{r.get('triangles_out') or '-':>9}  "
+            + (f"{slowest[0]} {slowest[1]:.1f}s" if slowest else "-")
+        )
+    counts = {k: sum(1 for r in rows if r["status"] == k) for k in ("done", "skipped", "failed")}
+    total = sum(r.get("wall_s", 0.0) for r in rows)
+    lines.append(f"{counts['done']} done, {counts['skipped']} up to date, {counts['failed']} failed; "
+                 f"{total:.1f}s of engine time")
+    return "\n".join(lines)
+
+
+def _default_workers() -> int:
+    # Each worker holds a full SDF volume; leave headroom by default
+    return max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(
+        prog="python -m backend.desolidify_engine",
+        description="Perforate every STL in a directory (no web app required).",
+    )
+    ap.add_argument("in_dir", nargs="?", default=Settings.in_dir, help="Input directory (default: %(default)s)")
+    ap.add_argument("out_dir", nargs="?", default=Settings.out_dir, help="Output directory (default: %(default)s)")
+    ap.add_argument("--preset", help="Preset name (exact or unique substring)")
+    ap.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                    help="Override a parameter, e.g. --set voxel=0.4 (repeatable)")
+    ap.add_argument("--workers", "-j", type=int, default=_default_workers(), help="Parallel processes (default: %(default)s)")
+    ap.add_argument("--glob", default="*.stl", help="Input file pattern (default: %(default)s)")
+    ap.add_argument("--force", action="store_true", help="Reprocess even when outputs are up to date")
+    ap.add_argument("--json", dest="json_path", help="Also write the per-file summary as JSON")
+    ap.add_argument("--list-presets", action="store_true", help="Print preset names and exit")
+    args = ap.parse_args(argv)
+
+    if args.list_presets:
+        print("\n".join(PRESETS_DEFAULT))
+        return 0
+
+    try:
+        params = resolve_preset(args.preset) if args.preset else {}
+        params.update(_parse_overrides(args.overrides))
+    except ValueError as e:
+        ap.error(str(e))
+    s = from_params(params)
+    s.in_dir, s.out_dir = args.in_dir, args.out_dir
+
+    in_dir = Path(args.in_dir)
+    if not in_dir.is_dir():
+        ap.error(f"Input directory not found: {in_dir}")
+
+    print(f"desolidify {__version__}: spacing={s.spacing} radius={s.radius} voxel={s.voxel} "
+          f"orient={s.orientations} workers={args.workers}", file=sys.stderr)
+    rows = run_directory(in_dir, Path(args.out_dir), s, workers=args.workers, force=args.force,
+                         pattern=args.glob, log=lambda msg: print(msg, file=sys.stderr))
+    print(format_summary(rows))
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    return 1 if any(r["status"] == "failed" for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,31 +2,63 @@
 from __future__ import annotations
 
 import gc
+import io
 import math
 import time
 from pathlib import Path
-from typing import Callable, Iterable, List, Optional, Tuple
+from typing import Callable, Iterable, Optional, Tuple
 
 import numpy as np
 import trimesh
 from skimage.measure import marching_cubes
 
+from backend.desolidify_engine import kernels
+from backend.desolidify_engine.instrument import StageRecorder
 from backend.desolidify_engine.settings import Settings
+from backend.desolidify_engine.stl_io import load_binary_stl
 
 # -----------------------------------------------------------------------------
 # Mesh I/O
 # -----------------------------------------------------------------------------
 
-def load_mesh_any(path: Path) -> trimesh.Trimesh:
-    m = trimesh.load_mesh(str(path))
+def _from_binary_stl(source: Path | bytes) -> Optional[trimesh.Trimesh]:
+    loaded = load_binary_stl(source)
+    if loaded is None:
+        return None
+    verts, faces = loaded
+    if len(faces) == 0:
+        raise ValueError("STL contains no triangles")
+    # Vertices are already welded; the engine runs process(validate=True) itself.
+    return trimesh.Trimesh(vertices=verts, faces=faces, process=False)
+
+
+def _as_single_mesh(m, what: str) -> trimesh.Trimesh:
     if isinstance(m, trimesh.Trimesh):
         return m
     if hasattr(m, "dump"):
         geoms = list(m.dump().geometry.values())
         if not geoms:
-            raise ValueError(f"No geometry in: {path}")
+            raise ValueError(f"No geometry in: {what}")
         return trimesh.util.concatenate(geoms)
-    raise ValueError(f"Unsupported container for: {path}")
+    raise ValueError(f"Unsupported container for: {what}")
+
+
+def load_mesh_any(path: Path) -> trimesh.Trimesh:
+    path = Path(path)
+    if path.suffix.lower() == ".stl":
+        m = _from_binary_stl(path)
+        if m is not None:
+            return m
+    return _as_single_mesh(trimesh.load_mesh(str(path)), str(path))
+
+
+def load_mesh_bytes(data: bytes, file_type: str = "stl") -> trimesh.Trimesh:
+    """In-memory counterpart of ``load_mesh_any`` (binary STL fast path)."""
+    if file_type == "stl":
+        m = _from_binary_stl(data)
+        if m is not None:
+            return m
+    return _as_single_mesh(trimesh.load(io.BytesIO(data), file_type=file_type), f"<{file_type} bytes>")
 
 
 # -----------------------------------------------------------------------------
@@ -57,15 +89,35 @@ def _grid_centers_xy(xmin, xmax, ymin, ymax, spacing, stagger,
     return centers
 
 
+# Hole fields reduce over lattice centers in batches so the (rows, cols,
+# centers) temporaries stay below this many cells whatever the part footprint
+_CENTER_CHUNK_CELLS = 1 << 22
+
+
+def _min_over_centers(shape: Tuple[int, int], n_centers: int,
+                      dist: Callable[[slice], np.ndarray]) -> np.ndarray:
+    """Running min over ``dist(centers[sl])`` (shape + (batch,)); exact like one np.min."""
+    if n_centers == 0:
+        return np.full(shape, np.inf, dtype=np.float32)
+    step = max(1, _CENTER_CHUNK_CELLS // max(1, shape[0] * shape[1]))
+    out = None
+    for c0 in range(0, n_centers, step):
+        part = np.min(dist(slice(c0, c0 + step)), axis=2)
+        out = part if out is None else np.minimum(out, part, out=out)
+    return out.astype(np.float32)
+
+
 def _grid_min_cyl_sdf_xy(xs: np.ndarray, ys: np.ndarray,
                          centers: np.ndarray, radius: float) -> np.ndarray:
     if centers.size == 0:
         return np.full((len(ys), len(xs)), np.inf, dtype=np.float32)
     XX, YY = np.meshgrid(xs, ys, indexing='xy')
-    dx = XX[..., None] - centers[:, 0]
-    dy = YY[..., None] - centers[:, 1]
-    d = np.sqrt(dx * dx + dy * dy) - radius
-    return np.min(d, axis=2).astype(np.float32)
+
+    def dist(sl):
+        dx = XX[..., None] - centers[sl, 0]
+        dy = YY[..., None] - centers[sl, 1]
+        return np.sqrt(dx * dx + dy * dy) - radius
+    return _min_over_centers(XX.shape, len(centers), dist)
 
 
 def sdf_cylinders_Z(xs, ys, xmin, xmax, ymin, ymax, spacing, radius, stagger,
@@ -85,10 +137,12 @@ def sdf_cylinders_X(ys, zs, ymin, ymax, zmin, zmax, spacing, radius, stagger):
     else:
         centers = np.array([(y, z) for z in cz for y in cy], dtype=np.float32)
     ZV, YV = np.meshgrid(zs, ys, indexing='xy')
-    dy = YV.T[..., None] - centers[:, 0]
-    dz = ZV.T[..., None] - centers[:, 1]
-    d = np.sqrt(dy * dy + dz * dz) - radius
-    return np.min(d, axis=2).astype(np.float32)
+
+    def dist(sl):
+        dy = YV.T[..., None] - centers[sl, 0]
+        dz = ZV.T[..., None] - centers[sl, 1]
+        return np.sqrt(dy * dy + dz * dz) - radius
+    return _min_over_centers(YV.T.shape, len(centers), dist)
 
 
 def sdf_cylinders_Y(xs, zs, xmin, xmax, zmin, zmax, spacing, radius, stagger):
@@ -101,10 +155,12 @@ def sdf_cylinders_Y(xs, zs, xmin, xmax, zmin, zmax, spacing, radius, stagger):
     else:
         centers = np.array([(x, z) for z in cz for x in cx], dtype=np.float32)
     ZV, XV = np.meshgrid(zs, xs, indexing='xy')
-    dx = XV.T[..., None] - centers[:, 0]
-    dz = ZV.T[..., None] - centers[:, 1]
-    d = np.sqrt(dx * dx + dz * dz) - radius
-    return np.min(d, axis=2).astype(np.float32)
+
+    def dist(sl):
+        dx = XV.T[..., None] - centers[sl, 0]
+        dz = ZV.T[..., None] - centers[sl, 1]
+        return np.sqrt(dx * dx + dz * dz) - radius
+    return _min_over_centers(XV.T.shape, len(centers), dist)
 
 
 def sdf_cylinders_RADIAL_prep(xs: np.ndarray, ys: np.ndarray,
@@ -123,170 +179,536 @@ def sdf_cylinders_RADIAL_prep(xs: np.ndarray, ys: np.ndarray,
     vx = v[:, 0]
     vy = v[:, 1]
     XX, YY = np.meshgrid(xs, ys, indexing='xy')
-    dx = XX[..., None] - centers[:, 0]
-    dy = YY[..., None] - centers[:, 1]
-    perp = np.abs(dx * vy - dy * vx).astype(np.float32)
-    return np.min(perp * perp, axis=2).astype(np.float32)
+
+    def dist(sl):
+        dx = XX[..., None] - centers[sl, 0]
+        dy = YY[..., None] - centers[sl, 1]
+        perp = np.abs(dx * vy[sl] - dy * vx[sl]).astype(np.float32)
+        return perp * perp
+    return _min_over_centers(XX.shape, len(centers), dist)
+
+
+# Slices are split into square tiles of this many pixels; a tile whose
+# neighbourhood no surface crosses costs one signed-distance query, not T².
+_SLICE_TILE = 4
+
+
+def _clipped_xy_bounds(tri: np.ndarray, z_lo: float, z_hi: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-triangle XY bounding boxes of the part of each triangle (k, 3, 3)
+    between z_lo and z_hi: its vertices in that band plus its edges'
+    crossings of both planes. Rows with no such part come out as ±inf.
+    """
+    pts, ok = [], []
+    for i in range(3):
+        pts.append(tri[:, i, :2])
+        ok.append((tri[:, i, 2] >= z_lo) & (tri[:, i, 2] <= z_hi))
+    for a, b in ((0, 1), (1, 2), (2, 0)):
+        za, dz = tri[:, a, 2], tri[:, b, 2] - tri[:, a, 2]
+        for h in (z_lo, z_hi):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = (h - za) / dz
+            hit = (dz != 0) & (t >= 0) & (t <= 1)
+            ok.append(hit)
+            pts.append(tri[:, a, :2] + np.where(hit, t, 0.0)[:, None] * (tri[:, b, :2] - tri[:, a, :2]))
+    P = np.stack(pts, axis=1)
+    V = np.stack(ok, axis=1)[..., None]
+    return np.where(V, P, np.inf).min(axis=1), np.where(V, P, -np.inf).max(axis=1)
+
+
+def _near_tiles(xs: np.ndarray, ys: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+                margin: float, tile: int) -> np.ndarray:
+    """(tiles_y, tiles_x) mask of tiles touched by any box [lo - margin, hi + margin]."""
+    ty, tx = -(-len(ys) // tile), -(-len(xs) // tile)
+    keep = np.isfinite(lo).all(axis=1)
+    lo, hi = lo[keep], hi[keep]
+    near = np.zeros((ty, tx), dtype=bool)
+    if not len(lo):
+        return near
+    i0 = np.clip(np.searchsorted(xs, lo[:, 0] - margin, side="left"), 0, len(xs) - 1) // tile
+    i1 = np.clip(np.searchsorted(xs, hi[:, 0] + margin, side="right") - 1, 0, len(xs) - 1) // tile
+    j0 = np.clip(np.searchsorted(ys, lo[:, 1] - margin, side="left"), 0, len(ys) - 1) // tile
+    j1 = np.clip(np.searchsorted(ys, hi[:, 1] + margin, side="right") - 1, 0, len(ys) - 1) // tile
+    # Rasterize all rectangles at once with a 2-D difference array
+    diff = np.zeros((ty + 1, tx + 1), dtype=np.int32)
+    np.add.at(diff, (j0, i0), 1)
+    np.add.at(diff, (j0, i1 + 1), -1)
+    np.add.at(diff, (j1 + 1, i0), -1)
+    np.add.at(diff, (j1 + 1, i1 + 1), 1)
+    return diff.cumsum(axis=0).cumsum(axis=1)[:ty, :tx] > 0
+
+
+# Section backend: slices with a face tilted further than this from vertical
+# within the slice band use the 3D query (in-plane distance misjudges them).
+_SECTION_MAX_TILT_DEG = 30.0
+
+
+def _mesh_signed_distance(m: trimesh.Trimesh, qx: np.ndarray, qy: np.ndarray,
+                          z: float, chunk_pts: int, ws: Optional["_SliceWorkspace"] = None) -> np.ndarray:
+    """3D signed distance (trimesh sign: positive inside) at (qx, qy, z)."""
+    # Build points in CHUNKS to keep mem bounded
+    N = qx.size
+    if ws is not None:
+        sd_flat, pts_buf = ws.sd[:N], ws.points(min(N, int(chunk_pts)))
+    else:
+        sd_flat, pts_buf = np.empty(N, dtype=np.float32), None
+    start = 0
+    while start < N:
+        end = min(start + int(chunk_pts), N)
+        chunk_len = end - start
+        pts = pts_buf[:chunk_len] if pts_buf is not None else np.empty((chunk_len, 3), dtype=np.float32)
+        pts[:, 0] = qx[start:end]
+        pts[:, 1] = qy[start:end]
+        pts[:, 2] = z
+        sd_flat[start:end] = trimesh.proximity.signed_distance(m, pts)
+        start = end
+    return sd_flat
+
+
+class _SliceWorkspace:
+    """
+    Per-job buffers for the slice loop, sized once for the (ny, nx) grid and
+    its tiling so each slice fills them in place instead of allocating.
+    ``pix_tile`` maps every pixel to its tile, which turns the tile → pixel
+    expansions into ``np.take(..., out=...)``.
+    """
+
+    def __init__(self, ny: int, nx: int, tile: int, XX: np.ndarray, YY: np.ndarray):
+        ty, tx = -(-ny // tile), -(-nx // tile)
+        rows = (np.arange(ny) // tile)[:, None] * tx
+        self.pix_tile = (rows + np.arange(nx) // tile).astype(np.intp).reshape(-1)
+        self.xx, self.yy = XX.reshape(-1), YY.reshape(-1)
+        cap = ny * nx + ty * tx  # every pixel near, plus every tile centre
+        self.qx = np.empty(cap, dtype=np.float32)
+        self.qy = np.empty(cap, dtype=np.float32)
+        self.sd = np.empty(cap, dtype=np.float32)
+        self.near_px = np.empty(ny * nx, dtype=bool)
+        self.tile_val = np.empty(ty * tx, dtype=np.float32)
+        self.sdf = np.empty((ny, nx), dtype=np.float32)
+        self._pts = np.empty((0, 3), dtype=np.float32)
+
+    def points(self, n: int) -> np.ndarray:
+        # Grown on demand: a slice rarely needs the full chunk_pts
+        if len(self._pts) < n:
+            self._pts = np.empty((n, 3), dtype=np.float32)
+        return self._pts
+
+    def queries(self, near: np.ndarray, tile_cx: np.ndarray, tile_cy: np.ndarray
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Query points for one slice: near pixels first, then far-tile centres."""
+        np.take(near.reshape(-1), self.pix_tile, out=self.near_px)
+        idx = np.flatnonzero(self.near_px)
+        far_t = np.flatnonzero(~near.reshape(-1))
+        n, N = idx.size, idx.size + far_t.size
+        np.take(self.xx, idx, out=self.qx[:n])
+        np.take(self.yy, idx, out=self.qy[:n])
+        np.take(tile_cx, far_t % len(tile_cx), out=self.qx[n:N])
+        np.take(tile_cy, far_t // len(tile_cx), out=self.qy[n:N])
+        return idx, far_t, self.qx[:N], self.qy[:N]
+
+    def fill_slice(self, idx: np.ndarray, far_t: np.ndarray, sd_flat: np.ndarray, margin: float) -> np.ndarray:
+        """Far tiles hold ±margin (sign from their centre), near pixels −sd."""
+        self.tile_val.fill(margin)
+        self.tile_val[far_t] = np.where(sd_flat[idx.size:] > 0, -margin, margin)
+        flat = self.sdf.reshape(-1)
+        np.take(self.tile_val, self.pix_tile, out=flat)
+        near_sd = sd_flat[:idx.size]
+        np.negative(near_sd, out=near_sd)  # trimesh is positive inside; the volume is negative inside
+        flat[idx] = near_sd
+        return self.sdf
+
+
+# Section endpoints are snapped to this grid (mm) so the shared vertex of
+# neighbouring segments, which mesh_plane returns a few ulps apart, is one node
+_SECTION_SNAP = 1e-9
+
+
+def _inside_even_odd(seg: np.ndarray, qx: np.ndarray, qy: np.ndarray) -> np.ndarray:
+    """
+    Even-odd point-in-section test of (qx, qy) against closed 2D segments
+    (n, 2, 2): the segments are polygonized and a point is inside when an odd
+    number of face outlines contain it (a hole's face nests in its outer ring's).
+    """
+    import shapely
+
+    snapped = np.round(seg / _SECTION_SNAP) * _SECTION_SNAP
+    faces = shapely.get_parts(shapely.polygonize(shapely.linestrings(snapped)))
+    inside = np.zeros(qx.size, dtype=bool)
+    for ring in shapely.polygons(shapely.get_exterior_ring(faces)):
+        inside ^= shapely.contains_xy(ring, qx, qy)
+    return inside
+
+
+def _section_signed_distance(m: trimesh.Trimesh, faces: np.ndarray, z: float,
+                             qx: np.ndarray, qy: np.ndarray) -> Optional[np.ndarray]:
+    """
+    In-plane signed distance (trimesh sign) from the z = const section of
+    ``faces``: Shapely STRtree nearest-segment distance plus an even-odd
+    polygon test for the sign. None if the plane misses every face.
+    """
+    import shapely
+
+    segs = trimesh.intersections.mesh_plane(m, [0.0, 0.0, 1.0], [0.0, 0.0, float(z)], local_faces=faces)
+    if len(segs) == 0:
+        return None
+    seg = np.asarray(segs, dtype=np.float64)[:, :, :2]
+    qx64, qy64 = qx.astype(np.float64), qy.astype(np.float64)
+    tree = shapely.STRtree(shapely.linestrings(seg))
+    (src, _), dist = tree.query_nearest(shapely.points(qx64, qy64), return_distance=True, all_matches=False)
+    d = np.empty(qx.size, dtype=np.float64)
+    d[src] = dist
+    signed = np.where(_inside_even_odd(seg, qx64, qy64), d, -d)
+    # Samples on the section count as inside, like the 3D query: rounding
+    # noise of either sign on a wall's grid samples leaves marching cubes
+    # output non-manifold there
+    signed[d <= _SECTION_SNAP] = _SECTION_SNAP
+    return signed.astype(np.float32)
+
+
+# Compact volume storage: values are clamped to ±(this many voxels) before
+# quantizing; marching cubes only reads values within ~1 voxel of zero.
+_TSDF_TRUNC_VOXELS = 4.0
+_MC_SLAB = 64  # slices decoded to float32 per marching-cubes call
+_COMPACT_DTYPES = {"float16": np.float16, "int8": np.int8}
+_VOLUME_BACKOFF = {"float32": "float16", "float16": "int8"}
+
+
+def _encode_slice(values: np.ndarray, dtype: str, trunc: float) -> np.ndarray:
+    """Truncate a float32 slice to ±trunc and quantize (int8 keeps every nonzero sign)."""
+    clipped = np.clip(values, -trunc, trunc)
+    if dtype == "float16":
+        return clipped.astype(np.float16)
+    q = np.rint(clipped * (127.0 / trunc))
+    q = np.where((q == 0) & (clipped != 0), np.sign(clipped), q)
+    return q.astype(np.int8)
+
+
+def _decode_slab(slab: np.ndarray, trunc: Optional[float]) -> np.ndarray:
+    if slab.dtype == np.int8:
+        return slab.astype(np.float32) * np.float32(trunc / 127.0)
+    return slab.astype(np.float32)
+
+
+def _marching_cubes_slabs(volume: np.ndarray, trunc: Optional[float],
+                          progress: Optional[Callable[[float], None]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Marching cubes over a compact volume, ``_MC_SLAB`` slices at a time
+    (slabs share one slice so every cube is visited once). Vertices are in
+    index units; seam vertices coincide exactly and are merged later.
+    """
+    nz = volume.shape[0]
+    verts_all, faces_all, offset = [], [], 0
+    for z0 in range(0, nz - 1, _MC_SLAB):
+        z1 = min(z0 + _MC_SLAB, nz - 1)
+        slab = _decode_slab(volume[z0:z1 + 1], trunc)
+        if slab.min() > 0.0 or slab.max() < 0.0:
+            continue
+        verts, faces, _, _ = marching_cubes(slab, level=0.0)
+        verts[:, 0] += z0
+        verts_all.append(verts)
+        faces_all.append(faces + offset)
+        offset += len(verts)
+        del slab
+        if progress:
+            progress(z1 / (nz - 1))
+    if not verts_all:
+        raise ValueError("Surface level must be within volume data range.")
+    return np.concatenate(verts_all), np.concatenate(faces_all)
+
+
+def _hole_field_size(s: Settings, o: str, bounds, shape, anchor_xy) -> Tuple[dict, int]:
+    """
+    Lattice centers per cylinder family and the number of (point, center)
+    cells the dense hole-field evaluation broadcasts over, which is what its
+    temporaries scale with.
+    """
+    xmin, xmax, ymin, ymax, zmin, zmax = bounds
+    nx, ny, nz = shape
+
+    def n_rows(a0, a1):
+        return len(np.arange(a0, a1 + 1e-6, s.spacing))
+
+    centers, cells = {}, 0
+    n_xy = len(_grid_centers_xy(xmin, xmax, ymin, ymax, s.spacing, s.stagger, s.grid_align, anchor_xy))
+    if 'z' in o:
+        centers["z"] = n_xy
+        cells += nx * ny * n_xy
+    if 'radial' in o:
+        centers["radial"] = n_xy
+        cells += nx * ny * n_xy
+    if 'x' in o:
+        centers["x"] = n_rows(ymin, ymax) * n_rows(zmin, zmax)
+        cells += ny * nz * centers["x"]
+    if 'y' in o:
+        centers["y"] = n_rows(xmin, xmax) * n_rows(zmin, zmax)
+        cells += nx * nz * centers["y"]
+    return centers, int(cells)
 
 
 # -----------------------------------------------------------------------------
 # Core algorithm (memory-resilient wrapper + single attempt)
 # -----------------------------------------------------------------------------
 
-def _perforate_once(mesh: trimesh.Trimesh, s: Settings,
-                    progress: Optional[Callable[[float], None]]) -> trimesh.Trimesh:
-    # rtree required for signed_distance
-    try:
-        import rtree  # noqa: F401
-    except Exception as e:
-        raise RuntimeError(
-            "rtree missing. Install with 'pip install rtree' "
-            "(Ubuntu: apt-get install libspatialindex-dev, macOS: brew install spatialindex)."
-        ) from e
+def grid_axes(m: trimesh.Trimesh, s: Settings) -> Tuple[Tuple[float, ...], Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Padded (xmin, xmax, ymin, ymax, zmin, zmax) and the sample coordinates along each axis."""
+    bmin, bmax = m.bounds
+    return grid_axes_for_bounds(bmin, bmax, s)
 
-    m = mesh.copy()
-    m.remove_unreferenced_vertices()
-    m.process(validate=True)
 
-    bmin, bmax = m.bounds
+def grid_axes_for_bounds(bmin: np.ndarray, bmax: np.ndarray, s: Settings
+                         ) -> Tuple[Tuple[float, ...], Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """grid_axes from the mesh bounds alone (float64 min/max corners), for pre-flight estimates."""
+    bmin, bmax = np.asarray(bmin, dtype=np.float64), np.asarray(bmax, dtype=np.float64)
     xmin, ymin, zmin = (bmin - s.padding).astype(np.float32)
     xmax, ymax, zmax = (bmax + s.padding).astype(np.float32)
-
-    centroid = m.centroid.astype(np.float32)
-    cx0, cy0, cz0 = centroid
-
     if s.zmin is not None:
         zmin = max(zmin, float(s.zmin) - s.padding)
     if s.zmax is not None:
         zmax = min(zmax, float(s.zmax) + s.padding)
-
     xs = np.arange(xmin, xmax, s.voxel, dtype=np.float32)
     ys = np.arange(ymin, ymax, s.voxel, dtype=np.float32)
     zs = np.arange(zmin, zmax, s.voxel, dtype=np.float32)
+    return (xmin, xmax, ymin, ymax, zmin, zmax), (xs, ys, zs)
 
-    nx, ny, nz = len(xs), len(ys), len(zs)
-    if nx < 2 or ny < 2 or nz < 2:
-        raise ValueError("Sampling grid too small. Decrease voxel or check model scale.")
-
-    o = s.orientations.lower()
-    want_x = ('x' in o)
-    want_y = ('y' in o)
-    want_z = ('z' in o)
-    want_rad = ('radial' in o)
-
-    cyl_xy = sdf_cylinders_Z(xs, ys, xmin, xmax, ymin, ymax,
-                             s.spacing, s.radius, s.stagger,
-                             align=s.grid_align, anchor_xy=(cx0, cy0)) if want_z else None
-    cyl_zy = sdf_cylinders_X(ys, zs, ymin, ymax, zmin, zmax,
-                             s.spacing, s.radius, s.stagger) if want_x else None
-    cyl_zx = sdf_cylinders_Y(xs, zs, xmin, xmax, zmin, zmax,
-                             s.spacing, s.radius, s.stagger) if want_y else None
-
-    radial_min_perp_sq = None
-    dz_min_sq_by_k = None
-    if want_rad:
-        radial_min_perp_sq = sdf_cylinders_RADIAL_prep(
-            xs, ys, xmin, xmax, ymin, ymax, s.spacing, s.stagger, cx0, cy0, align=s.grid_align
-        )
-        z_start = _start_aligned(zmin, s.spacing, cz0, s.grid_align)
-        z_rows = np.arange(z_start, zmax + 1e-6, s.spacing, dtype=np.float32)
-        dz_min_sq_by_k = np.array([np.min((zk - z_rows) ** 2) for zk in zs], dtype=np.float32)
-
-    volume = np.empty((nz, ny, nx), dtype=np.float32)
-    XX, YY = np.meshgrid(xs, ys, indexing='xy')
-
-    top_guard = (zmax - s.keep_top)
-    bot_guard = (zmin + s.keep_bottom)
 
-    for k, z in enumerate(zs):
-        # Build points in CHUNKS to keep mem bounded
-        N = XX.size
-        sd_flat = np.empty(N, dtype=np.float32)
-        start = 0
-        while start < N:
-            end = min(start + int(s.chunk_pts), N)
-            chunk_len = end - start
-            pts = np.empty((chunk_len, 3), dtype=np.float32)
-            flat_x = XX.ravel(order='C')[start:end]
-            flat_y = YY.ravel(order='C')[start:end]
-            pts[:, 0] = flat_x
-            pts[:, 1] = flat_y
-            pts[:, 2] = z
-            sd_chunk = trimesh.proximity.signed_distance(m, pts).astype(np.float32, copy=False)
-            sd_flat[start:end] = sd_chunk
-            start = end
-            del pts, sd_chunk
-            gc.collect()
+def prepare_mesh(mesh: trimesh.Trimesh) -> trimesh.Trimesh:
+    m = mesh.copy()
+    m.remove_unreferenced_vertices()
+    m.process(validate=True)
+    return m
 
-        sdf_mesh = (-sd_flat.reshape((ny, nx))).astype(np.float32)
-
-        parts: List[np.ndarray] = []
-        if cyl_xy is not None:
-            parts.append(cyl_xy)
-        if cyl_zy is not None:
-            parts.append(cyl_zy[k][:, None].repeat(nx, axis=1))
-        if cyl_zx is not None:
-            parts.append(cyl_zx[k][None, :].repeat(ny, axis=0))
-        if radial_min_perp_sq is not None:
-            dz_sq = float(dz_min_sq_by_k[k])
-            parts.append(np.sqrt(radial_min_perp_sq + dz_sq).astype(np.float32) - s.radius)
-
-        if parts:
-            sdf_holes = parts[0]
-            for p in parts[1:]:
-                sdf_holes = np.minimum(sdf_holes, p)
-        else:
-            sdf_holes = np.full_like(sdf_mesh, np.inf, dtype=np.float32)
 
-        # Shell-band gating (skip near base if open_bottom window active)
-        if s.shell_band is not None and s.shell_band > 0:
-            near_base_window = (s.open_bottom > 0 and z <= (float(bmin[2]) + s.open_bottom))
-            if not near_base_window:
-                mask_shell = (np.abs(sdf_mesh) <= s.shell_band)
-                sdf_holes = np.where(mask_shell, sdf_holes, np.inf)
+def _perforate_once(mesh: trimesh.Trimesh, s: Settings,
+                    progress: Optional[Callable[[float], None]],
+                    recorder: Optional[StageRecorder] = None,
+                    window: Optional[Tuple[int, int, int, int]] = None) -> trimesh.Trimesh:
+    """
+    One engine pass. With ``window`` = (i0, i1, j0, j1), only samples
+    xs[i0:i1] × ys[j0:j1] of the full grid are computed and the tile's raw
+    marching-cubes surface is returned (world coordinates derived from
+    global sample indices, so neighbouring tiles agree bit for bit on their
+    shared sample column/row); see tiling.py for planning and stitching.
+    """
+    # rtree required for signed_distance
+    try:
+        import rtree  # noqa: F401
+    except Exception as e:
+        raise RuntimeError(
+            "rtree missing. Install with 'pip install rtree' "
+            "(Ubuntu: apt-get install libspatialindex-dev, macOS: brew install spatialindex)."
+        ) from e
 
-        if (z >= top_guard) or (z <= bot_guard):
-            sdf_holes[:] = np.inf
+    rec = recorder if recorder is not None else StageRecorder()
+
+    with rec.stage("process"):
+        m = prepare_mesh(mesh)
+
+    with rec.stage("grid_setup"):
+        bmin, bmax = m.bounds
+        (xmin, xmax, ymin, ymax, zmin, zmax), (xs, ys, zs) = grid_axes(m, s)
+
+        centroid = m.centroid.astype(np.float32)
+        cx0, cy0, cz0 = centroid
+
+        if window is not None:
+            # One XY tile of the full grid; lattices stay anchored to the full bounds
+            i0, i1, j0, j1 = window
+            xs, ys = xs[i0:i1], ys[j0:j1]
+
+        nx, ny, nz = len(xs), len(ys), len(zs)
+        if nx < 2 or ny < 2 or nz < 2:
+            raise ValueError("Sampling grid too small. Decrease voxel or check model scale.")
+
+        o = s.orientations.lower()
+        want_x = ('x' in o)
+        want_y = ('y' in o)
+        want_z = ('z' in o)
+        want_rad = ('radial' in o)
+        rec.info["grid"] = {"nx": nx, "ny": ny, "nz": nz, "points": nx * ny * nz}
+        rec.info["triangles_in"] = int(len(m.faces))
+        rec.info["orientations"] = o
+        rec.info["chunk_pts"] = int(s.chunk_pts)
+        rec.info["centers"], rec.info["hole_cells"] = _hole_field_size(
+            s, o, (xmin, xmax, ymin, ymax, zmin, zmax), (nx, ny, nz), (cx0, cy0))
+
+        compact = s.volume_dtype in _COMPACT_DTYPES
+        trunc = _TSDF_TRUNC_VOXELS * s.voxel
+        volume = np.empty((nz, ny, nx), dtype=_COMPACT_DTYPES.get(s.volume_dtype, np.float32))
+        # Compact volumes are composed in a float32 slice, then quantized
+        slice_buf = np.empty((ny, nx), dtype=np.float32) if compact else None
+        rec.info["volume_mb"] = round(volume.nbytes / (1024 * 1024), 1)
+        rec.info["volume_dtype"] = s.volume_dtype
+        XX, YY = np.meshgrid(xs, ys, indexing='xy')
+
+        top_guard = (zmax - s.keep_top)
+        bot_guard = (zmin + s.keep_bottom)
+
+    with rec.stage("hole_fields"):
+        cyl_xy = sdf_cylinders_Z(xs, ys, xmin, xmax, ymin, ymax,
+                                 s.spacing, s.radius, s.stagger,
+                                 align=s.grid_align, anchor_xy=(cx0, cy0)) if want_z else None
+        cyl_zy = sdf_cylinders_X(ys, zs, ymin, ymax, zmin, zmax,
+                                 s.spacing, s.radius, s.stagger) if want_x else None
+        cyl_zx = sdf_cylinders_Y(xs, zs, xmin, xmax, zmin, zmax,
+                                 s.spacing, s.radius, s.stagger) if want_y else None
+
+        radial_min_perp_sq = None
+        dz_min_sq_by_k = None
+        if want_rad:
+            radial_min_perp_sq = sdf_cylinders_RADIAL_prep(
+                xs, ys, xmin, xmax, ymin, ymax, s.spacing, s.stagger, cx0, cy0, align=s.grid_align
+            )
+            z_start = _start_aligned(zmin, s.spacing, cz0, s.grid_align)
+            z_rows = np.arange(z_start, zmax + 1e-6, s.spacing, dtype=np.float32)
+            dz_min_sq_by_k = np.array([np.min((zk - z_rows) ** 2) for zk in zs], dtype=np.float32)
+        has_holes = any(f is not None for f in (cyl_xy, cyl_zy, cyl_zx, radial_min_perp_sq))
+
+    with rec.stage("grid_setup"):
+        # Per-slice tight bounds: only pixels within ``margin`` of the part
+        # of the surface near the slice get a signed-distance query. Other
+        # tiles cannot contain the surface, so one query at the tile centre
+        # gives their sign and they hold ±margin: a lower bound on the true
+        # distance that stays outside the shell band, so the zero level set
+        # (and the marching-cubes output) is unchanged.
+        tri = m.triangles
+        tri_z_lo, tri_z_hi = tri[:, :, 2].min(axis=1), tri[:, :, 2].max(axis=1)
+        margin = float(s.shell_band or 0.0) + 2.0 * s.voxel
+        band = margin + s.voxel
+        T = _SLICE_TILE
+        ty, tx = -(-ny // T), -(-nx // T)
+        tile_cx = XX[0, np.minimum(np.arange(tx) * T + T // 2, nx - 1)]
+        tile_cy = YY[np.minimum(np.arange(ty) * T + T // 2, ny - 1), 0]
+        sdf_points = 0
+
+        # Section backend (watertight meshes only: the sign is an even-odd test)
+        use_section = (s.sdf_backend == "section") and bool(m.is_watertight)
+        tri_steep_nz = np.abs(m.face_normals[:, 2]) if use_section else None
+        max_nz = float(np.sin(np.radians(_SECTION_MAX_TILT_DEG)))
+        section_slices = 0
+        ws = _SliceWorkspace(ny, nx, T, XX, YY)
 
-        volume[k] = np.maximum(sdf_mesh, -sdf_holes)
+    for k, z in enumerate(zs):
+        with rec.stage("signed_distance"):
+            sel = (tri_z_lo <= z + band) & (tri_z_hi >= z - band)
+            lo, hi = _clipped_xy_bounds(tri[sel], float(z) - band, float(z) + band)
+            near = _near_tiles(xs, ys, lo, hi, margin, T)
+            idx, far_t, qx, qy = ws.queries(near, tile_cx, tile_cy)
+
+            sd_flat = None
+            if use_section and not np.any(tri_steep_nz[sel] > max_nz):
+                sd_flat = _section_signed_distance(m, np.flatnonzero(sel), float(z), qx, qy)
+            if sd_flat is None:
+                sd_flat = _mesh_signed_distance(m, qx, qy, float(z), s.chunk_pts, ws)
+            else:
+                section_slices += 1
+            sdf_points += qx.size
+            sdf_mesh = ws.fill_slice(idx, far_t, sd_flat, margin)
+
+        with rec.stage("hole_fields"):
+            # Holes only matter inside the shell band (everywhere near an
+            # open bottom); the kernel perforates just those pixels.
+            if (z < top_guard) and (z > bot_guard) and has_holes:
+                near_base_window = (s.open_bottom > 0 and z <= (float(bmin[2]) + s.open_bottom))
+                gated = s.shell_band is not None and s.shell_band > 0 and not near_base_window
+                kernels.apply_slice_holes(
+                    (slice_buf if compact else volume[k]).reshape(-1), sdf_mesh.reshape(-1), nx,
+                    band=float(s.shell_band) if gated else None,
+                    cyl_xy=cyl_xy,
+                    cyl_y_k=None if cyl_zy is None else cyl_zy[k],
+                    cyl_x_k=None if cyl_zx is None else cyl_zx[k],
+                    radial=radial_min_perp_sq,
+                    dz_sq=None if dz_min_sq_by_k is None else float(dz_min_sq_by_k[k]),
+                    radius=s.radius,
+                )
+            elif compact:
+                slice_buf[:] = sdf_mesh
+            else:
+                volume[k] = sdf_mesh
+            if compact:
+                volume[k] = _encode_slice(slice_buf, s.volume_dtype, trunc)
 
         if progress:
             progress((k + 1) / nz)
 
-        del sd_flat, sdf_mesh, sdf_holes
-        gc.collect()
-
-    verts, faces, _, _ = marching_cubes(volume, level=0.0,
-                                        spacing=(s.voxel, s.voxel, s.voxel))
+    rec.info["sdf_points"] = int(sdf_points)
+    rec.info["sdf_backend"] = "section" if use_section else "mesh"
+    if use_section:
+        rec.info["section_slices"] = int(section_slices)
+
+    if window is not None:
+        with rec.stage("marching_cubes"):
+            try:
+                verts, faces = _marching_cubes_slabs(volume, trunc if compact else None,
+                                                     lambda f: rec.report("marching_cubes", f))
+            except ValueError:
+                # No surface crosses this tile
+                return trimesh.Trimesh(vertices=np.empty((0, 3)), faces=np.empty((0, 3), dtype=np.int64),
+                                       process=False)
+            idx = verts[:, ::-1].astype(np.float64) + (i0, j0, 0)
+            origin = np.array([xmin, ymin, zmin], dtype=np.float64)
+            verts_world = (origin + idx * s.voxel).astype(np.float32)
+        return trimesh.Trimesh(vertices=verts_world, faces=faces, process=False)
+
+    with rec.stage("marching_cubes"):
+        if compact:
+            verts, faces = _marching_cubes_slabs(volume, trunc, lambda f: rec.report("marching_cubes", f))
+            verts *= s.voxel
+        else:
+            verts, faces, _, _ = marching_cubes(volume, level=0.0,
+                                                spacing=(s.voxel, s.voxel, s.voxel))
     verts_world = np.column_stack([verts[:, 2] + xmin, verts[:, 1] + ymin, verts[:, 0] + zmin])
 
-    out = trimesh.Trimesh(vertices=verts_world, faces=faces, process=False)
-    out.remove_unreferenced_vertices()
+    with rec.stage("post_process"):
+        out = trimesh.Trimesh(vertices=verts_world, faces=faces, process=False)
+        out.remove_unreferenced_vertices()
+        out = finish_mesh(out, rec)
+    rec.info["triangles_out"] = int(len(out.faces))
+    return out
+
+
+# Share of post-processing time spent in process(validate=True) (merging,
+# degenerate/duplicate faces); fix_normals takes the rest
+_POST_PROCESS_VALIDATE_SHARE = 0.6
+
+
+def finish_mesh(out: trimesh.Trimesh, rec: StageRecorder) -> trimesh.Trimesh:
+    """Validate (merging vertices) and orient the surface, reporting progress between steps."""
     out.process(validate=True)
+    rec.report("post_process", _POST_PROCESS_VALIDATE_SHARE)
     try:
         out.fix_normals()
     except Exception:
         pass
+    rec.report("post_process", 1.0)
     return out
 
 
 def perforate_mesh_sdf(mesh: trimesh.Trimesh, s: Settings,
-                       progress: Optional[Callable[[float], None]] = None) -> trimesh.Trimesh:
-    """Memory-resilient wrapper around _perforate_once with backoff & retries."""
+                       progress: Optional[Callable[[float], None]] = None,
+                       recorder: Optional[StageRecorder] = None) -> trimesh.Trimesh:
+    """
+    Memory-resilient wrapper around _perforate_once with backoff & retries.
+    ``recorder`` (optional) accumulates per-stage wall time across attempts.
+    """
     attempt = 0
     voxel0 = float(s.voxel)
     last_err = None
     while attempt < max(1, int(s.mem_tries)):
         try:
-            return _perforate_once(mesh, s, progress)
+            return _perforate_once(mesh, s, progress, recorder)
         except (MemoryError, np.core._exceptions._ArrayMemoryError) as e:  # type: ignore[attr-defined]
             last_err = e
             attempt += 1
             if not s.mem_retry or attempt >= int(s.mem_tries):
                 raise
-            # Backoffs
+            # Backoffs: compact the volume first (keeps the voxel), then coarsen
             s.chunk_pts = max(250_000, int(s.chunk_pts * 0.65))
-            s.voxel = min(max(voxel0, s.voxel * 1.10), voxel0 * 1.8)
+            if s.volume_dtype in _VOLUME_BACKOFF:
+                s.volume_dtype = _VOLUME_BACKOFF[s.volume_dtype]
+            else:
+                s.voxel = min(max(voxel0, s.voxel * 1.10), voxel0 * 1.8)
+            if recorder is not None:
+                recorder.info["mem_retries"] = attempt
             gc.collect()
             time.sleep(float(s.mem_delay))
         except Exception as e:
@@ -0,0 +1,77 @@
+# backend/desolidify_engine/instrument.py
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+# Listener signature: (event, stage) with event in {"start", "end"}
+StageListener = Callable[[str, str], None]
+# Progress listener signature: (stage, fraction of that stage done)
+ProgressListener = Callable[[str, float], None]
+
+
+class StageRecorder:
+    """
+    Accumulates wall time per named stage. Stages entered repeatedly (e.g.
+    once per z-slice) add up; ``info`` holds sizes and counts worth keeping
+    next to the timings (grid shape, triangle counts, ...).
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.info: Dict[str, Any] = {}
+        self._listeners: List[StageListener] = []
+        self._progress_listeners: List[ProgressListener] = []
+
+    def add_listener(self, fn: StageListener) -> None:
+        self._listeners.append(fn)
+
+    def add_progress_listener(self, fn: ProgressListener) -> None:
+        self._progress_listeners.append(fn)
+
+    def remove_listener(self, fn: StageListener) -> None:
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def remove_progress_listener(self, fn: ProgressListener) -> None:
+        if fn in self._progress_listeners:
+            self._progress_listeners.remove(fn)
+
+    def report(self, name: str, frac: float) -> None:
+        """Progress from inside a long stage (e.g. post-processing sub-steps)."""
+        for fn in self._progress_listeners:
+            try:
+                fn(name, float(frac))
+            except Exception:
+                pass
+
+    def _notify(self, event: str, name: str) -> None:
+        for fn in self._listeners:
+            try:
+                fn(event, name)
+            except Exception:
+                pass
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + float(seconds)
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self._notify("start", name)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+            self._notify("end", name)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "stages": {k: round(v, 6) for k, v in self.stages.items()},
+            "calls": dict(self.calls),
+            "total_s": round(sum(self.stages.values()), 6),
+            **self.info,
+        }
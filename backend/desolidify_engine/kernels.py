@@ -0,0 +1,119 @@
+# backend/desolidify_engine/kernels.py
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+import numpy as np
+
+# Optional JIT: fused per-slice kernels when numba is importable, NumPy otherwise
+try:
+    import numba
+    HAVE_NUMBA = True
+except Exception:  # pragma: no cover - numba is optional
+    numba = None
+    HAVE_NUMBA = False
+
+_EMPTY = np.empty(0, dtype=np.float32)
+
+
+def numba_enabled() -> bool:
+    # NUMBA_DISABLE_JIT=1 would run the kernels as (very slow) Python; use NumPy then
+    return HAVE_NUMBA and os.environ.get("NUMBA_DISABLE_JIT", "0") != "1"
+
+
+# -----------------------------------------------------------------------------
+# NumPy path
+# -----------------------------------------------------------------------------
+
+def hole_field_at(idx: np.ndarray, nx: int,
+                  cyl_xy: Optional[np.ndarray],
+                  cyl_y_k: Optional[np.ndarray],
+                  cyl_x_k: Optional[np.ndarray],
+                  radial_min_perp_sq: Optional[np.ndarray],
+                  dz_sq: Optional[float],
+                  radius: float) -> np.ndarray:
+    """
+    Minimum hole SDF over every cylinder family at the flat slice indices
+    ``idx`` only. ``cyl_y_k``/``cyl_x_k`` are slice k of the X-/Y-axis fields,
+    which vary along y resp. x alone; gathering them by row/column avoids
+    materializing the full (ny, nx) slice.
+    """
+    out = np.full(idx.size, np.inf, dtype=np.float32)
+    if cyl_xy is not None:
+        np.minimum(out, cyl_xy.reshape(-1)[idx], out=out)
+    if cyl_y_k is not None:
+        np.minimum(out, cyl_y_k[idx // nx], out=out)
+    if cyl_x_k is not None:
+        np.minimum(out, cyl_x_k[idx % nx], out=out)
+    if radial_min_perp_sq is not None:
+        radial = np.sqrt(radial_min_perp_sq.reshape(-1)[idx] + dz_sq).astype(np.float32) - radius
+        np.minimum(out, radial, out=out)
+    return out
+
+
+def _apply_slice_holes_numpy(out, sdf, nx, band, cyl_xy, cyl_y_k, cyl_x_k, radial, dz_sq, radius) -> None:
+    out[:] = sdf
+    idx = np.flatnonzero(np.abs(sdf) <= band) if band is not None else np.arange(sdf.size)
+    if idx.size:
+        holes = hole_field_at(idx, nx, cyl_xy, cyl_y_k, cyl_x_k, radial, dz_sq, radius)
+        out[idx] = np.maximum(out[idx], -holes)
+
+
+# -----------------------------------------------------------------------------
+# Numba path: one pass over the slice, no temporaries
+# -----------------------------------------------------------------------------
+
+if HAVE_NUMBA:
+    @numba.njit(cache=True, nogil=True)
+    def _apply_slice_holes_jit(out, sdf, nx, gate, band, cyl_xy, cyl_y, cyl_x, radial, dz_sq, radius):  # pragma: no cover - compiled
+        use_xy = cyl_xy.size > 0
+        use_y = cyl_y.size > 0
+        use_x = cyl_x.size > 0
+        use_rad = radial.size > 0
+        inf = np.float32(np.inf)
+        for p in range(sdf.size):
+            v = sdf[p]
+            if gate and not (abs(v) <= band):
+                out[p] = v
+                continue
+            h = inf
+            if use_xy:
+                h = min(h, cyl_xy[p])
+            if use_y:
+                h = min(h, cyl_y[p // nx])
+            if use_x:
+                h = min(h, cyl_x[p % nx])
+            if use_rad:
+                h = min(h, np.sqrt(radial[p] + dz_sq) - radius)
+            out[p] = max(v, -h)
+
+
+def apply_slice_holes(out: np.ndarray, sdf: np.ndarray, nx: int, *,
+                      band: Optional[float],
+                      cyl_xy: Optional[np.ndarray] = None,
+                      cyl_y_k: Optional[np.ndarray] = None,
+                      cyl_x_k: Optional[np.ndarray] = None,
+                      radial: Optional[np.ndarray] = None,
+                      dz_sq: Optional[float] = None,
+                      radius: float = 0.0,
+                      use_numba: Optional[bool] = None) -> None:
+    """
+    Write ``max(sdf, -holes)`` into the flat slice ``out``, where holes is
+    the minimum over the given cylinder families; with ``band`` set only
+    pixels with ``|sdf| <= band`` are perforated (shell gating). All arrays
+    are float32; 2-D fields are passed flat or (ny, nx).
+    """
+    if use_numba is None:
+        use_numba = numba_enabled()
+    if use_numba:
+        _apply_slice_holes_jit(
+            out, sdf, int(nx), band is not None, np.float32(band if band is not None else 0.0),
+            _EMPTY if cyl_xy is None else cyl_xy.reshape(-1),
+            _EMPTY if cyl_y_k is None else cyl_y_k,
+            _EMPTY if cyl_x_k is None else cyl_x_k,
+            _EMPTY if radial is None else radial.reshape(-1),
+            np.float32(dz_sq or 0.0), np.float32(radius),
+        )
+    else:
+        _apply_slice_holes_numpy(out, sdf, nx, band, cyl_xy, cyl_y_k, cyl_x_k, radial, dz_sq, radius)
@@ -7,7 +7,8 @@ from typing import Any, Callable, Dict, Optional
 import trimesh
 
 from backend.desolidify_engine.settings import Settings, from_params, clamp_settings
-from backend.desolidify_engine.engine import perforate_mesh_sdf
+from backend.desolidify_engine.engine import perforate_mesh_sdf, load_mesh_bytes
+from backend.desolidify_engine.stl_io import write_binary_stl
 
 
 def run_preview_mesh(mesh: trimesh.Trimesh, params: Dict[str, Any],
@@ -29,12 +30,9 @@ def run_preview_bytes(stl_bytes: bytes, params: Dict[str, Any]) -> bytes:
     """
     Load STL from bytes, run coarse pass, return STL bytes.
     """
-    # Load mesh from memory
-    f = io.BytesIO(stl_bytes)
-    mesh = trimesh.load(f, file_type="stl")
-    if not isinstance(mesh, trimesh.Trimesh):
-        mesh = mesh.dump().sum()
+    # Load mesh from memory (zero-copy for binary STL)
+    mesh = load_mesh_bytes(stl_bytes)
     result = run_preview_mesh(mesh, params)
     out = io.BytesIO()
-    result.export(out, file_type="stl")
+    write_binary_stl(out, result.vertices, result.faces, normals=result.face_normals)
     return out.getvalue()
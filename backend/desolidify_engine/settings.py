@@ -3,8 +3,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass, asdict
 from typing import Any, Dict, Optional
+import hashlib
+import json
 import logging
 
+from .version import __version__
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,6 +39,8 @@ class Settings:
     mem_retry: bool = True
     mem_delay: float = 12.0
     mem_tries: int = 6
+    sdf_backend: str = "mesh"  # 'mesh' (3D queries) | 'section' (2D sections)
+    volume_dtype: str = "float32"  # 'float32' | 'float16' | 'int8' (truncated SDF)
 
     # Internal/transient
     _fast_factor: int = 0  # 0..2
@@ -60,6 +66,11 @@ _PARAM_RANGES = {
     "mem_delay":   {"min": 5.0,  "max": 60.0},
     "mem_tries":   {"min": 1,    "max": 10},
 }
+_SDF_BACKENDS = ("mesh", "section")
+_VOLUME_DTYPES = ("float32", "float16", "int8")
+# Fields that do not change the output geometry (I/O paths, chunking, memory
+# retries); result fingerprints leave them out
+NON_GEOMETRY_FIELDS = frozenset({"in_dir", "out_dir", "chunk_pts", "mem_retry", "mem_delay", "mem_tries"})
 
 
 def _clamp(v, lo=None, hi=None, *, min=None, max=None, **extra):
@@ -101,6 +112,10 @@ def clamp_settings(s: Settings) -> Settings:
     s.chunk_pts = int(_clamp(int(s.chunk_pts), **_PARAM_RANGES["chunk"]))
     s.mem_delay = float(_clamp(float(s.mem_delay), **_PARAM_RANGES["mem_delay"]))
     s.mem_tries = int(_clamp(int(s.mem_tries), **_PARAM_RANGES["mem_tries"]))
+    if s.sdf_backend not in _SDF_BACKENDS:
+        s.sdf_backend = "mesh"
+    if s.volume_dtype not in _VOLUME_DTYPES:
+        s.volume_dtype = "float32"
     # Enforce web thickness ≥ 2*radius + shell_band
     min_spacing = max(s.spacing, 2.0 * s.radius + s.shell_band)
     s.spacing = float(_clamp(min_spacing, **_PARAM_RANGES["spacing"]))
@@ -128,8 +143,22 @@ def from_params(params: Dict[str, Any]) -> Settings:
         mem_retry=not bool(params.get("mem_retry_off", False)),
         mem_delay=float(params.get("mem_delay", Settings.mem_delay)),
         mem_tries=int(params.get("mem_tries", Settings.mem_tries)),
+        sdf_backend=str(params.get("sdf_backend", Settings.sdf_backend)),
+        volume_dtype=str(params.get("volume_dtype", Settings.volume_dtype)),
         _fast_factor=int(params.get("fast", 0)),
     )
     if s._fast_factor > 0:
         s.voxel = max(s.voxel, 0.6 + 0.3 * int(s._fast_factor))
     return clamp_settings(s)
+
+
+def settings_fingerprint(s: Settings, **extra: Any) -> str:
+    """
+    SHA-256 of the geometry-relevant settings and the engine version (plus
+    ``extra``, e.g. the input hash): equal fingerprints mean equal output.
+    Shared by the result cache and the CLI's up-to-date stamps.
+    """
+    geometry = {k: v for k, v in asdict(s).items() if k not in NON_GEOMETRY_FIELDS}
+    blob = json.dumps({**extra, "settings": geometry, "engine": __version__},
+                      sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
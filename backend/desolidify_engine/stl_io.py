@@ -0,0 +1,175 @@
+# backend/desolidify_engine/stl_io.py
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Binary STL layout: 80-byte header, uint32 triangle count, then 50-byte records
+# -----------------------------------------------------------------------------
+
+STL_HEADER_SIZE = 80
+STL_DATA_OFFSET = STL_HEADER_SIZE + 4
+STL_RECORD = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("vertices", "<f4", (3, 3)),
+    ("attr", "<u2"),
+])
+assert STL_RECORD.itemsize == 50
+
+
+def binary_stl_count(head: bytes, size: int) -> Optional[int]:
+    """
+    Triangle count if ``head`` (≥ 84 bytes) + total ``size`` describe a binary
+    STL, else None. The size check is authoritative: many binary exporters
+    also start their header with ``solid``.
+    """
+    if size < STL_DATA_OFFSET or len(head) < STL_DATA_OFFSET:
+        return None
+    n = int(np.frombuffer(head, dtype="<u4", count=1, offset=STL_HEADER_SIZE)[0])
+    if size != STL_DATA_OFFSET + n * STL_RECORD.itemsize:
+        return None
+    return n
+
+
+def read_binary_stl_records(source: Path | bytes | bytearray | memoryview) -> Optional[np.ndarray]:
+    """
+    Zero-copy view of the triangle records of a binary STL: ``np.memmap`` for
+    paths, ``np.frombuffer`` for in-memory data. None if not binary STL.
+    """
+    if isinstance(source, Path):
+        size = source.stat().st_size
+        with open(source, "rb") as f:
+            head = f.read(STL_DATA_OFFSET)
+        n = binary_stl_count(head, size)
+        if n is None:
+            return None
+        if n == 0:
+            return np.empty(0, dtype=STL_RECORD)
+        return np.memmap(source, dtype=STL_RECORD, mode="r", offset=STL_DATA_OFFSET, shape=(n,))
+
+    buf = memoryview(source).cast("B")
+    n = binary_stl_count(bytes(buf[:STL_DATA_OFFSET]), buf.nbytes)
+    if n is None:
+        return None
+    return np.frombuffer(buf, dtype=STL_RECORD, count=n, offset=STL_DATA_OFFSET)
+
+
+def _hash32(bits: np.ndarray) -> np.ndarray:
+    """Murmur-style 32-bit mix of the three uint32 coordinate columns."""
+    h = bits[:, 0] * np.uint32(0x9E3779B1)
+    h ^= h >> np.uint32(15)
+    h += bits[:, 1]
+    h *= np.uint32(0x85EBCA77)
+    h ^= h >> np.uint32(13)
+    h += bits[:, 2]
+    h *= np.uint32(0xC2B2AE3D)
+    h ^= h >> np.uint32(16)
+    return h
+
+
+def weld_vertices(corners: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge bit-identical float32 corners (..., 3) into unique vertices.
+    Returns (vertices (M, 3), inverse (N,)) with ``vertices[inverse] == corners``.
+
+    Sorts packed ``hash32 << 32 | index`` keys (a plain value sort, much
+    cheaper than argsort), takes each hash run's first corner as its vertex,
+    then verifies every corner against its vertex. The few corners that lost
+    to a hash collision are de-duplicated exactly and appended.
+    """
+    src = np.asarray(corners)
+    n = src.size // 3
+    pts = np.empty((n, 3), dtype=np.float32)
+    # +0.0 folds -0.0 into 0.0 so both weld together (and makes a packed copy)
+    np.add(src, np.float32(0.0), out=pts.reshape(src.shape), casting="unsafe")
+    if n == 0:
+        return pts, np.empty(0, dtype=np.int64)
+    if n >= 2 ** 32:  # pragma: no cover - index would not fit the packed key
+        uniq, inverse = np.unique(pts, axis=0, return_inverse=True)
+        return uniq, inverse.ravel()
+
+    bits = pts.view(np.uint32)
+    packed = _hash32(bits).astype(np.uint64) << np.uint64(32)
+    packed |= np.arange(n, dtype=np.uint64)
+    packed.sort()
+    order = (packed & np.uint64(0xFFFFFFFF)).astype(np.intp)
+    packed >>= np.uint64(32)
+    new_run = np.empty(n, dtype=bool)
+    new_run[0] = True
+    np.not_equal(packed[1:], packed[:-1], out=new_run[1:])
+    del packed
+
+    run_ids = np.cumsum(new_run) - 1
+    inverse = np.empty(n, dtype=np.int64)
+    inverse[order] = run_ids
+    verts = pts[order[new_run]]
+    del order, run_ids, new_run
+
+    vb = np.take(verts.view(np.uint32), inverse, axis=0)
+    mismatch = vb[:, 0] != bits[:, 0]
+    mismatch |= vb[:, 1] != bits[:, 1]
+    mismatch |= vb[:, 2] != bits[:, 2]
+    bad = np.flatnonzero(mismatch)
+    if bad.size:
+        extra, extra_inv = np.unique(pts[bad], axis=0, return_inverse=True)
+        inverse[bad] = len(verts) + extra_inv.ravel()
+        verts = np.concatenate([verts, extra])
+    return verts, inverse
+
+
+def load_binary_stl(source: Path | bytes | bytearray | memoryview) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Fast path for binary STL → (vertices float64 (M, 3), faces int64 (F, 3)).
+    Returns None for ASCII or malformed input so callers can fall back.
+    """
+    rec = read_binary_stl_records(source)
+    if rec is None:
+        return None
+    verts, inverse = weld_vertices(rec["vertices"])
+    return verts.astype(np.float64), inverse.reshape(-1, 3)
+
+
+# Faces per record batch when streaming (≈ 12.5 MB of records)
+_WRITE_CHUNK_FACES = 262_144
+_DEFAULT_HEADER = b"desolidify-web binary STL"
+
+
+def write_binary_stl(f, vertices: np.ndarray, faces: np.ndarray, *,
+                     normals: Optional[np.ndarray] = None,
+                     header: bytes = _DEFAULT_HEADER,
+                     chunk_faces: int = _WRITE_CHUNK_FACES,
+                     progress: Optional[Callable[[float], None]] = None) -> int:
+    """
+    Stream a binary STL to the writable ``f`` straight from vertex/face arrays.
+    Records are built in a reused batch buffer, so memory stays bounded by
+    ``chunk_faces`` regardless of mesh size. Missing normals are computed per
+    batch; ``progress`` gets the fraction written after each one. Returns the
+    number of triangles written.
+    """
+    faces = np.asarray(faces)
+    n = len(faces)
+    f.write(header[:STL_HEADER_SIZE].ljust(STL_HEADER_SIZE, b"\0"))
+    f.write(np.uint32(n).tobytes())
+    if n == 0:
+        return 0
+
+    batch = np.zeros(min(n, int(chunk_faces)), dtype=STL_RECORD)
+    for start in range(0, n, len(batch)):
+        end = min(start + len(batch), n)
+        rec = batch[: end - start]
+        tri = vertices[faces[start:end]]
+        rec["vertices"] = tri
+        if normals is not None:
+            rec["normal"] = normals[start:end]
+        else:
+            nrm = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+            length = np.linalg.norm(nrm, axis=1, keepdims=True)
+            np.divide(nrm, length, out=nrm, where=length > 0)
+            rec["normal"] = nrm
+        f.write(rec.view(np.uint8))
+        if progress:
+            progress(end / n)
+    return n
@@ -0,0 +1,321 @@
+# backend/desolidify_engine/tiling.py
+from __future__ import annotations
+
+import io
+import json
+import math
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import trimesh
+
+from .instrument import StageRecorder
+from .settings import Settings
+from .version import __version__
+
+# XY tiling for parts whose footprint makes one grid too large. Tiles share
+# one sample column/row with each neighbour, so every marching cube belongs to
+# exactly one tile and seam vertices come out identical on both sides; the
+# stitched surface is welded by exact vertex merging.
+
+TILE_DIRNAME = "tiles"
+PLAN_NAME = "plan.json"
+# Smallest tile side (in cubes) worth the per-tile overhead
+_MIN_TILE_CUBES = 16
+# Seconds between claim heartbeats while a tile is being computed
+_HEARTBEAT_S = 5.0
+
+
+@dataclass
+class Tile:
+    index: int
+    i0: int  # sample range xs[i0:i1]
+    i1: int
+    j0: int  # sample range ys[j0:j1]
+    j1: int
+
+    @property
+    def window(self):
+        return (self.i0, self.i1, self.j0, self.j1)
+
+    def points(self, nz: int) -> int:
+        return (self.i1 - self.i0) * (self.j1 - self.j0) * nz
+
+
+# -----------------------------------------------------------------------------
+# Planning, running, stitching
+# -----------------------------------------------------------------------------
+
+def _split(n_samples: int, parts: int) -> List[tuple]:
+    """Split samples 0..n-1 into ``parts`` ranges sharing their end samples."""
+    cuts = np.linspace(0, n_samples - 1, parts + 1).round().astype(int)
+    return [(int(a), int(b) + 1) for a, b in zip(cuts[:-1], cuts[1:])]
+
+
+def plan_tiles(mesh: trimesh.Trimesh, s: Settings, max_points: int) -> List[Tile]:
+    """
+    Overlapping XY tiles of the full sampling grid, each with at most
+    ``max_points`` samples where the tile floor allows. A single tile means
+    the part fits without tiling.
+    """
+    from .engine import grid_axes, prepare_mesh
+
+    _, (xs, ys, zs) = grid_axes(prepare_mesh(mesh), s)
+    nx, ny, nz = len(xs), len(ys), len(zs)
+    if max_points <= 0 or nx * ny * nz <= max_points:
+        return [Tile(0, 0, nx, 0, ny)]
+    side = max(_MIN_TILE_CUBES, int(math.sqrt(max_points / max(1, nz))) - 1)
+    tx = max(1, math.ceil((nx - 1) / side))
+    ty = max(1, math.ceil((ny - 1) / side))
+    tiles = []
+    for j0, j1 in _split(ny, ty):
+        for i0, i1 in _split(nx, tx):
+            tiles.append(Tile(len(tiles), i0, i1, j0, j1))
+    return tiles
+
+
+def run_tile(mesh: trimesh.Trimesh, s: Settings, tile: Tile,
+             progress: Optional[Callable[[float], None]] = None,
+             recorder: Optional[StageRecorder] = None) -> trimesh.Trimesh:
+    """Raw (unwelded) surface of one tile. No memory backoff: tiles must share one voxel."""
+    from .engine import _perforate_once
+
+    return _perforate_once(mesh, s, progress, recorder, window=tile.window)
+
+
+def stitch(parts: Sequence[trimesh.Trimesh], recorder: Optional[StageRecorder] = None) -> trimesh.Trimesh:
+    """Concatenate tile surfaces, weld the seams and post-process like the engine."""
+    from .engine import finish_mesh
+
+    rec = recorder if recorder is not None else StageRecorder()
+    with rec.stage("post_process"):
+        parts = [p for p in parts if len(p.faces)]
+        if not parts:
+            raise ValueError("Surface level must be within volume data range.")
+        offsets = np.cumsum([0] + [len(p.vertices) for p in parts[:-1]])
+        verts = np.concatenate([p.vertices for p in parts])
+        faces = np.concatenate([p.faces + off for p, off in zip(parts, offsets)])
+        out = trimesh.Trimesh(vertices=verts, faces=faces, process=False)
+        out.remove_unreferenced_vertices()
+        out = finish_mesh(out, rec)
+    rec.info["triangles_out"] = int(len(out.faces))
+    return out
+
+
+def perforate_tiled(mesh: trimesh.Trimesh, s: Settings, max_points: int,
+                    progress: Optional[Callable[[float], None]] = None,
+                    recorder: Optional[StageRecorder] = None) -> trimesh.Trimesh:
+    """Tile, run every tile in this process and stitch (bounded memory, same surface)."""
+    tiles = plan_tiles(mesh, s, max_points)
+    rec = recorder if recorder is not None else StageRecorder()
+    rec.info["tiles"] = len(tiles)
+    parts = []
+    for t in tiles:
+        cb = None
+        if progress:
+            cb = (lambda f, k=t.index: progress((k + f) / len(tiles)))
+        parts.append(run_tile(mesh, s, t, cb, rec))
+    return stitch(parts, rec)
+
+
+# -----------------------------------------------------------------------------
+# Shared-directory tile board (several processes or hosts on one JOBS_ROOT)
+# -----------------------------------------------------------------------------
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class TileBoard:
+    """
+    A tiled job laid out on disk: ``plan.json`` (settings, tiles, input path
+    relative to the board), ``<k>.claim`` files created exclusively by the
+    worker computing tile k (heartbeat = mtime) and ``<k>.npz`` results.
+    A claim whose heartbeat is older than the lease is taken over.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._plan: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def create(cls, root: Path, input_path: Path, s: Settings, tiles: Sequence[Tile]) -> "TileBoard":
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        plan = {
+            "engine_version": __version__,
+            "input": os.path.relpath(Path(input_path).resolve(), root.resolve()),
+            "settings": asdict(s),
+            "tiles": [asdict(t) for t in tiles],
+            "created": time.time(),
+        }
+        _atomic_write(root / PLAN_NAME, json.dumps(plan).encode("utf-8"))
+        return cls(root)
+
+    @property
+    def plan(self) -> Dict[str, Any]:
+        if self._plan is None:
+            self._plan = json.loads((self.root / PLAN_NAME).read_text(encoding="utf-8"))
+        return self._plan
+
+    def compatible(self) -> bool:
+        # Tiles from different engine versions would not meet at the seams
+        return self.plan.get("engine_version") == __version__
+
+    def settings(self) -> Settings:
+        return Settings(**self.plan["settings"])
+
+    def tiles(self) -> List[Tile]:
+        return [Tile(**t) for t in self.plan["tiles"]]
+
+    def load_mesh(self) -> trimesh.Trimesh:
+        from .engine import load_mesh_any
+
+        return load_mesh_any((self.root / self.plan["input"]).resolve())
+
+    def _result(self, k: int) -> Path:
+        return self.root / f"{k}.npz"
+
+    def _claim(self, k: int) -> Path:
+        return self.root / f"{k}.claim"
+
+    def finished(self) -> List[int]:
+        return [t.index for t in self.tiles() if self._result(t.index).exists()]
+
+    def done(self) -> bool:
+        return len(self.finished()) == len(self.plan["tiles"])
+
+    def try_claim(self, k: int, owner: str, lease_s: float) -> bool:
+        if self._result(k).exists():
+            return False
+        claim = self._claim(k)
+        try:
+            age = time.time() - claim.stat().st_mtime
+        except FileNotFoundError:
+            age = None
+        if age is not None:
+            if age <= lease_s:
+                return False
+            # Stale: move it aside atomically so only one worker takes over
+            try:
+                os.replace(claim, self.root / f".{k}.stale-{uuid.uuid4().hex}")
+            except FileNotFoundError:
+                return False
+        try:
+            fd = os.open(claim, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(json.dumps({"owner": owner, "ts": time.time()}))
+        return True
+
+    def heartbeat(self, k: int) -> None:
+        try:
+            os.utime(self._claim(k))
+        except OSError:
+            pass
+
+    def release(self, k: int) -> None:
+        try:
+            self._claim(k).unlink()
+        except OSError:
+            pass
+
+    def save_result(self, k: int, mesh: trimesh.Trimesh) -> None:
+        buf = io.BytesIO()
+        np.savez(buf, vertices=np.asarray(mesh.vertices, dtype=np.float32),
+                 faces=np.asarray(mesh.faces, dtype=np.int64))
+        _atomic_write(self._result(k), buf.getvalue())
+
+    def load_result(self, k: int) -> trimesh.Trimesh:
+        with np.load(self._result(k)) as z:
+            return trimesh.Trimesh(vertices=z["vertices"], faces=z["faces"], process=False)
+
+    def work(self, owner: str, lease_s: float, *,
+             progress: Optional[Callable[[float], None]] = None,
+             recorder: Optional[StageRecorder] = None,
+             mesh: Optional[trimesh.Trimesh] = None) -> int:
+        """
+        Claim and compute tiles until none is claimable; returns how many this
+        call finished. ``progress`` gets the board-wide fraction (finished
+        tiles plus the share of the tile in hand).
+        """
+        tiles = self.tiles()
+        s = self.settings()
+        rec = recorder if recorder is not None else StageRecorder()
+        # The claim's mtime is its heartbeat. Beat on every stage event and
+        # sub-step report as well as per slice, so the 3D queries, marching
+        # cubes and the result write do not outlast the lease. This runs on the
+        # computing thread: a timer thread would be a greenlet under eventlet.
+        held: Dict[str, Any] = {"k": None, "at": 0.0}
+
+        def _beat(*_: Any) -> None:
+            if held["k"] is not None and time.monotonic() - held["at"] > _HEARTBEAT_S:
+                self.heartbeat(held["k"])
+                held["at"] = time.monotonic()
+
+        rec.add_listener(_beat)
+        rec.add_progress_listener(_beat)
+        done = 0
+        try:
+            for t in tiles:
+                if not self.try_claim(t.index, owner, lease_s):
+                    continue
+                held.update(k=t.index, at=time.monotonic())
+                try:
+                    mesh = mesh if mesh is not None else self.load_mesh()
+                    _beat()
+                    base = len(self.finished())
+
+                    def _cb(frac: float) -> None:
+                        _beat()
+                        if progress:
+                            progress(min(1.0, (base + frac) / len(tiles)))
+
+                    part = run_tile(mesh, s, t, _cb, rec)
+                    self.heartbeat(t.index)
+                    self.save_result(t.index, part)
+                    done += 1
+                finally:
+                    held["k"] = None
+                    self.release(t.index)
+        finally:
+            rec.remove_listener(_beat)
+            rec.remove_progress_listener(_beat)
+        return done
+
+    def stitch(self, recorder: Optional[StageRecorder] = None) -> trimesh.Trimesh:
+        return stitch([self.load_result(t.index) for t in self.tiles()], recorder)
+
+
+def find_boards(jobs_root: Path) -> Iterator[TileBoard]:
+    """Unfinished, compatible tile boards under ``jobs_root/<job>/tiles``."""
+    for plan in sorted(Path(jobs_root).glob(f"*/{TILE_DIRNAME}/{PLAN_NAME}")):
+        board = TileBoard(plan.parent)
+        try:
+            if board.compatible() and not board.done():
+                yield board
+        except (OSError, ValueError):
+            continue
@@ -1,2 +1,2 @@
 # backend/desolidify_engine/version.py
-__version__ = "1.2.5"
+__version__ = "1.2.6"
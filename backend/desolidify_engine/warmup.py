@@ -0,0 +1,75 @@
+# backend/desolidify_engine/warmup.py
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Modules the first job would otherwise import on its critical path
+_HEAVY_MODULES = (
+    "numpy",
+    "scipy.spatial",
+    "trimesh",
+    "rtree",
+    "skimage.measure",
+    "shapely",
+    "backend.desolidify_engine.engine",
+)
+
+_lock = threading.Lock()
+_status: Dict[str, Any] = {"state": "idle"}
+
+
+def warm_up(perforate: bool = True) -> Dict[str, Any]:
+    """
+    Import the engine's heavy dependencies and (with ``perforate``) run a tiny
+    perforation so rtree indexes, numba kernels and trimesh caches are built
+    before the first real job. Runs once per process; concurrent callers wait
+    for the first and get its result. Never raises.
+    """
+    with _lock:
+        if _status["state"] in ("done", "error"):
+            return dict(_status)
+        _status.update(state="running")
+        t0 = time.perf_counter()
+        timings: Dict[str, float] = {}
+        try:
+            for name in _HEAVY_MODULES:
+                t = time.perf_counter()
+                try:
+                    importlib.import_module(name)
+                except ImportError:
+                    continue  # optional (rtree, shapely): the engine copes without it
+                timings[name] = round(time.perf_counter() - t, 4)
+            if perforate:
+                t = time.perf_counter()
+                _tiny_perforation()
+                timings["perforation"] = round(time.perf_counter() - t, 4)
+        except Exception as e:
+            _status.update(state="error", error=f"{type(e).__name__}: {e}")
+        else:
+            _status.update(state="done")
+        _status.update(seconds=round(time.perf_counter() - t0, 4), timings=timings)
+        return dict(_status)
+
+
+def warmup_status() -> Dict[str, Any]:
+    return dict(_status)
+
+
+def _tiny_perforation(size_mm: float = 12.0) -> None:
+    import trimesh
+
+    from .engine import perforate_mesh_sdf
+    from .settings import Settings
+
+    # Exercises the 3D query, shell gating and the hole kernel on a few slices
+    box = trimesh.creation.box(extents=(size_mm, size_mm, size_mm))
+    s = Settings(voxel=1.2, spacing=5.0, radius=1.0, padding=1.2, orientations="xyz", mem_retry=False)
+    perforate_mesh_sdf(box, s)
+
+
+def _reset_for_tests(state: Optional[str] = None) -> None:
+    _status.clear()
+    _status["state"] = state or "idle"
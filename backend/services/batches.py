@@ -0,0 +1,267 @@
+# backend/services/batches.py
+from __future__ import annotations
+
+import io
+import json
+import posixpath
+import shutil
+import time
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from werkzeug.datastructures import FileStorage
+from werkzeug.utils import secure_filename
+
+from .storage import (
+    RESULT_NAME,
+    _atomic_write_json,
+    _base_dir,
+    _read_json,
+    get_status,
+    job_dir,
+    touch_download,
+)
+
+# Batch manifests sit beside the job folders; the leading dot keeps them out
+# of job listings (each part is an ordinary job with its own folder).
+_BATCHES_DIRNAME = ".batches"
+_MANIFEST_NAME = "batch.json"
+_TERMINAL_STATES = {"finished", "error"}
+_STREAM_CHUNK = 1024 * 1024
+_POLL_INTERVAL_S = 0.5
+
+
+def _batches_dir() -> Path:
+    return _base_dir() / _BATCHES_DIRNAME
+
+
+def batch_dir(batch_id: str) -> Path:
+    return (_batches_dir() / batch_id).resolve()
+
+
+def new_batch(params: Dict[str, Any], parts: List[Dict[str, Any]]) -> str:
+    """Persist a manifest for ``parts`` ([{name, job_id, ...}]) and return its ID."""
+    bid = str(uuid.uuid4())
+    d = batch_dir(bid)
+    d.mkdir(parents=True, exist_ok=True)
+    _atomic_write_json(d / _MANIFEST_NAME, {
+        "batch_id": bid,
+        "created_at": int(time.time()),
+        "params": params,
+        "parts": parts,
+    })
+    return bid
+
+
+def update_batch_parts(batch_id: str, parts: List[Dict[str, Any]]) -> None:
+    """Replace the manifest's parts (e.g. with the job IDs dispatch settled on)."""
+    manifest = read_batch(batch_id)
+    if manifest is None:
+        raise FileNotFoundError(f"Batch {batch_id} not found")
+    manifest["parts"] = parts
+    _atomic_write_json(batch_dir(batch_id) / _MANIFEST_NAME, manifest)
+
+
+def read_batch(batch_id: str) -> Optional[Dict[str, Any]]:
+    return _read_json(batch_dir(batch_id) / _MANIFEST_NAME)
+
+
+def purge_old_batches(*, hours: int) -> int:
+    root = _batches_dir()
+    if not root.exists():
+        return 0
+    cutoff = time.time() - hours * 3600
+    deleted = 0
+    for child in root.iterdir():
+        m = _read_json(child / _MANIFEST_NAME) or {}
+        ts = m.get("created_at") or child.stat().st_mtime
+        if ts < cutoff:
+            shutil.rmtree(child, ignore_errors=True)
+            deleted += 1
+    return deleted
+
+
+def purge_all_batches() -> int:
+    root = _batches_dir()
+    count = sum(1 for c in root.iterdir() if c.is_dir()) if root.exists() else 0
+    shutil.rmtree(root, ignore_errors=True)
+    return count
+
+
+# -----------------------------------------------------------------------------
+# Upload unpacking
+# -----------------------------------------------------------------------------
+
+def unique_name(name: str, taken: set) -> str:
+    stem, dot, ext = name.rpartition(".")
+    if not dot:
+        stem, ext = name, ""
+    candidate, n = name, 1
+    while candidate.lower() in taken:
+        n += 1
+        candidate = f"{stem}-{n}.{ext}" if ext else f"{stem}-{n}"
+    taken.add(candidate.lower())
+    return candidate
+
+
+def iter_zip_parts(file_storage: FileStorage, *, allowed: set, max_parts: int,
+                   max_bytes: int) -> Iterator[FileStorage]:
+    """
+    Yield one FileStorage per model file inside an uploaded ZIP (directories,
+    dotfiles and macOS resource forks skipped). Raises ValueError for a bad
+    archive, too many parts, or more than ``max_bytes`` uncompressed.
+    """
+    try:
+        zf = zipfile.ZipFile(file_storage.stream)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Not a valid ZIP archive: {e}") from e
+    with zf:
+        members = []
+        for info in zf.infolist():
+            base = posixpath.basename(info.filename)
+            if info.is_dir() or not base or base.startswith(".") or "__MACOSX/" in info.filename:
+                continue
+            if base.rsplit(".", 1)[-1].lower() not in allowed:
+                continue
+            members.append(info)
+        if not members:
+            raise ValueError("ZIP contains no model files")
+        if len(members) > max_parts:
+            raise ValueError(f"Too many parts in ZIP ({len(members)} > {max_parts})")
+        if sum(i.file_size for i in members) > max_bytes:
+            raise ValueError("ZIP contents exceed the upload size limit")
+        for info in members:
+            # Uncompressed size is bounded above; read() cannot exceed it
+            yield FileStorage(stream=zf.open(info), filename=secure_filename(posixpath.basename(info.filename)))
+
+
+# -----------------------------------------------------------------------------
+# Aggregate status
+# -----------------------------------------------------------------------------
+
+def batch_status(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    parts = []
+    counts: Dict[str, int] = {}
+    for p in manifest.get("parts", []):
+        st = get_status(p["job_id"]) or {"state": "unknown", "progress": 0.0, "message": "Job not found"}
+        state = st.get("state", "unknown")
+        counts[state] = counts.get(state, 0) + 1
+        parts.append({**p, "state": state, "progress": float(st.get("progress") or 0.0),
+                      "message": st.get("message", "")})
+
+    n = len(parts)
+    done = sum(counts.get(s, 0) for s in _TERMINAL_STATES) + counts.get("unknown", 0)
+    if n and done == n:
+        state = "error" if counts.get("finished", 0) == 0 else "finished"
+    elif counts.get("running") or done:
+        state = "running"
+    else:
+        state = "queued"
+    return {
+        "batch_id": manifest["batch_id"],
+        "state": state,
+        "progress": (sum(1.0 if p["state"] in _TERMINAL_STATES else p["progress"] for p in parts) / n) if n else 1.0,
+        "total": n,
+        "finished": counts.get("finished", 0),
+        "failed": counts.get("error", 0) + counts.get("unknown", 0),
+        "parts": parts,
+    }
+
+
+# -----------------------------------------------------------------------------
+# Streamed ZIP of results
+# -----------------------------------------------------------------------------
+
+class _Sink(io.RawIOBase):
+    """Unseekable write target that hands buffered bytes to a generator."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+def _result_stem(name: str) -> str:
+    stem = name.rsplit(".", 1)[0] if "." in name else name
+    return f"{stem}_desolid.stl"
+
+
+def stream_results_zip(manifest: Dict[str, Any], *, wait: bool = True, timeout_s: float = 3600.0,
+                       compresslevel: int = 1) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of part results in completion order. With ``wait``
+    the stream stays open until every part is terminal (or ``timeout_s``
+    passes without progress); failed/missing parts become ``.error.txt``
+    entries and ``manifest.json`` lists every outcome.
+    """
+    sink = _Sink()
+    zf = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+    pending: List[Dict[str, Any]] = list(manifest.get("parts", []))
+    outcomes: List[Dict[str, Any]] = []
+    last_progress = time.monotonic()
+
+    def add_error(part: Dict[str, Any], message: str) -> None:
+        zf.writestr(f"{part['name']}.error.txt", message + "\n")
+        outcomes.append({"name": part["name"], "job_id": part["job_id"], "state": "error", "message": message})
+
+    while pending:
+        for part in list(pending):
+            st = get_status(part["job_id"]) or {}
+            out = job_dir(part["job_id"]) / RESULT_NAME
+            if st.get("state") == "finished" and out.exists():
+                arcname = _result_stem(part["name"])
+                zi = zipfile.ZipInfo(arcname, date_time=time.localtime(out.stat().st_mtime)[:6])
+                zi.compress_type = zipfile.ZIP_DEFLATED
+                zi.file_size = out.stat().st_size  # lets zipfile pick ZIP64 up front
+                with open(out, "rb") as src, zf.open(zi, "w") as dst:
+                    while True:
+                        chunk = src.read(_STREAM_CHUNK)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                touch_download(part["job_id"])
+                outcomes.append({"name": part["name"], "job_id": part["job_id"], "state": "finished", "file": arcname})
+            elif st.get("state") == "error" or not st:
+                add_error(part, st.get("message") or "Job not found")
+            elif not wait:
+                add_error(part, f"Not finished ({st.get('state')})")
+            else:
+                continue
+            pending.remove(part)
+            last_progress = time.monotonic()
+            data = sink.drain()
+            if data:
+                yield data
+
+        if pending:
+            if time.monotonic() - last_progress > timeout_s:
+                for part in pending:
+                    add_error(part, "Timed out waiting for this part")
+                pending = []
+            else:
+                time.sleep(_POLL_INTERVAL_S)
+
+    zf.writestr("manifest.json", json.dumps({"batch_id": manifest["batch_id"], "parts": outcomes}, indent=2))
+    zf.close()
+    yield sink.drain()
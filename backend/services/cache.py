@@ -0,0 +1,172 @@
+# backend/services/cache.py
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .storage import (
+    RESULT_GZIP_NAME,
+    RESULT_INFO_NAME,
+    RESULT_NAME,
+    THUMBNAIL_NAME,
+    _base_dir,
+    _config,
+    get_status,
+    job_dir,
+)
+
+# Content-addressed results live under JOBS_ROOT so hard links stay on one
+# filesystem; the leading dot keeps them out of job listings and purges.
+_CACHE_DIRNAME = ".cache"
+_ARTIFACTS = (RESULT_NAME, RESULT_GZIP_NAME, RESULT_INFO_NAME, THUMBNAIL_NAME)
+
+# In-flight registry (per process): cache key -> leader job id, and back
+_lock = threading.Lock()
+_inflight: Dict[str, str] = {}
+_inflight_keys: Dict[str, str] = {}
+
+
+def _max_bytes() -> int:
+    return int(float(_config("RESULT_CACHE_MAX_MB", 2048)) * 1024 * 1024)
+
+
+def enabled() -> bool:
+    return _max_bytes() > 0
+
+
+def _cache_dir() -> Path:
+    return _base_dir() / _CACHE_DIRNAME
+
+
+def cache_key(input_sha256: str, params: Dict[str, Any]) -> str:
+    """
+    Key = (input content hash, canonical clamped settings, engine version).
+    Params go through the same from_params/clamp_settings path as the task,
+    so equivalent payloads (defaults spelled out, out-of-range values) agree.
+    """
+    from backend.desolidify_engine.settings import from_params, settings_fingerprint
+
+    return settings_fingerprint(from_params(dict(params)), input=input_sha256)
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+# -----------------------------------------------------------------------------
+# Finished results
+# -----------------------------------------------------------------------------
+
+def materialize(key: str, job_id: str) -> bool:
+    """
+    On a cache hit, hard-link the cached artifacts into ``job_id``'s folder
+    (output.stl last, as it marks the result ready). Returns False on a miss.
+    """
+    entry = _cache_dir() / key
+    if not (entry / RESULT_NAME).exists():
+        return False
+    d = job_dir(job_id)
+    try:
+        for name in _ARTIFACTS[::-1]:
+            if (entry / name).exists():
+                _link_or_copy(entry / name, d / name)
+        os.utime(entry)  # LRU recency
+    except OSError:
+        return False
+    return True
+
+
+def store(key: str, job_id: str) -> None:
+    """Add a finished job's artifacts to the cache, then enforce the size bound."""
+    entry = _cache_dir() / key
+    src = job_dir(job_id)
+    if entry.exists() or not (src / RESULT_NAME).exists():
+        return
+    tmp = _cache_dir() / f"{key}.tmp-{uuid.uuid4().hex}"
+    tmp.mkdir(parents=True, exist_ok=True)
+    try:
+        for name in _ARTIFACTS:
+            if (src / name).exists():
+                _link_or_copy(src / name, tmp / name)
+        os.replace(tmp, entry)
+    except OSError:
+        # Lost a race with an identical job, or the filesystem refused
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+    evict(_max_bytes())
+
+
+def _entry_size(entry: Path) -> int:
+    total = 0
+    for f in entry.iterdir():
+        try:
+            total += f.stat().st_size
+        except OSError:
+            pass
+    return total
+
+
+def evict(max_bytes: int) -> int:
+    """
+    Delete least-recently-used entries until the cache fits ``max_bytes``.
+    Returns bytes reclaimed.
+    """
+    root = _cache_dir()
+    if not root.exists():
+        return 0
+    entries = []
+    for e in root.iterdir():
+        if not e.is_dir():
+            continue
+        if ".tmp-" in e.name:
+            # Abandoned partial store
+            if time.time() - e.stat().st_mtime > 3600:
+                shutil.rmtree(e, ignore_errors=True)
+            continue
+        entries.append((e.stat().st_mtime, _entry_size(e), e))
+    total = sum(size for _, size, _ in entries)
+    reclaimed = 0
+    for _, size, e in sorted(entries, key=lambda t: t[0]):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(e, ignore_errors=True)
+        total -= size
+        reclaimed += size
+    return reclaimed
+
+
+# -----------------------------------------------------------------------------
+# In-flight coalescing
+# -----------------------------------------------------------------------------
+
+def claim(key: str, job_id: str) -> Optional[str]:
+    """
+    Register ``job_id`` as the job computing ``key``. If an identical job is
+    already queued/running, return its id instead (the caller attaches to it).
+    """
+    with _lock:
+        leader = _inflight.get(key)
+        if leader and leader != job_id:
+            st = get_status(leader) or {}
+            if st.get("state") in {"created", "queued", "running"}:
+                return leader
+            _inflight_keys.pop(leader, None)
+        _inflight[key] = job_id
+        _inflight_keys[job_id] = key
+    return None
+
+
+def release(job_id: str) -> None:
+    with _lock:
+        key = _inflight_keys.pop(job_id, None)
+        if key is not None and _inflight.get(key) == job_id:
+            del _inflight[key]
@@ -0,0 +1,280 @@
+# backend/services/costmodel.py
+from __future__ import annotations
+
+import math
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .progress import PHASES, PHASE_STAGES
+from .storage import METRICS_NAME, _atomic_write_json, _base_dir, _iter_job_dirs, _read_json
+
+# Fitted model lives next to the jobs it was calibrated from
+MODEL_NAME = ".memory_model.json"
+
+# Features of a job that drive its peak memory (bytes above the process
+# baseline). Everything is in "elements"; coefficients come out in bytes.
+FEATURES = ("intercept", "grid_points", "slice_points", "chunk_points", "hole_cells", "triangles")
+# Engine wall time (seconds) is fitted on its own feature set
+RUNTIME_FEATURES = ("intercept", "grid_points", "sdf_work", "hole_cells", "triangles")
+_MIN_EXTRA_SAMPLES = 2
+# Finished jobs needed before phase weights replace the defaults
+_MIN_PHASE_SAMPLES = 3
+# Seconds the history runtime rate (a scan of every job's metrics) is reused
+_HISTORY_TTL_S = 60.0
+_history_cache: Dict[str, Tuple[float, Optional[float]]] = {}
+_ENGINE_STAGES = {"process", "grid_setup", "hole_fields", "signed_distance", "marching_cubes", "post_process"}
+
+
+def job_features(m: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """Feature vector from a metrics.json dict (None if it lacks grid info)."""
+    grid = m.get("grid") or {}
+    if not grid.get("points"):
+        return None
+    slice_points = float(grid["nx"]) * float(grid["ny"])
+    return {
+        "intercept": 1.0,
+        "grid_points": float(grid["points"]),
+        "slice_points": slice_points,
+        "chunk_points": min(float(m.get("chunk_pts") or slice_points), slice_points),
+        "hole_cells": float(m.get("hole_cells") or 0),
+        "triangles": float(m.get("triangles_in") or 0) + float(m.get("triangles_out") or 0),
+    }
+
+
+def collect_samples() -> List[Tuple[str, Dict[str, float], float]]:
+    """(job_id, features, peak_delta_bytes) for finished jobs with memory data."""
+    out = []
+    for d in _iter_job_dirs():
+        m = _read_json(d / METRICS_NAME)
+        if not m or m.get("state") != "finished":
+            continue
+        mem = m.get("memory") or {}
+        feats = job_features(m)
+        peak_mb = _engine_peak_delta_mb(mem)
+        if feats is None or peak_mb is None:
+            continue
+        out.append((d.name, feats, peak_mb * 1024 * 1024))
+    return out
+
+
+def _engine_peak_delta_mb(mem: Dict[str, Any]) -> Optional[float]:
+    # Highest RSS while engine stages ran (thumbnail/export excluded), over baseline
+    stages = mem.get("stages") or {}
+    engine = [v for k, v in stages.items() if k in _ENGINE_STAGES]
+    if engine and mem.get("baseline_rss_mb") is not None:
+        return max(0.0, max(engine) - float(mem["baseline_rss_mb"]))
+    return mem.get("peak_delta_mb")
+
+
+def _nnls(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Non-negative least squares with column scaling; returns (coef, pred, r2)."""
+    # Scale columns so the solver is well conditioned, then undo
+    scale = np.abs(X).max(axis=0)
+    scale[scale == 0] = 1.0
+    try:
+        from scipy.optimize import nnls
+        coef, _ = nnls(X / scale, y)
+    except Exception:  # pragma: no cover - scipy ships with scikit-image
+        coef = np.clip(np.linalg.lstsq(X / scale, y, rcond=None)[0], 0.0, None)
+    coef = coef / scale
+
+    pred = X @ coef
+    resid = y - pred
+    ss_tot = float(((y - y.mean()) ** 2).sum())
+    r2 = 1.0 - float((resid ** 2).sum()) / ss_tot if ss_tot > 0 else 1.0
+    return coef, pred, r2
+
+
+def fit(samples: List[Tuple[str, Dict[str, float], float]]) -> Dict[str, Any]:
+    """
+    Non-negative least squares of peak bytes on FEATURES (a negative byte
+    cost per element is never physical). Raises ValueError with too few jobs.
+    """
+    need = len(FEATURES) + _MIN_EXTRA_SAMPLES
+    if len(samples) < need:
+        raise ValueError(f"Need at least {need} finished jobs with memory metrics, found {len(samples)}.")
+    X = np.array([[f[k] for k in FEATURES] for _, f, _ in samples], dtype=np.float64)
+    y = np.array([peak for _, _, peak in samples], dtype=np.float64)
+    coef, pred, r2 = _nnls(X, y)
+    resid = y - pred
+
+    # Ratio that covers every observed job: multiply predictions by it for headroom
+    ratio = float(np.max(y / np.maximum(pred, 1.0)))
+    return {
+        "features": list(FEATURES),
+        "coef_bytes": {k: float(c) for k, c in zip(FEATURES, coef)},
+        "samples": len(samples),
+        "r2": round(r2, 4),
+        "mean_abs_error_mb": round(float(np.abs(resid).mean()) / (1024 * 1024), 1),
+        "safety_factor": round(max(1.0, ratio), 3),
+        "observed_peak_mb": {
+            "p50": round(float(np.percentile(y, 50)) / (1024 * 1024), 1),
+            "p95": round(float(np.percentile(y, 95)) / (1024 * 1024), 1),
+            "max": round(float(y.max()) / (1024 * 1024), 1),
+        },
+        "fitted_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+# -----------------------------------------------------------------------------
+# Runtime
+# -----------------------------------------------------------------------------
+
+def runtime_features(m: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """
+    Runtime features from a metrics.json dict. ``sdf_work`` stands in for the
+    signed-distance queries, which cost roughly log(triangles) per grid point.
+    """
+    feats = job_features(m)
+    if feats is None:
+        return None
+    tris_in = float(m.get("triangles_in") or 0)
+    return {
+        "intercept": 1.0,
+        "grid_points": feats["grid_points"],
+        "sdf_work": feats["grid_points"] * math.log2(tris_in + 2.0),
+        "hole_cells": feats["hole_cells"],
+        "triangles": feats["triangles"],
+    }
+
+
+def engine_seconds(m: Dict[str, Any]) -> Optional[float]:
+    stages = m.get("stages") or {}
+    total = sum(float(v) for k, v in stages.items() if k in _ENGINE_STAGES)
+    return total if total > 0 else None
+
+
+def collect_runtime_samples() -> List[Tuple[str, Dict[str, float], float]]:
+    """(job_id, runtime features, engine seconds) for finished jobs."""
+    out = []
+    for d in _iter_job_dirs():
+        m = _read_json(d / METRICS_NAME)
+        if not m or m.get("state") != "finished":
+            continue
+        feats, secs = runtime_features(m), engine_seconds(m)
+        if feats is None or secs is None:
+            continue
+        out.append((d.name, feats, secs))
+    return out
+
+
+def fit_runtime(samples: List[Tuple[str, Dict[str, float], float]]) -> Dict[str, Any]:
+    """Non-negative least squares of engine seconds on RUNTIME_FEATURES."""
+    need = len(RUNTIME_FEATURES) + _MIN_EXTRA_SAMPLES
+    if len(samples) < need:
+        raise ValueError(f"Need at least {need} finished jobs with stage timings, found {len(samples)}.")
+    X = np.array([[f[k] for k in RUNTIME_FEATURES] for _, f, _ in samples], dtype=np.float64)
+    y = np.array([secs for _, _, secs in samples], dtype=np.float64)
+    coef, pred, r2 = _nnls(X, y)
+    return {
+        "features": list(RUNTIME_FEATURES),
+        "coef_seconds": {k: float(c) for k, c in zip(RUNTIME_FEATURES, coef)},
+        "samples": len(samples),
+        "r2": round(r2, 4),
+        "mean_abs_error_s": round(float(np.abs(y - pred).mean()), 2),
+    }
+
+
+def predict_runtime_s(runtime_model: Dict[str, Any], features: Dict[str, float]) -> float:
+    coef = runtime_model.get("coef_seconds") or {}
+    return sum(float(coef.get(k, 0.0)) * float(features.get(k, 0.0))
+               for k in runtime_model.get("features", RUNTIME_FEATURES))
+
+
+def _history_rate() -> Optional[float]:
+    """Median seconds per unit of ``sdf_work`` over finished jobs, cached for _HISTORY_TTL_S."""
+    root = str(_base_dir())
+    now = time.monotonic()
+    hit = _history_cache.get(root)
+    if hit is not None and now - hit[0] < _HISTORY_TTL_S:
+        return hit[1]
+    rates = [secs / f["sdf_work"] for _, f, secs in collect_runtime_samples() if f["sdf_work"] > 0]
+    rate = float(np.median(rates)) if rates else None
+    _history_cache[root] = (now, rate)
+    return rate
+
+
+def history_runtime_s(features: Dict[str, float]) -> Optional[float]:
+    """
+    Uncalibrated fallback: median seconds per unit of ``sdf_work`` over the
+    finished jobs still on disk, scaled to ``features``. The rate is cached
+    briefly so /api/estimate does not read every job's metrics per request.
+    """
+    rate = _history_rate()
+    return None if rate is None else rate * features["sdf_work"]
+
+
+# -----------------------------------------------------------------------------
+# Progress phase weights
+# -----------------------------------------------------------------------------
+
+def phase_shares(m: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """Share of a job's staged wall time per progress phase (None without timings)."""
+    stages = m.get("stages") or {}
+    secs = {p: 0.0 for p in PHASES}
+    for k, v in stages.items():
+        if k in PHASE_STAGES:
+            secs[PHASE_STAGES[k]] += float(v)
+    total = sum(secs.values())
+    if total <= 0:
+        return None
+    return {p: v / total for p, v in secs.items()}
+
+
+def collect_phase_shares() -> List[Tuple[str, Dict[str, float]]]:
+    """(job_id, phase shares) for finished jobs."""
+    out = []
+    for d in _iter_job_dirs():
+        m = _read_json(d / METRICS_NAME)
+        if not m or m.get("state") != "finished":
+            continue
+        shares = phase_shares(m)
+        if shares is not None:
+            out.append((d.name, shares))
+    return out
+
+
+def fit_phase_weights(samples: List[Tuple[str, Dict[str, float]]]) -> Dict[str, float]:
+    """
+    Median share of each phase over the jobs, renormalised to sum to 1 (the
+    median is robust to the odd job stalled on a slow disk or a cold cache).
+    """
+    if len(samples) < _MIN_PHASE_SAMPLES:
+        raise ValueError(f"Need at least {_MIN_PHASE_SAMPLES} finished jobs with stage timings, found {len(samples)}.")
+    med = {p: float(np.median([s[p] for _, s in samples])) for p in PHASES}
+    total = sum(med.values()) or 1.0
+    return {p: round(v / total, 4) for p, v in med.items()}
+
+
+def model_path() -> Path:
+    return _base_dir() / MODEL_NAME
+
+
+def save_model(model: Dict[str, Any], path: Optional[Path] = None) -> Path:
+    p = Path(path) if path else model_path()
+    _atomic_write_json(p, model)
+    return p
+
+
+def load_model(path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    return _read_json(Path(path) if path else model_path())
+
+
+def predict_peak_mb(model: Dict[str, Any], features: Dict[str, float], *, with_safety: bool = True) -> float:
+    coef = model.get("coef_bytes") or {}
+    peak = sum(float(coef.get(k, 0.0)) * float(features.get(k, 0.0)) for k in model.get("features", FEATURES))
+    if with_safety:
+        peak *= float(model.get("safety_factor", 1.0))
+    return peak / (1024 * 1024)
+
+
+def suggest_workers(model: Dict[str, Any], memory_limit_mb: float, baseline_mb: float = 0.0) -> int:
+    """Workers that fit ``memory_limit_mb`` if each runs a p95-sized job."""
+    per_job = float((model.get("observed_peak_mb") or {}).get("p95") or 0.0)
+    if per_job <= 0:
+        return 1
+    return max(1, int(math.floor((memory_limit_mb - baseline_mb) / per_job)))
@@ -0,0 +1,98 @@
+# backend/services/estimate.py
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from backend.desolidify_engine.engine import _hole_field_size, grid_axes_for_bounds, load_mesh_bytes
+from backend.desolidify_engine.settings import Settings
+from backend.desolidify_engine.stl_io import read_binary_stl_records
+
+from . import costmodel
+
+_MB = 1024 * 1024
+# Marching cubes emits roughly this many triangles per voxel face of surface
+# (measured on the benchmark meshes); used to guess the output size.
+_MC_TRIANGLES_PER_VOXEL_AREA = 2.4
+_VOLUME_BYTES = {"float32": 4, "float16": 2, "int8": 1}
+
+
+def summarize_mesh(data: bytes, file_type: str = "stl") -> Dict[str, Any]:
+    """
+    Triangle count, bounds, surface area and area-weighted centroid. Binary
+    STL is read straight from the records; anything else goes through trimesh.
+    """
+    recs = read_binary_stl_records(data) if file_type.lower() == "stl" else None
+    if recs is not None:
+        tri = recs["vertices"].astype(np.float64)
+    else:
+        mesh = load_mesh_bytes(data, file_type=file_type)
+        tri = mesh.triangles.astype(np.float64)
+    if len(tri) == 0:
+        raise ValueError("Mesh has no triangles")
+    areas = 0.5 * np.linalg.norm(np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]), axis=1)
+    area = float(areas.sum())
+    centers = tri.mean(axis=1)
+    centroid = (areas @ centers) / area if area > 0 else centers.mean(axis=0)
+    flat = tri.reshape(-1, 3)
+    return {
+        "triangles": int(len(tri)),
+        "bounds": [flat.min(axis=0).tolist(), flat.max(axis=0).tolist()],
+        "area_mm2": area,
+        "centroid": centroid.tolist(),
+    }
+
+
+def grid_for(summary: Dict[str, Any], s: Settings) -> Dict[str, Any]:
+    """Sampling grid and hole-field size exactly as the engine would set them up."""
+    bounds, (xs, ys, zs) = grid_axes_for_bounds(summary["bounds"][0], summary["bounds"][1], s)
+    nx, ny, nz = len(xs), len(ys), len(zs)
+    cx, cy = summary["centroid"][:2]
+    centers, cells = _hole_field_size(s, s.orientations.lower(), bounds,
+                                      (nx, ny, nz), (np.float32(cx), np.float32(cy)))
+    return {"nx": nx, "ny": ny, "nz": nz, "points": nx * ny * nz, "centers": centers, "hole_cells": cells}
+
+
+def estimate(summary: Dict[str, Any], s: Settings, model: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Pre-flight estimate for one mesh + settings. Memory and runtime come from
+    the calibrated model when present (runtime falls back to the throughput of
+    finished jobs on disk); either is None when nothing is known yet.
+    """
+    grid = grid_for(summary, s)
+    tris_out = int(_MC_TRIANGLES_PER_VOXEL_AREA * summary["area_mm2"] / (s.voxel * s.voxel))
+    m = {
+        "grid": grid,
+        "triangles_in": summary["triangles"],
+        "triangles_out": tris_out,
+        "chunk_pts": int(s.chunk_pts),
+        "hole_cells": grid["hole_cells"],
+    }
+    feats = costmodel.job_features(m) or {}
+    rt_feats = costmodel.runtime_features(m) or {}
+
+    peak_mb = None
+    if model and model.get("coef_bytes"):
+        peak_mb = round(costmodel.predict_peak_mb(model, feats), 1)
+
+    runtime_s, source = None, None
+    if model and model.get("runtime"):
+        runtime_s, source = costmodel.predict_runtime_s(model["runtime"], rt_feats), "model"
+    else:
+        runtime_s = costmodel.history_runtime_s(rt_feats)
+        source = "history" if runtime_s is not None else None
+
+    return {
+        "grid": {k: grid[k] for k in ("nx", "ny", "nz", "points")},
+        "hole_centers": grid["centers"],
+        "triangles_in": summary["triangles"],
+        "triangles_out_est": tris_out,
+        "memory": {
+            "peak_mb": peak_mb,
+            # The volume alone (at its storage dtype); a hard lower bound on the peak
+            "volume_mb": round(grid["points"] * _VOLUME_BYTES.get(s.volume_dtype, 4) / _MB, 1),
+        },
+        "runtime_s": round(runtime_s, 1) if runtime_s is not None else None,
+        "runtime_source": source,
+    }
@@ -0,0 +1,164 @@
+# backend/services/janitor.py
+from __future__ import annotations
+
+import logging
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import metrics
+from .storage import DOWNLOAD_MARK_NAME, _config, _iter_job_dirs, _read_json
+
+logger = logging.getLogger(__name__)
+
+# Jobs in these states (or without a status yet) are never evicted. "created"
+# covers uploads still being written and batch parts waiting for dispatch.
+_ACTIVE_STATES = {"created", "queued", "running"}
+
+_thread: Optional[threading.Thread] = None
+_thread_lock = threading.Lock()
+_stop = threading.Event()
+
+
+# -----------------------------------------------------------------------------
+# Sweep
+# -----------------------------------------------------------------------------
+
+def job_usage(path: Path) -> int:
+    """
+    Bytes a job folder holds. Files hard-linked with the result cache count
+    1/links of their size, so evicting the job is credited only its share.
+    """
+    total = 0
+    for f in path.rglob("*"):
+        try:
+            st = f.stat()
+        except OSError:
+            continue
+        if f.is_file():
+            total += st.st_size // max(1, st.st_nlink)
+    return total
+
+
+def _mtime(path: Path) -> Optional[float]:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _last_used(path: Path, status: Dict[str, Any]) -> float:
+    """Latest of the status update (finish time) and the last result download."""
+    ts = status.get("ts")
+    if not isinstance(ts, (int, float)):
+        ts = _mtime(path) or time.time()
+    return max(float(ts), _mtime(path / DOWNLOAD_MARK_NAME) or 0.0)
+
+
+def _remove(path: Path) -> bool:
+    shutil.rmtree(path, ignore_errors=True)
+    return not path.exists()
+
+
+def sweep(*, max_age_hours: float, max_bytes: int, now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Evict finished/failed job folders: first those unused (finished or last
+    downloaded) for ``max_age_hours``, then least-recently-used ones until
+    all job folders fit ``max_bytes`` (0 disables either limit). Created,
+    queued and running jobs count towards the total but are never removed.
+    """
+    now = time.time() if now is None else now
+    cutoff = now - max_age_hours * 3600 if max_age_hours > 0 else None
+    report = {"age": {"jobs": 0, "bytes": 0}, "size": {"jobs": 0, "bytes": 0}}
+
+    active_bytes = 0
+    idle: List[Tuple[float, int, Path]] = []
+    for child in _iter_job_dirs():
+        status = _read_json(child / "status.json")
+        size = job_usage(child)
+        if not status or status.get("state") in _ACTIVE_STATES:
+            active_bytes += size
+            continue
+        idle.append((_last_used(child, status), size, child))
+    idle.sort(key=lambda t: t[0])
+
+    kept: List[Tuple[float, int, Path]] = []
+    for last_used, size, path in idle:
+        if cutoff is not None and last_used < cutoff and _remove(path):
+            report["age"]["jobs"] += 1
+            report["age"]["bytes"] += size
+        else:
+            kept.append((last_used, size, path))
+
+    total = active_bytes + sum(size for _, size, _ in kept)
+    if max_bytes > 0:
+        for _, size, path in kept:
+            if total <= max_bytes:
+                break
+            if _remove(path):
+                total -= size
+                report["size"]["jobs"] += 1
+                report["size"]["bytes"] += size
+
+    report["disk_bytes"] = total
+    return report
+
+
+def run_once() -> Dict[str, Any]:
+    """One sweep with the app's limits; records metrics and purges old batches."""
+    hours = float(_config("JOB_RETENTION_HOURS", 6))
+    max_bytes = int(float(_config("JOBS_MAX_MB", 0)) * 1024 * 1024)
+    report = sweep(max_age_hours=hours, max_bytes=max_bytes)
+    for reason in ("age", "size"):
+        metrics.janitor_evicted(reason, report[reason]["jobs"], report[reason]["bytes"])
+    metrics.set_jobs_disk_bytes(report["disk_bytes"])
+    try:
+        from .batches import purge_old_batches
+        purge_old_batches(hours=int(hours))
+    except Exception as e:  # pragma: no cover - best effort
+        logger.warning("Batch purge failed: %s", e)
+    evicted = report["age"]["jobs"] + report["size"]["jobs"]
+    if evicted:
+        logger.info("Janitor evicted %d job(s), %d bytes (age %d, size %d); %d bytes in use",
+                    evicted, report["age"]["bytes"] + report["size"]["bytes"],
+                    report["age"]["jobs"], report["size"]["jobs"], report["disk_bytes"])
+    return report
+
+
+# -----------------------------------------------------------------------------
+# Background thread
+# -----------------------------------------------------------------------------
+
+def start(app) -> bool:
+    """Start the per-process janitor thread (JANITOR_INTERVAL_S > 0). Idempotent."""
+    global _thread
+    interval = float(app.config.get("JANITOR_INTERVAL_S", 0))
+    if interval <= 0:
+        return False
+    with _thread_lock:
+        if _thread is not None and _thread.is_alive():
+            return True
+        _stop.clear()
+
+        def _loop():
+            # First sweep after one interval: the app may still be configuring
+            while not _stop.wait(interval):
+                try:
+                    with app.app_context():
+                        run_once()
+                except Exception as e:
+                    logger.warning("Janitor sweep failed: %s", e)
+
+        _thread = threading.Thread(target=_loop, name="janitor", daemon=True)
+        _thread.start()
+    return True
+
+
+def stop() -> None:
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
+    _thread = None
@@ -0,0 +1,159 @@
+# backend/services/memwatch.py
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from backend.desolidify_engine.instrument import StageRecorder
+
+from .nativethreads import native_threading
+
+_MB = 1024 * 1024
+# NumPy reports its data buffers to tracemalloc under this domain
+_NUMPY_DOMAIN = 389047
+_TOP_ALLOCATIONS = 3
+
+try:
+    import resource
+except Exception:  # pragma: no cover - Unix only
+    resource = None  # type: ignore
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):  # pragma: no cover
+    _PAGE_SIZE = 4096
+
+
+def current_rss_bytes() -> int:
+    """
+    Resident set size of this process: /proc on Linux, else psutil when
+    installed, else the peak from ``resource``; 0 when none is available.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil  # type: ignore
+        return int(psutil.Process().memory_info().rss)
+    except Exception:
+        pass
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def rss_available() -> bool:
+    """Whether this platform can report RSS (MemoryWatch is skipped otherwise)."""
+    return current_rss_bytes() > 0
+
+
+class MemoryWatch:
+    """
+    Side-thread RSS sampler attached to a StageRecorder: tracks the overall
+    peak and the peak seen while each stage was active. With ``trace=True``
+    it also uses tracemalloc for the per-stage traced peak and the largest
+    live NumPy allocations the first time each stage ends.
+
+    Both RSS and tracemalloc are process-wide, so figures are per job only
+    when one job runs at a time (MAX_WORKERS=1). The sampler is a real OS
+    thread even under eventlet, where a green one would not run mid-job.
+    """
+
+    def __init__(self, recorder: StageRecorder, *, interval: float = 0.02, trace: bool = False) -> None:
+        self.recorder = recorder
+        self.interval = max(0.001, float(interval))
+        self.trace = bool(trace)
+        self.baseline = current_rss_bytes()
+        self.peak = self.baseline
+        self.stage_peaks: Dict[str, int] = {}
+        self.traced: Dict[str, Dict[str, Any]] = {}
+        self._stage: Optional[str] = None
+        self._stage_peak = 0
+        self._native = native_threading()
+        self._lock = self._native.Lock()
+        self._stop = self._native.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_tracing = False
+
+    # Sampling ---------------------------------------------------------------
+
+    def _observe(self, rss: int) -> None:
+        with self._lock:
+            if rss > self.peak:
+                self.peak = rss
+            if self._stage is not None and rss > self._stage_peak:
+                self._stage_peak = rss
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._observe(current_rss_bytes())
+
+    # Stage listener ---------------------------------------------------------
+
+    def _on_stage(self, event: str, name: str) -> None:
+        rss = current_rss_bytes()
+        if event == "start":
+            with self._lock:
+                self._stage = name
+                self._stage_peak = rss
+            if self.trace:
+                tracemalloc.reset_peak()
+            return
+
+        self._observe(rss)
+        with self._lock:
+            peak = self._stage_peak
+            self._stage = None
+        self.stage_peaks[name] = max(self.stage_peaks.get(name, 0), peak)
+        if self.trace:
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            entry = self.traced.setdefault(name, {"peak_mb": 0.0})
+            entry["peak_mb"] = max(entry["peak_mb"], round(traced_peak / _MB, 2))
+            if "top" not in entry:
+                entry["top"] = self._largest_numpy_allocations()
+
+    def _largest_numpy_allocations(self) -> List[Dict[str, Any]]:
+        snap = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.DomainFilter(inclusive=True, domain=_NUMPY_DOMAIN)]
+        )
+        return [
+            {"where": str(stat.traceback[0]), "size_mb": round(stat.size / _MB, 2), "count": stat.count}
+            for stat in snap.statistics("lineno")[:_TOP_ALLOCATIONS]
+        ]
+
+    # Lifecycle --------------------------------------------------------------
+
+    def start(self) -> "MemoryWatch":
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.recorder.add_listener(self._on_stage)
+        self._thread = self._native.Thread(target=self._loop, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._observe(current_rss_bytes())
+        if self._started_tracing:
+            tracemalloc.stop()
+        self.recorder.info["memory"] = self.as_dict()
+
+    def as_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "baseline_rss_mb": round(self.baseline / _MB, 1),
+            "peak_rss_mb": round(self.peak / _MB, 1),
+            "peak_delta_mb": round((self.peak - self.baseline) / _MB, 1),
+            "stages": {k: round(v / _MB, 1) for k, v in self.stage_peaks.items()},
+        }
+        if self.trace:
+            out["traced"] = self.traced
+        return out
@@ -0,0 +1,156 @@
+# backend/services/metrics.py
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+# In-process aggregates exposed at /api/metrics (Prometheus text format 0.0.4).
+# Jobs run on this process's thread pool, so one registry sees all of them.
+
+_SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    def __init__(self, buckets: Iterable[float] = _SECONDS_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        v = float(value)
+        self.counts[bisect.bisect_left(self.buckets, v)] += 1
+        self.sum += v
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        out, running = [], 0
+        for le, n in zip([*(f"{b:g}" for b in self.buckets), "+Inf"], self.counts):
+            running += n
+            out.append((le, running))
+        return out
+
+
+_lock = threading.Lock()
+_stage_seconds: Dict[str, Histogram] = {}
+_job_seconds: Dict[str, Histogram] = {}
+_jobs_total: Dict[str, int] = {}
+_queue_wait = Histogram()
+_queued = 0
+_running = 0
+_janitor_jobs: Dict[str, int] = {}
+_janitor_bytes: Dict[str, int] = {}
+_jobs_disk_bytes = 0
+
+
+def observe_stages(stages: Mapping[str, float]) -> None:
+    with _lock:
+        for name, seconds in stages.items():
+            _stage_seconds.setdefault(name, Histogram()).observe(seconds)
+
+
+def observe_job(state: str, seconds: float) -> None:
+    with _lock:
+        _job_seconds.setdefault(state, Histogram()).observe(seconds)
+        _jobs_total[state] = _jobs_total.get(state, 0) + 1
+
+
+def queue_submitted() -> None:
+    global _queued
+    with _lock:
+        _queued += 1
+
+
+def queue_started(wait_seconds: float) -> None:
+    global _queued, _running
+    with _lock:
+        _queued = max(0, _queued - 1)
+        _running += 1
+        _queue_wait.observe(wait_seconds)
+
+
+def queue_finished() -> None:
+    global _running
+    with _lock:
+        _running = max(0, _running - 1)
+
+
+def janitor_evicted(reason: str, jobs: int, nbytes: int) -> None:
+    with _lock:
+        _janitor_jobs[reason] = _janitor_jobs.get(reason, 0) + int(jobs)
+        _janitor_bytes[reason] = _janitor_bytes.get(reason, 0) + int(nbytes)
+
+
+def set_jobs_disk_bytes(nbytes: int) -> None:
+    global _jobs_disk_bytes
+    with _lock:
+        _jobs_disk_bytes = int(nbytes)
+
+
+def reset() -> None:
+    """Drop all aggregates (tests)."""
+    global _queue_wait, _queued, _running, _jobs_disk_bytes
+    with _lock:
+        _janitor_jobs.clear()
+        _janitor_bytes.clear()
+        _jobs_disk_bytes = 0
+        _stage_seconds.clear()
+        _job_seconds.clear()
+        _jobs_total.clear()
+        _queue_wait = Histogram()
+        _queued = 0
+        _running = 0
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _histogram_lines(name: str, label: str, series: Mapping[str, Histogram]) -> List[str]:
+    lines = []
+    for key in sorted(series):
+        h = series[key]
+        base = f'{label}="{_label(key)}",' if label else ""
+        for le, n in h.cumulative():
+            lines.append(f'{name}_bucket{{{base}le="{le}"}} {n}')
+        sel = f"{{{base.rstrip(',')}}}" if base else ""
+        lines.append(f"{name}_sum{sel} {h.sum:.6f}")
+        lines.append(f"{name}_count{sel} {h.count}")
+    return lines
+
+
+def render() -> str:
+    with _lock:
+        lines = [
+            "# HELP desolidify_stage_seconds Wall time spent per job stage.",
+            "# TYPE desolidify_stage_seconds histogram",
+            *_histogram_lines("desolidify_stage_seconds", "stage", _stage_seconds),
+            "# HELP desolidify_job_seconds Task run time by final state.",
+            "# TYPE desolidify_job_seconds histogram",
+            *_histogram_lines("desolidify_job_seconds", "state", _job_seconds),
+            "# HELP desolidify_jobs_total Jobs completed by final state.",
+            "# TYPE desolidify_jobs_total counter",
+            *(f'desolidify_jobs_total{{state="{_label(k)}"}} {v}' for k, v in sorted(_jobs_total.items())),
+            "# HELP desolidify_queue_wait_seconds Time from submission to a worker picking the job up.",
+            "# TYPE desolidify_queue_wait_seconds histogram",
+            *_histogram_lines("desolidify_queue_wait_seconds", "", {"": _queue_wait}),
+            "# HELP desolidify_queue_depth Jobs submitted but not yet started.",
+            "# TYPE desolidify_queue_depth gauge",
+            f"desolidify_queue_depth {_queued}",
+            "# HELP desolidify_jobs_running Jobs currently executing.",
+            "# TYPE desolidify_jobs_running gauge",
+            f"desolidify_jobs_running {_running}",
+            "# HELP desolidify_janitor_evicted_jobs_total Job folders removed by the janitor, by reason (age|size).",
+            "# TYPE desolidify_janitor_evicted_jobs_total counter",
+            *(f'desolidify_janitor_evicted_jobs_total{{reason="{_label(k)}"}} {v}' for k, v in sorted(_janitor_jobs.items())),
+            "# HELP desolidify_janitor_reclaimed_bytes_total Bytes reclaimed by the janitor, by reason (age|size).",
+            "# TYPE desolidify_janitor_reclaimed_bytes_total counter",
+            *(f'desolidify_janitor_reclaimed_bytes_total{{reason="{_label(k)}"}} {v}' for k, v in sorted(_janitor_bytes.items())),
+            "# HELP desolidify_jobs_disk_bytes Bytes held by job folders at the last janitor sweep.",
+            "# TYPE desolidify_jobs_disk_bytes gauge",
+            f"desolidify_jobs_disk_bytes {_jobs_disk_bytes}",
+        ]
+    return "\n".join(lines) + "\n"
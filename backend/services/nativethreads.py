@@ -0,0 +1,22 @@
+# backend/services/nativethreads.py
+from __future__ import annotations
+
+import threading
+from types import ModuleType
+
+# Side samplers (stack profiler, RSS watch) must run on a real OS thread. Under
+# `gunicorn -k eventlet`, `threading` is monkey-patched: a sampler started with
+# it is a greenlet that never runs while a job holds the CPU, and
+# threading.get_ident() names a greenlet rather than the OS thread whose frames
+# sys._current_frames() reports.
+
+
+def native_threading() -> ModuleType:
+    """The unpatched ``threading`` module (``threading`` itself when not patched)."""
+    try:
+        from eventlet import patcher  # type: ignore
+    except Exception:
+        return threading
+    if patcher.is_monkey_patched("thread"):
+        return patcher.original("threading")
+    return threading
@@ -2,32 +2,120 @@
 from __future__ import annotations
 
 import io
-from typing import Tuple
+import threading
+from typing import Dict, Tuple
 
-# Optional dependencies
+# Optional dependencies: numpy + trimesh are enough for the software
+# rasterizer; pyrender + Pillow add the OpenGL path.
 try:
     import numpy as np
     import trimesh
-    import pyrender
-    from PIL import Image
 except Exception:  # pragma: no cover
     np = None  # type: ignore
     trimesh = None  # type: ignore
+
+try:
+    import pyrender
+    from PIL import Image
+except Exception:  # pragma: no cover
     pyrender = None  # type: ignore
     Image = None  # type: ignore
 
+from .storage import _config
 
-def stl_to_png_bytes(stl_bytes: bytes, size: Tuple[int, int] = (800, 600), background=(255, 255, 255, 0)) -> bytes:
+_BACKENDS = ("auto", "pyrender", "numpy")
+
+# Set once OpenGL context creation fails (no display / EGL / OSMesa) so
+# "auto" stops paying for a doomed attempt on every render.
+_gl_broken = False
+
+# One long-lived OffscreenRenderer per thread (GL contexts are thread-bound),
+# keyed by viewport size. Context creation dominates a single render.
+_pool = threading.local()
+
+
+def _renderer(size: Tuple[int, int]):
+    renderers: Dict[Tuple[int, int], object] = getattr(_pool, "renderers", None) or {}
+    _pool.renderers = renderers
+    r = renderers.get(size)
+    if r is None:
+        global _gl_broken
+        try:
+            r = pyrender.OffscreenRenderer(viewport_width=size[0], viewport_height=size[1])
+        except Exception:
+            # No usable GL platform: "auto" goes straight to NumPy from now on
+            _gl_broken = True
+            raise
+        renderers[size] = r
+    return r
+
+
+def _drop_renderer(size: Tuple[int, int]) -> None:
+    r = (getattr(_pool, "renderers", None) or {}).pop(size, None)
+    if r is not None:
+        try:
+            r.delete()
+        except Exception:
+            pass
+
+
+def release_renderers() -> None:
+    """Free this thread's GL contexts (after rendering on a short-lived request thread)."""
+    for size in list((getattr(_pool, "renderers", None) or {}).keys()):
+        _drop_renderer(size)
+
+
+def thumbnail_size() -> Tuple[int, int]:
+    return int(_config("THUMBNAIL_WIDTH", 320)), int(_config("THUMBNAIL_HEIGHT", 240))
+
+
+def preview_backend() -> str:
+    backend = str(_config("PREVIEW_BACKEND", "auto")).strip().lower()
+    return backend if backend in _BACKENDS else "auto"
+
+
+def _camera(mesh):
+    """Eye/target shared by both backends: looking down the (1, 1, 1) diagonal."""
+    centroid = mesh.centroid
+    extents = float(mesh.extents.max()) if hasattr(mesh.extents, "max") else float(mesh.extents)
+    dist = max(1.5 * extents, 1.0)
+    return centroid + [dist, dist, dist], centroid
+
+
+def mesh_to_png_bytes(mesh, size: Tuple[int, int] = (800, 600), background=(255, 255, 255, 0)) -> bytes:
     """
-    Render an STL (bytes) to a PNG snapshot and return PNG bytes.
+    Render a trimesh to a PNG snapshot.
+    PREVIEW_BACKEND=auto uses this thread's pooled pyrender renderer and falls
+    back to the NumPy rasterizer when OpenGL is unavailable.
     If preview stack is unavailable, raises RuntimeError.
     """
-    if any(x is None for x in (np, trimesh, pyrender, Image)):
-        raise RuntimeError("Preview stack not available (requires numpy, trimesh, pyrender, Pillow).")
+    if np is None or trimesh is None:
+        raise RuntimeError("Preview stack not available (requires numpy, trimesh).")
+    size = (int(size[0]), int(size[1]))
+    backend = preview_backend()
 
-    mesh = trimesh.load(io.BytesIO(stl_bytes), file_type="stl")
-    if not isinstance(mesh, trimesh.Trimesh):
-        mesh = mesh.dump().sum()
+    if backend == "pyrender" or (backend == "auto" and pyrender is not None and Image is not None and not _gl_broken):
+        try:
+            return _render_pyrender(mesh, size, background)
+        except Exception:
+            if backend == "pyrender":
+                raise
+            # Only this render falls back; a failed context creation also set _gl_broken
+    return _render_numpy(mesh, size, background)
+
+
+def _render_numpy(mesh, size: Tuple[int, int], background) -> bytes:
+    from .softrender import encode_png, render_mesh_rgba
+
+    eye, target = _camera(mesh)
+    rgba = render_mesh_rgba(mesh.vertices, mesh.faces, size, eye=eye, target=target,
+                            yfov=np.deg2rad(45.0), background=background)
+    return encode_png(rgba)
+
+
+def _render_pyrender(mesh, size: Tuple[int, int], background) -> bytes:
+    if pyrender is None or Image is None:
+        raise RuntimeError("Preview stack not available (requires numpy, trimesh, pyrender, Pillow).")
 
     scene = pyrender.Scene(bg_color=background, ambient_light=(0.3, 0.3, 0.3, 1.0))
     tri = pyrender.Mesh.from_trimesh(mesh, smooth=True)
@@ -37,20 +125,15 @@ def stl_to_png_bytes(stl_bytes: bytes, size: Tuple[int, int] = (800, 600), backg
     light = pyrender.DirectionalLight(color=[1.0, 1.0, 1.0], intensity=3.0)
     scene.add(light)
     # Camera
-    centroid = mesh.centroid
-    extents = float(mesh.extents.max()) if hasattr(mesh.extents, "max") else float(mesh.extents)
-    dist = max(1.5 * extents, 1.0)
+    eye, target = _camera(mesh)
     camera = pyrender.PerspectiveCamera(yfov=np.deg2rad(45.0))
-    cam_node = scene.add(camera, pose=_look_at(centroid + [dist, dist, dist], centroid))
+    scene.add(camera, pose=_look_at(eye, target))
     try:
-        r = pyrender.OffscreenRenderer(viewport_width=size[0], viewport_height=size[1])
-        color, _ = r.render(scene)
-    finally:
-        try:
-            r.delete()
-        except Exception:
-            pass
-        scene.remove_node(cam_node)
+        color, _ = _renderer(size).render(scene)
+    except Exception:
+        # Context may be unusable now; rebuild on the next call
+        _drop_renderer(size)
+        raise
 
     img = Image.fromarray(color, mode="RGBA")
     buf = io.BytesIO()
@@ -58,6 +141,18 @@ def stl_to_png_bytes(stl_bytes: bytes, size: Tuple[int, int] = (800, 600), backg
     return buf.getvalue()
 
 
+def stl_to_png_bytes(stl_bytes: bytes, size: Tuple[int, int] = (800, 600), background=(255, 255, 255, 0)) -> bytes:
+    """
+    Render an STL (bytes) to a PNG snapshot and return PNG bytes.
+    If preview stack is unavailable, raises RuntimeError.
+    """
+    if trimesh is None:
+        raise RuntimeError("Preview stack not available (requires numpy, trimesh).")
+    from backend.desolidify_engine.engine import load_mesh_bytes
+
+    return mesh_to_png_bytes(load_mesh_bytes(stl_bytes), size=size, background=background)
+
+
 def _look_at(eye, target, up=(0, 0, 1)):
     """
     Build a 4x4 look-at pose matrix for pyrender.
@@ -0,0 +1,93 @@
+# backend/services/profiler.py
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .nativethreads import native_threading
+from .storage import PROFILE_NAME, _atomic_write_text, _config, job_dir, write_log
+
+# Deepest stack kept per sample (recursion in trimesh/rtree can go far)
+_MAX_DEPTH = 256
+
+
+def enabled() -> bool:
+    """Per-job profiling is an operator opt-in (PROFILING_ENABLED)."""
+    return str(_config("PROFILING_ENABLED", "0")).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__") or os.path.basename(code.co_filename)
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{module}:{name}"
+
+
+class StackSampler:
+    """
+    Low-overhead wall-clock sampler for one thread. A daemon OS thread (real
+    even under eventlet) reads the target's current frame every ``interval``
+    seconds and counts the stack in collapsed ("folded") form:
+    ``root;...;leaf <count>``, the input format of flamegraph.pl and speedscope.
+    ``thread_id`` is an OS thread ident (``native_threading().get_ident()``);
+    under eventlet every green thread shares one, so the sample is whatever
+    runs there, which is the job while it holds the CPU.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005) -> None:
+        self.thread_id = thread_id
+        self.interval = max(0.001, float(interval))
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._native = native_threading()
+        self._stop = self._native.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None and len(stack) < _MAX_DEPTH:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        if stack:
+            self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "StackSampler":
+        self._thread = self._native.Thread(target=self._loop, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in sorted(self.counts.items()))
+
+
+@contextmanager
+def profile_job(job_id: str) -> Iterator[StackSampler]:
+    """Sample the calling thread while the block runs; save profile.folded."""
+    interval_ms = float(_config("PROFILER_INTERVAL_MS", 5))
+    sampler = StackSampler(native_threading().get_ident(), interval_ms / 1000.0).start()
+    t0 = time.perf_counter()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+        try:
+            _atomic_write_text(job_dir(job_id) / PROFILE_NAME, sampler.folded())
+            write_log(job_id, f"Profile captured: {sampler.samples} samples over {time.perf_counter() - t0:.1f}s")
+        except Exception as e:
+            write_log(job_id, f"Profile not written: {e}")
@@ -1,7 +1,7 @@
 # backend/services/progress.py
 from __future__ import annotations
 
-from typing import Optional
+from typing import Callable, Dict, Mapping, Optional
 
 try:
     from flask import current_app
@@ -16,15 +16,121 @@ except Exception:  # pragma: no cover
     socketio_emit_progress = None  # type: ignore
 
 
-def set_progress(job_id: str, frac: float, message: Optional[str] = None) -> None:
+# Job phases in order, the recorder stages each one covers, and default
+# weights (share of a job's wall time, from per-stage timings of the benchmark
+# meshes). `flask calibrate-model` refits the weights from finished jobs.
+PHASES = ("load", "sampling", "marching_cubes", "post_process", "export", "thumbnail")
+PHASE_STAGES: Dict[str, str] = {
+    "load": "load",
+    "process": "sampling",
+    "grid_setup": "sampling",
+    "hole_fields": "sampling",
+    "signed_distance": "sampling",
+    "marching_cubes": "marching_cubes",
+    "post_process": "post_process",
+    "export": "export",
+    "write": "export",
+    "thumbnail": "thumbnail",
+}
+DEFAULT_PHASE_WEIGHTS: Dict[str, float] = {
+    "load": 0.01,
+    "sampling": 0.86,
+    "marching_cubes": 0.01,
+    "post_process": 0.03,
+    "export": 0.03,
+    "thumbnail": 0.06,
+}
+PHASE_MESSAGES = {
+    "load": "Loading mesh",
+    "sampling": "Sampling distance field",
+    "marching_cubes": "Extracting surface",
+    "post_process": "Cleaning up mesh",
+    "export": "Writing STL",
+    "thumbnail": "Rendering thumbnail",
+}
+
+
+def set_progress(job_id: str, frac: float, message: Optional[str] = None,
+                 eta_seconds: Optional[float] = None, phase: Optional[str] = None) -> None:
     """
     Persist progress to status.json and emit over WebSocket room job:<id>.
     """
     f = float(max(0.0, min(1.0, frac)))
-    set_status(job_id, state="running", progress=f, message=message or "")
+    eta = None if eta_seconds is None else round(max(0.0, float(eta_seconds)), 1)
+    if message is None and phase is not None:
+        message = PHASE_MESSAGES.get(phase)
+    set_status(job_id, state="running", progress=f, message=message or "", eta_seconds=eta, phase=phase)
     try:
         if socketio_emit_progress:
-            socketio_emit_progress(job_id, f, message)
+            socketio_emit_progress(job_id, f, message, eta_seconds=eta, phase=phase)
     except Exception:
         # Best-effort only
         pass
+
+
+class PhaseProgress:
+    """
+    Maps per-phase progress onto one overall fraction: phase i spans
+    [sum of earlier weights, + its own weight]. Phases only move forward;
+    progress inside the current phase may go back (memory-backoff retries).
+    ``report(overall, phase)`` is called on every change.
+    """
+
+    def __init__(self, report: Callable[[float, str], None],
+                 weights: Optional[Mapping[str, float]] = None) -> None:
+        self._report = report
+        self.stage_map = dict(PHASE_STAGES)
+        w = {p: max(0.0, float((weights or {}).get(p, DEFAULT_PHASE_WEIGHTS[p]))) for p in PHASES}
+        total = sum(w.values()) or 1.0
+        self.weights = {p: v / total for p, v in w.items()}
+        self.phase: Optional[str] = None
+        self._frac = 0.0
+        self._merged: set = set()
+
+    def merge(self, phase: str, into: str) -> None:
+        """
+        Account ``phase`` (its stages and weight) as part of ``into``. In-stage
+        reports of the merged phase are dropped: they measure one step of
+        ``into`` (e.g. one tile), not ``into`` as a whole.
+        """
+        self._merged.add(phase)
+        self.weights[into] += self.weights.pop(phase, 0.0)
+        self.weights[phase] = 0.0
+        for stage, p in self.stage_map.items():
+            if p == phase:
+                self.stage_map[stage] = into
+
+    def value(self) -> float:
+        if self.phase is None:
+            return 0.0
+        i = PHASES.index(self.phase)
+        start = sum(self.weights[p] for p in PHASES[:i])
+        return min(1.0, start + self.weights[self.phase] * self._frac)
+
+    def update(self, phase: str, frac: float) -> None:
+        if self.phase is not None and PHASES.index(phase) < PHASES.index(self.phase):
+            return
+        if phase != self.phase:
+            self.phase, self._frac = phase, 0.0
+        self._frac = float(max(0.0, min(1.0, frac)))
+        self._report(self.value(), phase)
+
+    def enter(self, phase: str) -> None:
+        if phase != self.phase:
+            self.update(phase, 0.0)
+
+    def callback(self, phase: str) -> Callable[[float], None]:
+        return lambda frac: self.update(phase, frac)
+
+    def attach(self, rec) -> None:
+        """Follow a StageRecorder: stage starts enter phases, ``rec.report`` moves within them."""
+        def _on_stage(event: str, name: str) -> None:
+            if event == "start" and name in self.stage_map:
+                self.enter(self.stage_map[name])
+
+        def _on_progress(name: str, frac: float) -> None:
+            if name in self.stage_map and PHASE_STAGES.get(name) not in self._merged:
+                self.update(self.stage_map[name], frac)
+
+        rec.add_listener(_on_stage)
+        rec.add_progress_listener(_on_progress)
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import concurrent.futures
 import threading
+import time
 import uuid
 from typing import Any, Dict, Optional
 
@@ -11,6 +12,7 @@ try:
 except Exception:  # pragma: no cover
     current_app = None  # type: ignore
 
+from . import metrics
 from .storage import get_status, set_status, write_log
 
 _executor_lock = threading.Lock()
@@ -35,27 +37,76 @@ def _ensure_executor() -> concurrent.futures.ThreadPoolExecutor:
     return _executor
 
 
-def submit_perforate(job_id: str, params: Dict[str, Any]) -> str:
+def prewarm() -> None:
+    """
+    Warm the engine (imports plus a tiny perforation) on the worker pool in
+    the background so the first real job does not pay for it. The compute
+    workers are threads of this process and share its imports, rtree indexes
+    and numba kernels, so one warm-up covers every worker; ``warm_up`` runs
+    once per process anyway.
+    """
+    from ..desolidify_engine.warmup import warm_up
+
+    _ensure_executor().submit(warm_up)
+
+
+def submit_perforate(job_id: str, params: Dict[str, Any], *, cache_key: Optional[str] = None,
+                     profile: bool = False) -> str:
     """
     Schedule the perforation task on the local thread pool.
+    With ``cache_key``, a successful result is added to the result cache and
+    the in-flight claim is released when the task ends. With ``profile``, the
+    task runs under the stack sampler and leaves profile.folded behind.
     Returns a task_id (UUID).
     """
     task_id = str(uuid.uuid4())
     exec_ = _ensure_executor()
+    # Carry the app (JOBS_ROOT, cache limits, ...) into the worker thread
+    try:
+        app = current_app._get_current_object()  # type: ignore
+    except Exception:
+        app = None
+
+    submitted = time.monotonic()
+    metrics.queue_submitted()
 
     def _run():
+        wait_s = time.monotonic() - submitted
+        metrics.queue_started(wait_s)
+        try:
+            if app is not None:
+                with app.app_context():
+                    _run_task(wait_s)
+            else:
+                _run_task(wait_s)
+        finally:
+            metrics.queue_finished()
+            if cache_key:
+                from .cache import release
+                release(job_id)
+
+    def _run_task(wait_s: float):
         set_status(job_id, state="running", progress=0.0, message="Started")
         write_log(job_id, f"Task {task_id} started")
         try:
             # Defer to tasks module (to be implemented): tasks.perforate.run(job_id, params)
             from ..tasks.perforate import run as task_run  # type: ignore
+            from ..desolidify_engine.instrument import StageRecorder
         except Exception as e:
             write_log(job_id, f"Task import error: {e}")
             set_status(job_id, state="error", progress=0.0, message=f"Task import error: {e}")
             return
 
+        rec = StageRecorder()
+        rec.info["queue_wait_s"] = round(wait_s, 6)
         try:
-            task_run(job_id, params)
+            if profile:
+                from .profiler import profile_job
+                rec.info["profiled"] = True
+                with profile_job(job_id):
+                    task_run(job_id, params, recorder=rec)
+            else:
+                task_run(job_id, params, recorder=rec)
         except Exception as e:
             write_log(job_id, f"Task failed: {e}")
             set_status(job_id, state="error", progress=0.0, message=str(e))
@@ -65,6 +116,13 @@ def submit_perforate(job_id: str, params: Dict[str, Any]) -> str:
             st = get_status(job_id) or {}
             if st.get("state") not in {"finished", "error"}:
                 set_status(job_id, state="finished", progress=1.0, message="Completed")
+                st = {"state": "finished"}
+            if cache_key and st.get("state") == "finished":
+                try:
+                    from .cache import store
+                    store(cache_key, job_id)
+                except Exception as e:
+                    write_log(job_id, f"Result cache store failed: {e}")
 
     exec_.submit(_run)
     return task_id
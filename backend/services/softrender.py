@@ -0,0 +1,177 @@
+# backend/services/softrender.py
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Sequence, Tuple
+
+import numpy as np
+
+try:
+    from PIL import Image
+except Exception:  # pragma: no cover
+    Image = None  # type: ignore
+
+# Candidate-pixel budget per vectorized batch (bounds temporaries to ~100 MB)
+_BATCH_PIXELS = 1_000_000
+# Bounding-box side lengths are rounded up to these buckets so triangles of
+# similar size share one batch (padding pixels fail the inside test anyway).
+_BUCKETS = np.array([1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64, 96, 128, 192, 256,
+                     384, 512, 768, 1024, 1536, 2048, 3072, 4096], dtype=np.int64)
+
+_AMBIENT = 0.25
+_DIFFUSE = 0.75
+
+
+def _camera_basis(eye: np.ndarray, target: np.ndarray, up: Sequence[float]) -> np.ndarray:
+    """Rows x, y, z of the camera frame (camera looks down -z, as in pyrender)."""
+    z = eye - target
+    z = z / (np.linalg.norm(z) + 1e-9)
+    x = np.cross(np.asarray(up, dtype=float), z)
+    x = x / (np.linalg.norm(x) + 1e-9)
+    y = np.cross(z, x)
+    return np.stack([x, y, z])
+
+
+def render_mesh_rgba(vertices: np.ndarray, faces: np.ndarray, size: Tuple[int, int], *,
+                     eye, target, up=(0, 0, 1), yfov: float = np.deg2rad(45.0),
+                     color=(178, 184, 196), background=(255, 255, 255, 0)) -> np.ndarray:
+    """
+    Z-buffered, flat Lambert-shaded render of a triangle mesh → (H, W, 4) uint8.
+
+    Triangles are binned by (rounded) screen bounding-box size and each bin is
+    rasterized in one vectorized edge-function pass; triangles covering no
+    pixel centre are splatted at their centroid so dense meshes stay solid.
+    Depth resolution keeps the nearest fragment per pixel (1/z, interpolated
+    linearly in screen space).
+    """
+    W, H = int(size[0]), int(size[1])
+    if not (0 < W <= _BUCKETS[-1] and 0 < H <= _BUCKETS[-1]):
+        raise ValueError(f"Unsupported render size: {W}x{H}")
+    eye = np.asarray(eye, dtype=float)
+    target = np.asarray(target, dtype=float)
+    R = _camera_basis(eye, target, up)
+
+    cam = (np.asarray(vertices, dtype=np.float64) - eye) @ R.T
+    depth = -cam[:, 2]
+    near = 1e-6 * max(1.0, float(np.abs(depth).max(initial=1.0)))
+    f = 1.0 / np.tan(yfov * 0.5)
+    safe = np.where(depth > near, depth, near)
+    sx = (f * cam[:, 0] / safe / (W / H) + 1.0) * 0.5 * W
+    sy = (1.0 - f * cam[:, 1] / safe) * 0.5 * H
+    inv_z = 1.0 / safe
+
+    faces = np.asarray(faces, dtype=np.int64)
+    tri_w = np.asarray(vertices, dtype=np.float64)[faces]
+    normals = np.cross(tri_w[:, 1] - tri_w[:, 0], tri_w[:, 2] - tri_w[:, 0])
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True) + 1e-20
+    to_eye = eye - tri_w.mean(axis=1)
+    facing = np.einsum("ij,ij->i", normals, to_eye)
+
+    # Headlight slightly above the view direction
+    light = R[2] + 0.35 * R[1]
+    light /= np.linalg.norm(light)
+    shade = _AMBIENT + _DIFFUSE * np.clip(normals @ light, 0.0, 1.0)
+
+    keep = (facing > 0) & np.all(depth[faces] > near, axis=1)
+    fid = np.flatnonzero(keep)
+    fv = faces[fid]
+    x = sx[fv]
+    y = sy[fv]
+    iz = inv_z[fv]
+
+    zbuf = np.zeros(W * H, dtype=np.float64)  # stores 1/z; 0 = empty
+    fbuf = np.full(W * H, -1, dtype=np.int64)
+
+    def _merge(pix: np.ndarray, z: np.ndarray, face: np.ndarray) -> None:
+        if pix.size == 0:
+            return
+        order = np.lexsort((-z, pix))
+        pix, z, face = pix[order], z[order], face[order]
+        first = np.empty(pix.size, dtype=bool)
+        first[0] = True
+        np.not_equal(pix[1:], pix[:-1], out=first[1:])
+        pix, z, face = pix[first], z[first], face[first]
+        better = z > zbuf[pix]
+        zbuf[pix[better]] = z[better]
+        fbuf[pix[better]] = face[better]
+
+    # Pixel-centre range covered by each triangle's bounding box
+    ix0 = np.ceil(x.min(axis=1) - 0.5).astype(np.int64)
+    ix1 = np.floor(x.max(axis=1) - 0.5).astype(np.int64)
+    iy0 = np.ceil(y.min(axis=1) - 0.5).astype(np.int64)
+    iy1 = np.floor(y.max(axis=1) - 0.5).astype(np.int64)
+    ix0c, iy0c = np.maximum(ix0, 0), np.maximum(iy0, 0)
+    ix1c, iy1c = np.minimum(ix1, W - 1), np.minimum(iy1, H - 1)
+    area2 = (x[:, 1] - x[:, 0]) * (y[:, 2] - y[:, 0]) - (x[:, 2] - x[:, 0]) * (y[:, 1] - y[:, 0])
+    offscreen = (ix1c < ix0c) | (iy1c < iy0c)
+    splat = (ix1 < ix0) | (iy1 < iy0) | (area2 == 0)
+
+    # Sub-pixel / degenerate triangles: one fragment at the centroid
+    s = np.flatnonzero(splat)
+    cx = np.floor(x[s].mean(axis=1)).astype(np.int64)
+    cy = np.floor(y[s].mean(axis=1)).astype(np.int64)
+    on = (cx >= 0) & (cx < W) & (cy >= 0) & (cy < H)
+    _merge(cy[on] * W + cx[on], iz[s[on]].mean(axis=1), fid[s[on]])
+
+    # Everything else: bin by bucketed bbox size and test pixel centres
+    r = np.flatnonzero(~splat & ~offscreen)
+    bw = _BUCKETS[np.searchsorted(_BUCKETS, ix1c[r] - ix0c[r] + 1)]
+    bh = _BUCKETS[np.searchsorted(_BUCKETS, iy1c[r] - iy0c[r] + 1)]
+    bin_key = bw * (_BUCKETS[-1] + 1) + bh
+    order = np.argsort(bin_key, kind="stable")
+    r, bw, bh, bin_key = r[order], bw[order], bh[order], bin_key[order]
+    starts = np.flatnonzero(np.r_[True, bin_key[1:] != bin_key[:-1]])
+    ends = np.r_[starts[1:], len(r)]
+
+    for a, b in zip(starts, ends):
+        w, h = int(bw[a]), int(bh[a])
+        oy, ox = np.divmod(np.arange(w * h, dtype=np.int64), w)
+        step = max(1, _BATCH_PIXELS // (w * h))
+        for c in range(a, b, step):
+            t = r[c:min(c + step, b)]
+            px = ix0c[t][:, None] + ox[None, :]
+            py = iy0c[t][:, None] + oy[None, :]
+            pcx = px + 0.5
+            pcy = py + 0.5
+            X, Y = x[t], y[t]
+            inv_a = 1.0 / area2[t][:, None]
+            w0 = ((X[:, 1:2] - pcx) * (Y[:, 2:3] - pcy) - (X[:, 2:3] - pcx) * (Y[:, 1:2] - pcy)) * inv_a
+            w1 = ((X[:, 2:3] - pcx) * (Y[:, 0:1] - pcy) - (X[:, 0:1] - pcx) * (Y[:, 2:3] - pcy)) * inv_a
+            w2 = 1.0 - w0 - w1
+            inside = (w0 >= -1e-9) & (w1 >= -1e-9) & (w2 >= -1e-9) & (px < W) & (py < H)
+            Z = iz[t]
+            z = w0 * Z[:, 0:1] + w1 * Z[:, 1:2] + w2 * Z[:, 2:3]
+            rows = np.broadcast_to(fid[t][:, None], inside.shape)
+            _merge((py * W + px)[inside], z[inside], rows[inside])
+
+    img = np.empty((H * W, 4), dtype=np.uint8)
+    img[:] = np.asarray(background, dtype=np.uint8)
+    hit = fbuf >= 0
+    lit = shade[fbuf[hit]][:, None] * np.asarray(color, dtype=np.float64)[None, :]
+    img[hit, :3] = np.clip(lit, 0, 255).astype(np.uint8)
+    img[hit, 3] = 255
+    return img.reshape(H, W, 4)
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """PNG-encode an (H, W, 4) uint8 image (Pillow when present, else zlib)."""
+    if Image is not None:
+        import io
+
+        buf = io.BytesIO()
+        Image.fromarray(rgba, mode="RGBA").save(buf, format="PNG")
+        return buf.getvalue()
+
+    h, w = rgba.shape[:2]
+    raw = np.empty((h, w * 4 + 1), dtype=np.uint8)
+    raw[:, 0] = 0  # filter: none
+    raw[:, 1:] = rgba.reshape(h, w * 4)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+            + chunk(b"IEND", b""))
@@ -1,21 +1,37 @@
 # backend/services/storage.py
 from __future__ import annotations
 
+import gzip
+import hashlib
 import io
 import json
 import os
 import shutil
+import tempfile
 import time
 import uuid
+from contextlib import contextmanager
 from dataclasses import asdict, is_dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional, List, Tuple
+from typing import Any, Dict, Iterator, Optional, List, Tuple
 
 try:
     from flask import current_app
 except Exception:  # pragma: no cover
     current_app = None  # type: ignore
 
+# Result artifacts inside each job folder
+RESULT_NAME = "output.stl"
+RESULT_GZIP_NAME = "output.stl.gz"
+RESULT_INFO_NAME = "result.json"
+THUMBNAIL_NAME = "thumbnail.png"
+METRICS_NAME = "metrics.json"
+PROFILE_NAME = "profile.folded"
+# Empty marker whose mtime is the last result download (janitor LRU order)
+DOWNLOAD_MARK_NAME = ".downloaded"
+
+_COPY_CHUNK = 1024 * 1024
+
 # -----------------------------------------------------------------------------
 # Paths & low-level I/O
 # -----------------------------------------------------------------------------
@@ -41,29 +57,24 @@ def job_dir(job_id: str) -> Path:
     return (_base_dir() / job_id).resolve()
 
 
-def _atomic_write_bytes(path: Path, data: bytes) -> None:
-    """Write bytes to ``path`` atomically with retry semantics on Windows.
+def _iter_job_dirs() -> Iterator[Path]:
+    """Job folders under JOBS_ROOT (dot-dirs such as the result cache are skipped)."""
+    for child in _base_dir().iterdir():
+        if child.is_dir() and not child.name.startswith("."):
+            yield child
 
-    Windows refuses to replace a file that is currently open by *any* process,
-    including readers.  Status updates can therefore race with other threads
-    polling ``status.json`` and raise ``PermissionError``.  We work around this
-    by writing to a uniquely named temporary file and retrying the final
-    ``os.replace`` a few times before giving up.
-    """
 
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-    import tempfile
+def _config(key: str, default: Any) -> Any:
+    try:
+        if current_app:  # type: ignore
+            return current_app.config.get(key, default)
+    except Exception:
+        pass
+    return os.getenv(key, default)
 
-    # Use a unique temp file in the same directory so replacement is atomic.
-    with tempfile.NamedTemporaryFile(dir=str(path.parent), prefix=path.name, delete=False) as f:
-        f.write(data)
-        f.flush()
-        os.fsync(f.fileno())
-        tmp_path = Path(f.name)
 
-    # Attempt to replace the destination, tolerating transient locking
-    # from other processes on Windows.
+def _replace_with_retry(tmp_path: Path, path: Path) -> None:
+    """``os.replace`` tolerating transient locking from other processes on Windows."""
     try:
         for attempt in range(5):
             try:
@@ -81,6 +92,28 @@ def _atomic_write_bytes(path: Path, data: bytes) -> None:
                 pass
 
 
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write bytes to ``path`` atomically with retry semantics on Windows.
+
+    Windows refuses to replace a file that is currently open by *any* process,
+    including readers.  Status updates can therefore race with other threads
+    polling ``status.json`` and raise ``PermissionError``.  We work around this
+    by writing to a uniquely named temporary file and retrying the final
+    ``os.replace`` a few times before giving up.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Use a unique temp file in the same directory so replacement is atomic.
+    with tempfile.NamedTemporaryFile(dir=str(path.parent), prefix=path.name, delete=False) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+        tmp_path = Path(f.name)
+
+    _replace_with_retry(tmp_path, path)
+
+
 def _atomic_write_text(path: Path, text: str) -> None:
     _atomic_write_bytes(path, text.encode("utf-8"))
 
@@ -117,22 +150,35 @@ def new_job() -> str:
 def save_upload(job_id: str, file_storage, *, filename_hint: str = "input.stl") -> Path:
     """
     Save uploaded file (Werkzeug FileStorage) to job folder as input.stl.
+    The content SHA-256 is computed while streaming and kept in upload.json.
     """
     d = job_dir(job_id)
     d.mkdir(parents=True, exist_ok=True)
     in_path = d / "input.stl"
-    # werkzeug FileStorage has .save()
-    file_storage.save(str(in_path))
+    h = hashlib.sha256()
+    size = 0
+    with open(in_path, "wb") as out:
+        while True:
+            chunk = file_storage.stream.read(_COPY_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+            out.write(chunk)
+            size += len(chunk)
     try:
         file_storage.close()
     except Exception:
         pass
     # Save original filename
-    meta = {"filename": filename_hint, "uploaded_at": int(time.time())}
+    meta = {"filename": filename_hint, "uploaded_at": int(time.time()), "sha256": h.hexdigest(), "size": size}
     _atomic_write_json(d / "upload.json", meta)
     return in_path
 
 
+def read_upload(job_id: str) -> Optional[Dict[str, Any]]:
+    return _read_json(job_dir(job_id) / "upload.json")
+
+
 def write_params(job_id: str, params: Dict[str, Any]) -> Path:
     p = job_dir(job_id) / "params.json"
     _atomic_write_json(p, params)
@@ -143,12 +189,15 @@ def read_params(job_id: str) -> Optional[Dict[str, Any]]:
     return _read_json(job_dir(job_id) / "params.json")
 
 
-def set_status(job_id: str, *, state: str, progress: float | int = 0.0, message: Optional[str] = None) -> Path:
+def set_status(job_id: str, *, state: str, progress: float | int = 0.0, message: Optional[str] = None,
+               **extra: Any) -> Path:
+    """Replace status.json; ``extra`` adds optional fields (e.g. ``eta_seconds``), None values dropped."""
     st = {
         "state": state,
         "progress": float(progress),
         "message": message or "",
         "ts": int(time.time()),
+        **{k: v for k, v in extra.items() if v is not None},
     }
     p = job_dir(job_id) / "status.json"
     _atomic_write_json(p, st)
@@ -160,11 +209,8 @@ def get_status(job_id: str) -> Optional[Dict[str, Any]]:
 
 
 def list_statuses() -> List[Tuple[str, Dict[str, Any]]]:
-    base = _base_dir()
     out: List[Tuple[str, Dict[str, Any]]] = []
-    for child in base.iterdir():
-        if not child.is_dir():
-            continue
+    for child in _iter_job_dirs():
         st = _read_json(child / "status.json")
         if st:
             out.append((child.name, st))
@@ -179,26 +225,140 @@ def write_log(job_id: str, line: str) -> None:
         f.write(f"[{ts}] {line}\n")
 
 
+class ResultWriter:
+    """
+    Write-only sink for ``output.stl`` that, in a single pass, also produces a
+    gzip sibling and a SHA-256 content hash (used as the download ETag).
+    Data lands in temp files inside the job folder; ``open_result`` renames
+    them into place once the writer is closed cleanly.
+    """
+
+    def __init__(self, d: Path, *, gzip_level: int):
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self._raw = tempfile.NamedTemporaryFile(dir=str(d), prefix=RESULT_NAME, delete=False)
+        self._gz_raw = None
+        self._gz = None
+        if gzip_level > 0:
+            self._gz_raw = tempfile.NamedTemporaryFile(dir=str(d), prefix=RESULT_GZIP_NAME, delete=False)
+            # mtime=0 keeps the .gz byte-identical for identical content
+            self._gz = gzip.GzipFile(fileobj=self._gz_raw, mode="wb", compresslevel=gzip_level, mtime=0)
+
+    def write(self, data) -> int:
+        self._raw.write(data)
+        if self._gz is not None:
+            self._gz.write(data)
+        self.sha256.update(data)
+        n = memoryview(data).nbytes
+        self.size += n
+        return n
+
+    def _close(self) -> None:
+        if self._gz is not None:
+            self._gz.close()
+        for f in (self._raw, self._gz_raw):
+            if f is not None and not f.closed:
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+
+    def _discard(self) -> None:
+        for f in (self._raw, self._gz_raw):
+            if f is None:
+                continue
+            try:
+                f.close()
+            except Exception:
+                pass
+            try:
+                Path(f.name).unlink()
+            except Exception:
+                pass
+
+
+@contextmanager
+def open_result(job_id: str) -> Iterator[ResultWriter]:
+    """
+    Context manager yielding a ``ResultWriter`` for the job's output STL.
+    On clean exit: ``output.stl.gz``, ``result.json`` and finally ``output.stl``
+    are moved into place (``output.stl`` last, since it marks the result ready).
+    """
+    d = job_dir(job_id)
+    d.mkdir(parents=True, exist_ok=True)
+    w = ResultWriter(d, gzip_level=int(_config("RESULT_GZIP_LEVEL", 6)))
+    try:
+        yield w
+        w._close()
+    except BaseException:
+        w._discard()
+        raise
+
+    info: Dict[str, Any] = {
+        "sha256": w.sha256.hexdigest(),
+        "size": w.size,
+        "gzip_size": None,
+        "written_at": int(time.time()),
+    }
+    if w._gz_raw is not None:
+        gz_tmp = Path(w._gz_raw.name)
+        info["gzip_size"] = gz_tmp.stat().st_size
+        _replace_with_retry(gz_tmp, d / RESULT_GZIP_NAME)
+    else:
+        (d / RESULT_GZIP_NAME).unlink(missing_ok=True)
+    _atomic_write_json(d / RESULT_INFO_NAME, info)
+    _replace_with_retry(Path(w._raw.name), d / RESULT_NAME)
+
+
 def write_result(job_id: str, source: Path | bytes | io.BytesIO) -> Path:
     """
-    Save output STL to job folder as output.stl.
+    Save output STL to job folder as output.stl (plus gzip sibling + hash).
     Accepts a filesystem path or raw bytes/BytesIO.
     """
-    out_path = job_dir(job_id) / "output.stl"
-    if isinstance(source, Path):
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copyfile(str(source), str(out_path))
-    elif isinstance(source, io.BytesIO):
-        _atomic_write_bytes(out_path, source.getvalue())
-    elif isinstance(source, bytes):
-        _atomic_write_bytes(out_path, source)
-    else:
+    if not isinstance(source, (Path, bytes, io.BytesIO)):
         raise TypeError("write_result: unsupported source type")
-    return out_path
+    with open_result(job_id) as w:
+        if isinstance(source, Path):
+            with open(source, "rb") as f:
+                shutil.copyfileobj(f, w, _COPY_CHUNK)
+        elif isinstance(source, io.BytesIO):
+            w.write(source.getbuffer())
+        else:
+            w.write(source)
+    return job_dir(job_id) / RESULT_NAME
+
+
+def read_result_info(job_id: str) -> Optional[Dict[str, Any]]:
+    """Hash/size metadata recorded when output.stl was written (None for legacy jobs)."""
+    return _read_json(job_dir(job_id) / RESULT_INFO_NAME)
+
+
+def write_thumbnail(job_id: str, png: bytes) -> Path:
+    p = job_dir(job_id) / THUMBNAIL_NAME
+    _atomic_write_bytes(p, png)
+    return p
+
+
+def write_metrics(job_id: str, metrics: Dict[str, Any]) -> Path:
+    p = job_dir(job_id) / METRICS_NAME
+    _atomic_write_json(p, metrics)
+    return p
+
+
+def read_metrics(job_id: str) -> Optional[Dict[str, Any]]:
+    return _read_json(job_dir(job_id) / METRICS_NAME)
 
 
 def has_result(job_id: str) -> bool:
-    return (job_dir(job_id) / "output.stl").exists()
+    return (job_dir(job_id) / RESULT_NAME).exists()
+
+
+def touch_download(job_id: str) -> None:
+    """Record a result download (mtime of the job's download marker)."""
+    mark = job_dir(job_id) / DOWNLOAD_MARK_NAME
+    try:
+        mark.touch()
+    except OSError:
+        pass
 
 
 def purge_old_jobs(*, hours: int) -> int:
@@ -207,11 +367,8 @@ def purge_old_jobs(*, hours: int) -> int:
     Returns count of deleted jobs.
     """
     cutoff = time.time() - hours * 3600
-    base = _base_dir()
     deleted = 0
-    for child in base.iterdir():
-        if not child.is_dir():
-            continue
+    for child in _iter_job_dirs():
         st = _read_json(child / "status.json") or {}
         ts = st.get("ts")
         if not isinstance(ts, (int, float)):
@@ -229,10 +386,12 @@ def purge_old_jobs(*, hours: int) -> int:
 
 
 def purge_all_jobs() -> int:
-    base = _base_dir()
     count = 0
-    for child in base.iterdir():
-        if child.is_dir():
-            shutil.rmtree(child, ignore_errors=True)
-            count += 1
+    for child in _iter_job_dirs():
+        shutil.rmtree(child, ignore_errors=True)
+        count += 1
     return count
+
+
+def delete_job(job_id: str) -> None:
+    shutil.rmtree(job_dir(job_id), ignore_errors=True)
@@ -1,43 +1,176 @@
 # backend/tasks/perforate.py
 from __future__ import annotations
 
-import io
+import shutil
+import time
 from pathlib import Path
 from typing import Any, Dict, Optional, Callable
 
+from backend.services import metrics
 from backend.services.storage import (
     job_dir,
+    get_status,
     read_params,
     write_params,
     write_log,
+    write_metrics,
     set_status,
-    write_result,
+    open_result,
+    _config,
+    write_thumbnail,
 )
-from backend.services.progress import set_progress as _set_progress
+from backend.services.progress import PhaseProgress, set_progress as _set_progress
 from backend.desolidify_engine.settings import from_params, clamp_settings
 from backend.desolidify_engine.engine import perforate_mesh_sdf, load_mesh_any
+from backend.desolidify_engine.instrument import StageRecorder
+from backend.desolidify_engine.stl_io import write_binary_stl
+from backend.desolidify_engine.tiling import TILE_DIRNAME, TileBoard, plan_tiles, worker_id
+from backend.desolidify_engine.version import __version__
 
 
-def _progress_cb(job_id: str) -> Callable[[float], None]:
-    last = -1
+# Weight of the newest slice in the moving seconds-per-progress average
+_ETA_ALPHA = 0.2
 
-    def _cb(frac: float) -> None:
-        nonlocal last
-        pct = int(max(0, min(100, round(float(frac) * 100))))
-        if pct != last:
-            last = pct
-            _set_progress(job_id, pct / 100.0)
+
+def _progress_cb(job_id: str, clock: Callable[[], float] = time.monotonic) -> Callable[..., None]:
+    """
+    Overall progress callback (fed by PhaseProgress, or once per z-slice).
+    Persists whole percents and phase changes, with a moving ``eta_seconds``
+    from recent throughput.
+    """
+    last, last_phase = -1, None
+    prev_t, prev_frac = clock(), 0.0
+    rate: Optional[float] = None  # seconds per unit of progress
+
+    def _cb(frac: float, phase: Optional[str] = None) -> None:
+        nonlocal last, last_phase, prev_t, prev_frac, rate
+        frac = float(frac)
+        now = clock()
+        if frac < prev_frac:
+            # Memory backoff restarted the engine at a coarser voxel
+            rate = None
+        elif frac > prev_frac:
+            inst = (now - prev_t) / (frac - prev_frac)
+            rate = inst if rate is None else _ETA_ALPHA * inst + (1.0 - _ETA_ALPHA) * rate
+        prev_t, prev_frac = now, frac
+
+        pct = int(max(0, min(100, round(frac * 100))))
+        if pct != last or phase != last_phase:
+            last, last_phase = pct, phase
+            eta = rate * (1.0 - frac) if rate is not None else None
+            _set_progress(job_id, pct / 100.0, eta_seconds=eta, phase=phase)
     return _cb
 
 
-def run(job_id: str, params: Dict[str, Any] | None = None) -> None:
+def _phase_weights() -> Optional[Dict[str, float]]:
+    """Phase weights fitted by `flask calibrate-model`, if any."""
+    try:
+        from backend.services.costmodel import load_model
+        return (load_model() or {}).get("phase_weights")
+    except Exception:
+        return None
+
+
+# Wait between polls for tiles computed elsewhere: (first, cap) seconds
+_TILE_POLL_S = (0.5, 10.0)
+
+
+def _run_tiled(job_id: str, in_path: Path, mesh, s, tiles, cb: Callable[[float], None],
+               rec: StageRecorder):
+    """
+    Publish the tiles on a board in the job folder, compute them here (other
+    hosts running ``flask desolidify-tile-worker`` on the same JOBS_ROOT take
+    some), wait for the rest and stitch.
+    """
+    lease_s = float(_config("TILE_CLAIM_TTL_S", 120))
+    board = TileBoard.create(job_dir(job_id) / TILE_DIRNAME, in_path, s, tiles)
+    rec.info["tiles"] = len(tiles)
+    write_log(job_id, f"Tiled run: {len(tiles)} tiles of at most {max(t.points(1) for t in tiles)} XY samples")
+    owner, local = worker_id(), 0
+    wait, seen = _TILE_POLL_S[0], -1
+    try:
+        while True:
+            local += board.work(owner, lease_s, progress=cb, recorder=rec, mesh=mesh)
+            if board.done():
+                break
+            # Remaining tiles are claimed elsewhere; stale claims are retaken
+            # above. Poll quickly while remote tiles land, back off while none do.
+            finished = len(board.finished())
+            wait = _TILE_POLL_S[0] if finished != seen else min(wait * 2, _TILE_POLL_S[1])
+            seen = finished
+            cb(finished / len(tiles))
+            time.sleep(wait)
+        rec.info["tiles_local"] = local
+        # Per-tile grid (the last one); kept out of the whole-job cost models
+        rec.info["tile_grid"] = rec.info.pop("grid", None)
+        return board.stitch(rec)
+    finally:
+        # Also withdraws the tiles from other hosts if this job failed
+        shutil.rmtree(board.root, ignore_errors=True)
+
+
+def _render_thumbnail(job_id: str, mesh) -> None:
+    """Render thumbnail.png once, next to output.stl (best-effort)."""
+    try:
+        from backend.services.previewer import mesh_to_png_bytes, thumbnail_size
+        write_thumbnail(job_id, mesh_to_png_bytes(mesh, size=thumbnail_size()))
+    except Exception as e:
+        write_log(job_id, f"Thumbnail skipped: {e}")
+
+
+def run(job_id: str, params: Dict[str, Any] | None = None,
+        recorder: Optional[StageRecorder] = None) -> None:
     """
     Worker entrypoint: perforate uploaded STL for a given job_id.
     Side effects:
       - updates status.json with progress
-      - writes output.stl
+      - writes output.stl (+ thumbnail.png when a preview backend is available)
+      - writes metrics.json (per-stage timings and memory) and feeds /api/metrics
       - appends to log.txt
     """
+    rec = recorder if recorder is not None else StageRecorder()
+    watch = _start_memwatch(rec)
+    phases = PhaseProgress(_progress_cb(job_id), weights=_phase_weights())
+    phases.attach(rec)
+    t0 = time.perf_counter()
+    try:
+        _run(job_id, params, rec, phases)
+    finally:
+        if watch is not None:
+            watch.stop()
+        _finish_metrics(job_id, rec, time.perf_counter() - t0)
+
+
+def _start_memwatch(rec: StageRecorder):
+    """RSS sampler for the job, or None when disabled or unsupported here."""
+    interval_ms = float(_config("MEM_SAMPLE_MS", 20))
+    if interval_ms <= 0:
+        return None
+    try:
+        from backend.services.memwatch import MemoryWatch, rss_available
+    except Exception:  # pragma: no cover - optional instrumentation
+        return None
+    if not rss_available():
+        return None
+    trace = str(_config("MEM_TRACEMALLOC", "0")) in ("1", "true", "True")
+    return MemoryWatch(rec, interval=interval_ms / 1000.0, trace=trace).start()
+
+
+def _finish_metrics(job_id: str, rec: StageRecorder, wall_s: float) -> None:
+    state = (get_status(job_id) or {}).get("state") or "unknown"
+    if state not in {"finished", "error"}:
+        state = "error"  # raised out of the task; the queue records the message
+    out = rec.as_dict()
+    out.update({"state": state, "wall_s": round(wall_s, 6), "engine_version": __version__})
+    try:
+        write_metrics(job_id, out)
+    except Exception as e:
+        write_log(job_id, f"metrics.json not written: {e}")
+    metrics.observe_stages(rec.stages)
+    metrics.observe_job(state, wall_s)
+
+
+def _run(job_id: str, params: Dict[str, Any] | None, rec: StageRecorder, phases: PhaseProgress) -> None:
     d = job_dir(job_id)
     in_path = d / "input.stl"
     if not in_path.exists():
@@ -58,27 +191,41 @@ def run(job_id: str, params: Dict[str, Any] | None = None) -> None:
     set_status(job_id, state="running", progress=0.0, message="Loading mesh")
 
     try:
-        mesh = load_mesh_any(Path(in_path))
+        with rec.stage("load"):
+            mesh = load_mesh_any(Path(in_path))
     except Exception as e:
         set_status(job_id, state="error", progress=0.0, message=f"Load failed: {e}")
         write_log(job_id, f"ERROR loading mesh: {e}")
         return
 
-    # Execute core engine with progress callback
-    cb = _progress_cb(job_id)
+    # Execute core engine; the z loop drives the "sampling" phase, stage
+    # starts and in-stage reports drive the rest
+    cb = phases.callback("sampling")
     try:
-        set_status(job_id, state="running", progress=0.0, message="Perforating")
-        result = perforate_mesh_sdf(mesh, s, progress=cb)
+        max_points = int(_config("TILE_MAX_POINTS", 0))
+        tiles = plan_tiles(mesh, s, max_points) if max_points > 0 else []
+        if len(tiles) > 1:
+            # Per-tile surface extraction is interleaved with sampling
+            phases.merge("marching_cubes", into="sampling")
+            result = _run_tiled(job_id, in_path, mesh, s, tiles, cb, rec)
+        else:
+            result = perforate_mesh_sdf(mesh, s, progress=cb, recorder=rec)
     except Exception as e:
         set_status(job_id, state="error", progress=0.0, message=f"Engine failed: {e}")
         write_log(job_id, f"ERROR engine: {e}")
         return
 
-    # Export to STL bytes and write
+    # Stream binary STL records straight into the job folder (temp + rename)
     try:
-        buf = io.BytesIO()
-        result.export(buf, file_type="stl")
-        write_result(job_id, buf)
+        with open_result(job_id) as w:
+            with rec.stage("export"):
+                write_binary_stl(w, result.vertices, result.faces, normals=result.face_normals,
+                                 progress=lambda f: rec.report("export", f))
+            commit_t0 = time.perf_counter()
+        # "write": flushing and renaming the result files into place
+        rec.add("write", time.perf_counter() - commit_t0)
+        with rec.stage("thumbnail"):
+            _render_thumbnail(job_id, result)
         _set_progress(job_id, 1.0)
         set_status(job_id, state="finished", progress=1.0, message="Completed")
         write_log(job_id, "Perforation complete. output.stl written.")
@@ -86,10 +233,3 @@ def run(job_id: str, params: Dict[str, Any] | None = None) -> None:
         set_status(job_id, state="error", progress=0.95, message=f"Write failed: {e}")
         write_log(job_id, f"ERROR writing result: {e}")
 
-
-# TODO: optional: add CLI shim for local debugging
-# if __name__ == "__main__":
-#     import sys, json
-#     jid = sys.argv[1]
-#     params = json.loads(sys.argv[2]) if len(sys.argv) > 2 else {}
-#     run(jid, params)
@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def app(tmp_path):
+    from backend.app import create_app
+
+    app = create_app()
+    app.config.update(TESTING=True, JOBS_ROOT=str(tmp_path / "jobs"))
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
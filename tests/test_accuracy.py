@@ -0,0 +1,40 @@
+import pytest
+import trimesh
+
+from backend.desolidify_engine import accuracy
+
+
+def test_parse_config_and_settings():
+    cfg = accuracy.parse_config("voxel=0.9, orientations=xyz,stagger=false")
+    assert cfg == {"voxel": 0.9, "orientations": "xyz", "stagger": False}
+    s = accuracy.settings_for({"orientations": "z"}, accuracy.parse_config("fast=2"))
+    assert s.voxel == 1.2 and s.orientations == "z" and not s.mem_retry
+    with pytest.raises(ValueError):
+        accuracy.parse_config("voxel")
+
+
+def test_topology_counts_through_holes():
+    torus = trimesh.creation.torus(major_radius=10, minor_radius=2)
+    box = trimesh.creation.box((10, 10, 10))
+    assert accuracy.topology(torus)["genus"] == 1
+    assert accuracy.topology(box)["genus"] == 0
+
+    m = accuracy.compare_meshes(box, torus, samples=2000)
+    assert m["hole_diff"] == 1
+    assert m["chamfer_mm"] > 0 and m["hausdorff_mm"] >= m["p95_mm"]
+    assert accuracy.compare_meshes(box, box.copy(), samples=2000)["volume_rel"] == 0
+
+
+def test_pareto_flags_and_summary():
+    assert accuracy.pareto_flags([(1, 5), (2, 3), (3, 4), (4, 1)]) == [True, True, False, True]
+    rows = [
+        {"input": "a", "config": "voxel=1.2", "wall_s": 1.0, "chamfer_mm": 0.3, "hausdorff_mm": 1.0,
+         "hole_diff": -2, "volume_rel": 0.01},
+        {"input": "a", "config": "voxel=0.9", "wall_s": 2.0, "chamfer_mm": 0.4, "hausdorff_mm": 0.8,
+         "hole_diff": 0, "volume_rel": -0.02},
+        {"input": "a", "config": "voxel=0.6", "reference": True, "wall_s": 9.0},
+    ]
+    summary = accuracy.summarize(rows, ["voxel=1.2", "voxel=0.9"])
+    assert [r["pareto"] for r in summary] == [True, False]
+    assert summary[1]["volume_rel"] == 0.02
+    assert "voxel=1.2" in accuracy.format_table({"reference": "voxel=0.6", "summary": summary})
@@ -0,0 +1,49 @@
+import time
+
+from backend.services import storage
+
+
+def test_meta_etag_roundtrip(client):
+    for url in ("/api/meta/presets", "/api/meta/params"):
+        r = client.get(url)
+        assert r.status_code == 200
+        etag = r.headers["ETag"]
+        r2 = client.get(url, headers={"If-None-Match": etag})
+        assert r2.status_code == 304
+        assert r2.data == b""
+
+
+def test_job_status_etag_changes_with_progress(app, client):
+    with app.app_context():
+        jid = storage.new_job()
+    r = client.get(f"/api/jobs/{jid}")
+    etag = r.headers["ETag"]
+    assert client.get(f"/api/jobs/{jid}", headers={"If-None-Match": etag}).status_code == 304
+
+    with app.app_context():
+        storage.set_status(jid, state="running", progress=0.5, message="Perforating")
+    r2 = client.get(f"/api/jobs/{jid}", headers={"If-None-Match": etag})
+    assert r2.status_code == 200
+    assert r2.json["progress"] == 0.5
+    assert r2.headers["ETag"] != etag
+
+
+def test_job_status_long_poll_times_out_with_304(app, client):
+    with app.app_context():
+        jid = storage.new_job()
+    etag = client.get(f"/api/jobs/{jid}").headers["ETag"]
+    t0 = time.monotonic()
+    r = client.get(f"/api/jobs/{jid}?wait=0.5", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert time.monotonic() - t0 >= 0.45
+
+
+def test_job_status_long_poll_returns_immediately_when_terminal(app, client):
+    with app.app_context():
+        jid = storage.new_job()
+        storage.set_status(jid, state="finished", progress=1.0, message="Completed")
+    t0 = time.monotonic()
+    r = client.get(f"/api/jobs/{jid}?wait=5")
+    assert r.status_code == 200
+    assert r.json["state"] == "finished"
+    assert time.monotonic() - t0 < 1.0
@@ -0,0 +1,106 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from backend.services import storage
+
+
+@pytest.fixture
+def no_queue(monkeypatch):
+    import backend.services.queue as queue
+
+    submitted = []
+    monkeypatch.setattr(queue, "submit_perforate",
+                        lambda job_id, params, cache_key=None, **kw: submitted.append(job_id) or "t")
+    return submitted
+
+
+def _zip(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    buf.seek(0)
+    return buf
+
+
+def test_zip_batch_fans_out_and_streams_results(app, client, no_queue):
+    archive = _zip({"a/cup.stl": b"solid a", "b/cup.stl": b"solid b", "notes.txt": b"x",
+                    "__MACOSX/a/._cup.stl": b"junk"})
+    r = client.post("/api/batches", data={"files": [(archive, "parts.zip"), (io.BytesIO(b"solid c"), "lid.stl")],
+                                          "params": '{"voxel": 0.8}'},
+                    content_type="multipart/form-data")
+    assert r.status_code == 202, r.json
+    body = r.json
+    names = [p["name"] for p in body["parts"]]
+    assert names == ["cup.stl", "cup-2.stl", "lid.stl"]
+    assert len(no_queue) == 3
+
+    st = client.get(f"/api/batches/{body['batch_id']}").json
+    assert st["state"] == "queued" and st["total"] == 3
+
+    a, b, c = (p["job_id"] for p in body["parts"])
+    with app.app_context():
+        storage.write_result(a, b"result-a")
+        storage.set_status(a, state="finished", progress=1.0)
+        storage.set_status(b, state="error", progress=0.0, message="Engine failed: boom")
+        storage.set_status(c, state="running", progress=0.5)
+
+    st = client.get(f"/api/batches/{body['batch_id']}").json
+    assert st["state"] == "running"
+    assert st["progress"] == pytest.approx((1 + 1 + 0.5) / 3)
+
+    r = client.get(f"/api/batches/{body['batch_id']}/result?wait=0")
+    assert r.mimetype == "application/zip"
+    zf = zipfile.ZipFile(io.BytesIO(r.data))
+    assert zf.read("cup_desolid.stl") == b"result-a"
+    assert b"boom" in zf.read("cup-2.stl.error.txt")
+    manifest = json.loads(zf.read("manifest.json"))
+    assert [p["state"] for p in manifest["parts"]] == ["finished", "error", "error"]
+
+
+def test_bad_batches_are_rejected_without_leftovers(app, client, no_queue):
+    def post(files):
+        return client.post("/api/batches", data={"files": files}, content_type="multipart/form-data")
+
+    assert post([(io.BytesIO(b"x"), "model.obj")]).status_code == 400
+    assert post([(io.BytesIO(b"not a zip"), "parts.zip")]).status_code == 400
+    app.config["MAX_BATCH_PARTS"] = 2
+    assert post([(_zip({f"p{i}.stl": b"solid" for i in range(3)}), "parts.zip")]).status_code == 400
+    assert no_queue == []
+    with app.app_context():
+        assert storage.list_statuses() == []
+
+
+def test_corrupt_zip_member_leaves_no_job_folders(app, client, no_queue):
+    archive = _zip({"a.stl": b"solid a", "b.stl": b"solid b"})
+    data = archive.getvalue().replace(b"solid b", b"solid X")  # stored member: CRC now fails on read
+    r = client.post("/api/batches", data={"files": [(io.BytesIO(data), "parts.zip")]},
+                    content_type="multipart/form-data")
+    assert r.status_code == 400 and "ZIP" in r.json["error"]
+    assert no_queue == []
+    with app.app_context():
+        assert list(storage._iter_job_dirs()) == []
+
+
+def test_dispatch_failure_marks_part_and_keeps_manifest(app, client, monkeypatch):
+    import backend.services.queue as queue
+
+    def submit(job_id, params, cache_key=None, **kw):
+        if submit.calls:
+            raise RuntimeError("pool shut down")
+        submit.calls += 1
+        return "t"
+    submit.calls = 0
+    monkeypatch.setattr(queue, "submit_perforate", submit)
+
+    r = client.post("/api/batches", data={"files": [(io.BytesIO(b"solid a"), "a.stl"),
+                                                    (io.BytesIO(b"solid b"), "b.stl")]},
+                    content_type="multipart/form-data")
+    assert r.status_code == 202, r.json
+    a, b = r.json["parts"]
+    assert "error" not in a and "pool shut down" in b["error"]
+    st = client.get(f"/api/batches/{r.json['batch_id']}").json
+    assert [p["state"] for p in st["parts"]] == ["queued", "error"]
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from backend.desolidify_engine import bench
+
+
+@pytest.mark.parametrize("name", sorted(bench.GENERATORS))
+def test_synthetic_meshes_are_deterministic_volumes(name):
+    a = bench.synthetic_mesh(name, "small")
+    b = bench.synthetic_mesh(name, "small")
+    assert a.is_volume
+    assert np.array_equal(a.vertices, b.vertices) and np.array_equal(a.faces, b.faces)
+    assert len(bench.synthetic_mesh(name, "medium").faces) > len(a.faces)
+
+
+def test_build_cases_is_cartesian_product():
+    cases = bench.build_cases(["cylinder", "planter"], ["small"], ["z", "radial"], [1.2, 0.8])
+    assert len(cases) == 8
+    assert cases[0].name == "cylinder/small/z/v1.2"
+
+
+def test_compare_reports_flags_regressions():
+    def report(wall, rss):
+        return {"results": [{"case": "c", "wall_s": wall, "peak_rss_mb": rss, "triangles_out": 10}]}
+
+    (row,) = bench.compare_reports(report(10.0, 100.0), report(11.0, 101.0))
+    assert not row["regression"]
+    (row,) = bench.compare_reports(report(10.0, 100.0), report(14.0, 100.0))
+    assert row["regression"] and row["time_ratio"] == 1.4
+    (row,) = bench.compare_reports(report(10.0, 100.0), report(10.0, 200.0))
+    assert row["regression"]
+
+
+def test_bench_slice_kernels_reports_timings():
+    report = bench.bench_slice_kernels(64, repeat=2)
+    assert report["slice"] == [64, 64] and report["numpy_ms"] > 0
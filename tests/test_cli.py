@@ -0,0 +1,88 @@
+import pytest
+
+from backend.desolidify_engine import cli
+from backend.desolidify_engine.settings import from_params
+
+
+@pytest.fixture
+def fake_engine(monkeypatch):
+    calls = []
+
+    def process_file(in_path, out_path, settings):
+        calls.append(in_path)
+        with open(out_path, "wb") as f:
+            f.write(b"solid")
+        return {"wall_s": 0.1, "stages": {"signed_distance": 0.1}, "triangles_in": 1,
+                "triangles_out": 2, "error": None}
+
+    monkeypatch.setattr(cli, "process_file", process_file)
+    return calls
+
+
+def test_run_directory_skips_up_to_date_outputs(tmp_path, fake_engine):
+    in_dir, out_dir = tmp_path / "in", tmp_path / "out"
+    in_dir.mkdir()
+    (in_dir / "a.stl").write_bytes(b"a")
+    (in_dir / "b.stl").write_bytes(b"b")
+    s = from_params({"spacing": 12})
+
+    rows = cli.run_directory(in_dir, out_dir, s, log=lambda m: None)
+    assert [r["status"] for r in rows] == ["done", "done"]
+    assert (out_dir / "a_desolid.stl").exists()
+
+    rows = cli.run_directory(in_dir, out_dir, s, log=lambda m: None)
+    assert [r["status"] for r in rows] == ["skipped", "skipped"]
+
+    # Changed input, changed settings and --force each trigger a rerun
+    (in_dir / "a.stl").write_bytes(b"aa")
+    rows = cli.run_directory(in_dir, out_dir, s, log=lambda m: None)
+    assert {r["file"]: r["status"] for r in rows} == {"a.stl": "done", "b.stl": "skipped"}
+    rows = cli.run_directory(in_dir, out_dir, from_params({"spacing": 14}), log=lambda m: None)
+    assert all(r["status"] == "done" for r in rows)
+    rows = cli.run_directory(in_dir, out_dir, from_params({"spacing": 14}), force=True, log=lambda m: None)
+    assert all(r["status"] == "done" for r in rows)
+    assert len(fake_engine) == 7
+
+    summary = cli.format_summary(rows)
+    assert "2 done, 0 up to date, 0 failed" in summary
+    assert "signed_distance" in summary
+
+
+def test_resolve_preset_by_substring():
+    assert cli.resolve_preset("high flow") == cli.PRESETS_DEFAULT["Plant Dose Insert — High Flow"]
+    with pytest.raises(ValueError):
+        cli.resolve_preset("Quick")
+    with pytest.raises(ValueError):
+        cli.resolve_preset("nope")
+
+
+def test_main_reports_failures(tmp_path, monkeypatch):
+    (tmp_path / "bad.stl").write_bytes(b"not a mesh")
+    rc = cli.main([str(tmp_path), str(tmp_path / "out"), "--workers", "1"])
+    assert rc == 1
+    assert not (tmp_path / "out" / "bad_desolid.stl").exists()
+
+
+def _dying_process_file(in_path, out_path, settings):
+    import os
+
+    if in_path.endswith("bad.stl"):
+        os._exit(1)  # like an OOM kill: the pool breaks, no result comes back
+    with open(out_path, "wb") as f:
+        f.write(b"solid")
+    return {"wall_s": 0.1, "stages": {}, "triangles_in": 1, "triangles_out": 2, "error": None}
+
+
+def test_run_directory_survives_a_dead_worker(tmp_path, monkeypatch):
+    in_dir, out_dir = tmp_path / "in", tmp_path / "out"
+    in_dir.mkdir()
+    for name in ("a.stl", "bad.stl", "c.stl"):
+        (in_dir / name).write_bytes(b"x")
+    monkeypatch.setattr(cli, "process_file", _dying_process_file)
+
+    rows = cli.run_directory(in_dir, out_dir, from_params({}), workers=2, log=lambda m: None)
+    by_file = {r["file"]: r for r in rows}
+    assert set(by_file) == {"a.stl", "bad.stl", "c.stl"}
+    assert by_file["bad.stl"]["status"] == "failed"
+    assert "BrokenProcessPool" in by_file["bad.stl"]["error"]
+    assert "failed" in cli.format_summary(rows)
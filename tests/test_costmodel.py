@@ -0,0 +1,148 @@
+import numpy as np
+import pytest
+
+from backend.services import costmodel, storage
+from backend.services.memwatch import MemoryWatch
+from backend.desolidify_engine.instrument import StageRecorder
+
+
+def test_memory_watch_records_stage_peaks():
+    rec = StageRecorder()
+    watch = MemoryWatch(rec, interval=0.005, trace=True).start()
+    with rec.stage("alloc"):
+        block = np.ones(8 * 1024 * 1024 // 8)  # 8 MB
+        block += 1
+    del block
+    watch.stop()
+
+    mem = rec.info["memory"]
+    assert mem["peak_rss_mb"] >= mem["baseline_rss_mb"]
+    assert "alloc" in mem["stages"]
+    traced = mem["traced"]["alloc"]
+    assert traced["peak_mb"] >= 7.5
+    assert traced["top"][0]["size_mb"] >= 7.5
+
+
+def _fake_job(app, grid, chunk, cells, tris, peak_mb, engine_s=None):
+    with app.app_context():
+        jid = storage.new_job()
+        storage.write_metrics(jid, {
+            "state": "finished",
+            "grid": {"nx": grid[0], "ny": grid[1], "nz": grid[2], "points": grid[0] * grid[1] * grid[2]},
+            "chunk_pts": chunk, "hole_cells": cells, "triangles_in": tris, "triangles_out": 0,
+            "memory": {"peak_delta_mb": peak_mb},
+            "stages": {"signed_distance": engine_s} if engine_s else {},
+        })
+
+
+def test_fit_recovers_linear_memory_model(app):
+    rng = np.random.default_rng(0)
+    # Ground truth: 4 B per grid point, 12 B per hole cell, 20 MB fixed
+    for _ in range(12):
+        grid = tuple(int(v) for v in rng.integers(40, 200, size=3))
+        cells = int(grid[0] * grid[1] * rng.integers(10, 300))
+        tris = int(rng.integers(1_000, 50_000))
+        peak = (20 * 2**20 + 4 * np.prod(grid) + 12 * cells) / 2**20
+        _fake_job(app, grid, 1_500_000, cells, tris, peak)
+
+    with app.app_context():
+        with pytest.raises(ValueError):
+            costmodel.fit(costmodel.collect_samples()[:3])
+        model = costmodel.fit(costmodel.collect_samples())
+        costmodel.save_model(model)
+        assert costmodel.load_model()["samples"] == 12
+
+    assert model["r2"] > 0.99
+    feats = {"intercept": 1, "grid_points": 100 ** 3, "slice_points": 100 ** 2,
+             "chunk_points": 100 ** 2, "hole_cells": 100 ** 2 * 50, "triangles": 0}
+    expected = (20 * 2**20 + 4 * 100 ** 3 + 12 * 100 ** 2 * 50) / 2**20
+    assert costmodel.predict_peak_mb(model, feats, with_safety=False) == pytest.approx(expected, rel=0.05)
+    assert costmodel.suggest_workers(model, memory_limit_mb=model["observed_peak_mb"]["p95"] * 3) == 3
+
+
+def test_fit_runtime_and_history_fallback(app, monkeypatch):
+    rng = np.random.default_rng(1)
+    # Ground truth: 2 µs per grid point per log2(triangles), 1.5 s fixed
+    for _ in range(10):
+        grid = tuple(int(v) for v in rng.integers(40, 200, size=3))
+        tris = int(rng.integers(1_000, 50_000))
+        secs = 1.5 + 2e-6 * np.prod(grid) * np.log2(tris + 2)
+        _fake_job(app, grid, 1_500_000, 0, tris, 100.0, engine_s=float(secs))
+
+    m = {"grid": {"nx": 100, "ny": 100, "nz": 100, "points": 100 ** 3}, "triangles_in": 4094}
+    feats = costmodel.runtime_features(m)
+    with app.app_context():
+        model = costmodel.fit_runtime(costmodel.collect_runtime_samples())
+        assert costmodel.history_runtime_s(feats) == pytest.approx(24.0, rel=0.2)
+        # Cached: later requests do not rescan the job folders
+        monkeypatch.setattr(costmodel, "collect_runtime_samples", lambda: pytest.fail("rescanned"))
+        assert costmodel.history_runtime_s(feats) == pytest.approx(24.0, rel=0.2)
+    assert model["r2"] > 0.99
+    assert costmodel.predict_runtime_s(model, feats) == pytest.approx(1.5 + 2e-6 * 100 ** 3 * 12, rel=0.05)
+
+
+def test_estimate_endpoint_reports_grid_without_running_engine(client, monkeypatch):
+    import io
+
+    import trimesh
+
+    from backend.services import queue
+
+    monkeypatch.setattr(queue, "submit_perforate", lambda *a, **kw: pytest.fail("engine must not run"))
+    stl = trimesh.creation.box((20, 20, 10)).export(file_type="stl")
+    resp = client.post("/api/estimate", data={
+        "file": (io.BytesIO(stl), "box.stl"),
+        "params": '{"voxel": 1.0, "spacing": 10, "orientations": "z"}',
+    }, content_type="multipart/form-data")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    # 20 mm + 2 × 2 mm padding at 1 mm voxels
+    assert body["grid"]["nx"] == 24 and body["grid"]["nz"] == 14
+    assert body["triangles_in"] == 12
+    assert body["grid"]["points"] == 24 * 24 * 14
+    assert body["runtime_s"] is None and body["memory"]["peak_mb"] is None
+
+
+def test_estimate_grid_matches_engine_grid():
+    import trimesh
+
+    from backend.desolidify_engine.engine import grid_axes, prepare_mesh
+    from backend.desolidify_engine.settings import Settings
+    from backend.services import estimate
+
+    mesh = trimesh.creation.annulus(r_min=7.3, r_max=11.9, height=13.7, sections=37)
+    mesh.apply_translation((3.1, -2.2, 0.7))
+    s = Settings(voxel=0.7, zmax=5.0)
+    _, axes = grid_axes(prepare_mesh(mesh), s)
+    grid = estimate.grid_for(estimate.summarize_mesh(mesh.export(file_type="stl")), s)
+    assert (grid["nx"], grid["ny"], grid["nz"]) == tuple(len(a) for a in axes)
+
+
+def test_fit_phase_weights_uses_median_shares(app):
+    with app.app_context():
+        for k, sd in enumerate((8.0, 9.0, 50.0)):
+            jid = storage.new_job()
+            storage.write_metrics(jid, {"state": "finished", "stages": {
+                "load": 0.1, "signed_distance": sd, "marching_cubes": 0.2,
+                "post_process": 1.0, "export": 0.3, "write": 0.1, "thumbnail": 0.3}})
+        samples = costmodel.collect_phase_shares()
+        with pytest.raises(ValueError):
+            costmodel.fit_phase_weights(samples[:2])
+        weights = costmodel.fit_phase_weights(samples)
+
+    assert sum(weights.values()) == pytest.approx(1.0, abs=1e-3)
+    # Median job (9 s of sampling out of 11 s)
+    assert weights["sampling"] == pytest.approx(9.0 / 11.0, abs=0.01)
+    assert weights["export"] == pytest.approx(0.4 / 11.0, abs=0.01)
+
+
+def test_task_imports_without_resource_module():
+    import subprocess
+    import sys
+
+    # `resource` is Unix-only; the task must still import (and skip RSS) without it
+    code = ("import sys; sys.modules['resource'] = None\n"
+            "import backend.tasks.perforate, backend.desolidify_engine.bench as bench\n"
+            "from backend.services import memwatch\n"
+            "assert memwatch.resource is None and bench._peak_rss_mb() >= 0\n")
+    subprocess.run([sys.executable, "-c", code], check=True)
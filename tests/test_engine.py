@@ -0,0 +1,200 @@
+import numpy as np
+import pytest
+
+from backend.desolidify_engine import engine, kernels
+from backend.desolidify_engine.instrument import StageRecorder
+
+
+def test_slice_hole_field_matches_dense_composition():
+    rng = np.random.default_rng(0)
+    ny, nx = 7, 9
+    cyl_xy = rng.normal(size=(ny, nx)).astype(np.float32)
+    cyl_y_k = rng.normal(size=ny).astype(np.float32)
+    cyl_x_k = rng.normal(size=nx).astype(np.float32)
+    radial = rng.uniform(0, 4, size=(ny, nx)).astype(np.float32)
+    dz_sq, radius = 0.7, 1.5
+
+    dense = np.minimum.reduce([
+        cyl_xy,
+        cyl_y_k[:, None].repeat(nx, axis=1),
+        cyl_x_k[None, :].repeat(ny, axis=0),
+        np.sqrt(radial + dz_sq).astype(np.float32) - radius,
+    ])
+    idx = np.flatnonzero(rng.random(ny * nx) < 0.3)
+    got = kernels.hole_field_at(idx, nx, cyl_xy, cyl_y_k, cyl_x_k, radial, dz_sq, radius)
+    assert np.array_equal(got, dense.reshape(-1)[idx])
+
+    only_z = kernels.hole_field_at(idx, nx, cyl_xy, None, None, None, None, radius)
+    assert np.array_equal(only_z, cyl_xy.reshape(-1)[idx])
+
+
+def _random_slice(rng, ny=37, nx=53):
+    return {
+        "sdf": rng.normal(scale=2.0, size=ny * nx).astype(np.float32),
+        "cyl_xy": rng.normal(size=(ny, nx)).astype(np.float32),
+        "cyl_y_k": rng.normal(size=ny).astype(np.float32),
+        "cyl_x_k": rng.normal(size=nx).astype(np.float32),
+        "radial": rng.uniform(0, 4, size=(ny, nx)).astype(np.float32),
+    }
+
+
+@pytest.mark.skipif(not kernels.HAVE_NUMBA, reason="numba not installed")
+@pytest.mark.parametrize("band", [1.2, None])
+@pytest.mark.parametrize("families", [("cyl_xy",), ("cyl_y_k", "cyl_x_k"), ("radial",),
+                                      ("cyl_xy", "cyl_y_k", "cyl_x_k", "radial")])
+def test_numba_slice_kernel_matches_numpy(band, families):
+    f = _random_slice(np.random.default_rng(3))
+    kw = {k: f[k] for k in families}
+    if "radial" in kw:
+        kw.update(dz_sq=0.7)
+    outs = []
+    for use_numba in (False, True):
+        out = np.empty_like(f["sdf"])
+        kernels.apply_slice_holes(out, f["sdf"], 53, band=band, radius=1.5, use_numba=use_numba, **kw)
+        outs.append(out)
+    assert np.array_equal(outs[0], outs[1])
+
+
+def test_numpy_slice_kernel_gates_by_shell_band():
+    f = _random_slice(np.random.default_rng(4))
+    out = np.empty_like(f["sdf"])
+    kernels.apply_slice_holes(out, f["sdf"], 53, band=1.0, cyl_xy=f["cyl_xy"], use_numba=False)
+    outside = np.abs(f["sdf"]) > 1.0
+    assert np.array_equal(out[outside], f["sdf"][outside])
+    assert np.array_equal(out[~outside], np.maximum(f["sdf"], -f["cyl_xy"].reshape(-1))[~outside])
+
+
+def test_clipped_bounds_and_near_tiles():
+    # A tall sliver leaning in x: only its middle is inside the z band
+    tri = np.array([[[0, 0, 0], [10, 0, 10], [0, 1, 0]]], dtype=np.float64)
+    lo, hi = engine._clipped_xy_bounds(tri, 4.0, 6.0)
+    assert np.allclose(lo, [[4, 0]]) and np.allclose(hi, [[6, 0.6]])
+    lo, hi = engine._clipped_xy_bounds(tri, 20.0, 30.0)
+    assert np.isinf(lo).all() and np.isinf(hi).all()
+
+    xs = ys = np.arange(0.0, 16.0)
+    near = engine._near_tiles(xs, ys, np.array([[1.0, 9.0]]), np.array([[2.0, 10.0]]), 0.5, 4)
+    assert near.shape == (4, 4)
+    assert np.argwhere(near).tolist() == [[2, 0]]
+
+
+def test_section_signed_distance_matches_mesh_query_on_vertical_walls():
+    import trimesh
+
+    tube = trimesh.creation.annulus(r_min=6.0, r_max=10.0, height=20.0, sections=64)
+    rng = np.random.default_rng(2)
+    qx, qy = (rng.uniform(-12, 12, size=(2, 400))).astype(np.float32)
+    faces = np.arange(len(tube.faces))
+
+    got = engine._section_signed_distance(tube, faces, 0.0, qx, qy)
+    ref = trimesh.proximity.signed_distance(tube, np.c_[qx, qy, np.zeros_like(qx)])
+    assert np.array_equal(got > 0, ref > 0)
+    assert np.allclose(got, ref, atol=1e-4)
+    assert engine._section_signed_distance(tube, faces, 50.0, qx, qy) is None
+
+
+@pytest.mark.parametrize("part", ["box", "tube"])
+def test_section_backend_output_matches_mesh_backend(part):
+    import trimesh
+
+    from backend.desolidify_engine.engine import perforate_mesh_sdf
+    from backend.desolidify_engine.settings import Settings
+
+    # Grid-aligned walls: whole sample rows pass through section vertices
+    mesh = (trimesh.creation.box(extents=(40.0, 30.0, 20.0)) if part == "box"
+            else trimesh.creation.annulus(r_min=18.0, r_max=20.0, height=30.0))
+    ref = perforate_mesh_sdf(mesh, Settings(voxel=1.0, sdf_backend="mesh"))
+    rec = StageRecorder()
+    out = perforate_mesh_sdf(mesh, Settings(voxel=1.0, sdf_backend="section"), recorder=rec)
+
+    assert rec.info["section_slices"] > 0
+    assert out.is_watertight
+    assert out.volume > 0
+    assert out.volume == pytest.approx(ref.volume, rel=1e-3)
+    assert len(out.split(only_watertight=False)) == len(ref.split(only_watertight=False))
+
+
+def test_sdf_backend_setting_is_validated():
+    from backend.api.schemas import coerce_and_clamp_params
+    from backend.desolidify_engine.settings import from_params
+
+    assert from_params({"sdf_backend": "section"}).sdf_backend == "section"
+    assert from_params({"sdf_backend": "bogus"}).sdf_backend == "mesh"
+    assert coerce_and_clamp_params({"sdf_backend": "bogus"})["sdf_backend"] == "mesh"
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_encode_slice_keeps_sign_and_truncates(dtype):
+    rng = np.random.default_rng(3)
+    values = rng.normal(scale=3.0, size=(11, 13)).astype(np.float32)
+    values[0, :3] = [0.0, 1e-4, -1e-4]
+    trunc = 2.0
+
+    enc = engine._encode_slice(values, dtype, trunc)
+    dec = engine._decode_slab(enc[None], trunc)[0]
+    assert enc.dtype == np.dtype(dtype)
+    assert np.array_equal(np.sign(dec), np.sign(values))
+    assert np.abs(dec).max() <= trunc
+    near = np.abs(values) < trunc
+    assert np.abs(dec - values)[near].max() <= trunc / 127.0
+
+
+def test_slab_marching_cubes_matches_whole_volume():
+    from skimage.measure import marching_cubes
+
+    z, y, x = np.mgrid[:150, :20, :20].astype(np.float32)
+    field = np.sqrt((x - 9.5) ** 2 + (y - 9.5) ** 2) - 6.0 + 0.02 * z
+    volume = engine._encode_slice(field, "float16", 4.0)
+
+    verts, faces = engine._marching_cubes_slabs(volume, 4.0)
+    ref_verts, ref_faces, _, _ = marching_cubes(volume.astype(np.float32), level=0.0)
+    assert len(faces) == len(ref_faces)
+    key = lambda v: np.unique(np.round(v, 5), axis=0)  # seam vertices appear in both slabs
+    assert np.array_equal(key(verts), key(ref_verts))
+
+
+def test_volume_dtype_setting_is_validated():
+    from backend.api.schemas import coerce_and_clamp_params
+    from backend.desolidify_engine.settings import from_params
+
+    assert from_params({"volume_dtype": "int8"}).volume_dtype == "int8"
+    assert from_params({"volume_dtype": "float64"}).volume_dtype == "float32"
+    assert coerce_and_clamp_params({"volume_dtype": "bogus"})["volume_dtype"] == "float32"
+
+
+def test_slice_workspace_matches_tile_repeat():
+    ny, nx, T = 10, 13, 4
+    xs = np.arange(nx, dtype=np.float32)
+    ys = np.arange(ny, dtype=np.float32)
+    XX, YY = np.meshgrid(xs, ys, indexing="xy")
+    ws = engine._SliceWorkspace(ny, nx, T, XX, YY)
+    rng = np.random.default_rng(4)
+    near = rng.random((-(-ny // T), -(-nx // T))) < 0.5
+    tile_cx, tile_cy = xs[::T] + 1.5, ys[::T] + 1.5
+
+    idx, far_t, qx, qy = ws.queries(near, tile_cx, tile_cy)
+    near_px = np.repeat(np.repeat(near, T, axis=0), T, axis=1)[:ny, :nx]
+    assert np.array_equal(idx, np.flatnonzero(near_px))
+    assert np.array_equal(qx[:idx.size], XX.reshape(-1)[idx])
+    assert np.array_equal(qy[idx.size:], tile_cy[far_t // near.shape[1]])
+
+    sd = rng.normal(size=qx.size).astype(np.float32)
+    tile_val = np.full(near.shape, 0.5, dtype=np.float32)
+    tile_val.reshape(-1)[far_t] = np.where(sd[idx.size:] > 0, -0.5, 0.5)
+    expected = np.repeat(np.repeat(tile_val, T, axis=0), T, axis=1)[:ny, :nx].copy()
+    expected.reshape(-1)[idx] = -sd[:idx.size]
+    assert np.array_equal(ws.fill_slice(idx, far_t, sd, 0.5), expected)
+
+
+def test_default_settings_perforate():
+    import trimesh
+
+    from backend.desolidify_engine.engine import perforate_mesh_sdf
+    from backend.desolidify_engine.settings import Settings
+
+    # Default orientation ("z") with the default open bottom; coarse voxel for speed.
+    # The pre-1.2.6 composition wiped the z holes on the first open-bottom slice
+    # and returned the box unchanged (volume exactly 24000).
+    out = perforate_mesh_sdf(trimesh.creation.box(extents=(40.0, 30.0, 20.0)), Settings(voxel=1.0))
+    assert out.is_watertight
+    assert out.volume < 0.99 * 40.0 * 30.0 * 20.0
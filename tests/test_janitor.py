@@ -0,0 +1,70 @@
+import os
+import time
+
+from backend.services import janitor, metrics, storage
+
+
+def _job(state, size, *, ts, downloaded=None):
+    job_id = storage.new_job()
+    d = storage.job_dir(job_id)
+    (d / "output.stl").write_bytes(b"x" * size)
+    storage.set_status(job_id, state=state)
+    st = storage.get_status(job_id)
+    st["ts"] = ts
+    storage._atomic_write_json(d / "status.json", st)
+    if downloaded is not None:
+        storage.touch_download(job_id)
+        os.utime(d / storage.DOWNLOAD_MARK_NAME, (downloaded, downloaded))
+    return job_id
+
+
+def _exists(job_id):
+    return storage.job_dir(job_id).exists()
+
+
+def test_sweep_evicts_old_then_least_recently_downloaded(app):
+    now = time.time()
+    with app.app_context():
+        old = _job("finished", 1000, ts=now - 10 * 3600)
+        revived = _job("finished", 1000, ts=now - 10 * 3600, downloaded=now - 60)
+        stale = _job("finished", 3000, ts=now - 3600)
+        fresh = _job("error", 3000, ts=now - 1800)
+        running = _job("running", 5000, ts=now - 20 * 3600)
+
+        report = janitor.sweep(max_age_hours=6, max_bytes=10_000, now=now)
+
+        assert not _exists(old)
+        assert report["age"]["jobs"] == 1
+        # Over quota: the least recently used finished job goes, the running one stays
+        assert not _exists(stale)
+        assert report["size"]["jobs"] == 1 and report["size"]["bytes"] >= 3000
+        assert _exists(revived) and _exists(fresh) and _exists(running)
+        assert report["disk_bytes"] <= 10_000
+
+
+def test_sweep_never_removes_active_jobs_even_over_quota(app):
+    now = time.time()
+    with app.app_context():
+        queued = _job("queued", 4000, ts=now - 48 * 3600)
+        # "created": upload still being written, or a batch part awaiting dispatch
+        created = _job("created", 4000, ts=now - 48 * 3600)
+        report = janitor.sweep(max_age_hours=1, max_bytes=100, now=now)
+        assert _exists(queued) and _exists(created)
+        assert report["size"]["jobs"] == 0
+
+
+def test_result_download_updates_lru_and_metrics_report_reclaimed(app, client):
+    metrics.reset()
+    now = time.time()
+    with app.app_context():
+        a = _job("finished", 2000, ts=now - 600)
+        b = _job("finished", 2000, ts=now - 300)
+    assert client.get(f"/api/jobs/{a}/result").status_code == 200
+
+    app.config.update(JOBS_MAX_MB=3000 / (1024 * 1024), JOB_RETENTION_HOURS=0)
+    with app.app_context():
+        janitor.run_once()
+        assert _exists(a) and not _exists(b)
+    body = client.get("/api/metrics").get_data(as_text=True)
+    assert 'desolidify_janitor_evicted_jobs_total{reason="size"} 1' in body
+    assert "desolidify_janitor_reclaimed_bytes_total" in body
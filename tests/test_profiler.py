@@ -0,0 +1,90 @@
+import io
+import time
+
+from backend.services import profiler, storage
+
+
+def _busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+
+def test_profile_job_writes_folded_stacks(app, client):
+    with app.app_context():
+        jid = storage.new_job()
+        with profiler.profile_job(jid) as sampler:
+            _busy_wait(0.2)
+    assert sampler.samples > 5
+
+    r = client.get(f"/api/jobs/{jid}/profile")
+    assert r.status_code == 200
+    lines = r.get_data(as_text=True).splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) >= 1
+    assert any("test_profiler:_busy_wait" in line for line in lines)
+
+
+def test_profile_param_requires_operator_opt_in(app, client, monkeypatch):
+    import backend.services.queue as queue
+
+    calls = []
+    monkeypatch.setattr(queue, "submit_perforate",
+                        lambda job_id, params, cache_key=None, profile=False: calls.append(profile) or "t")
+
+    def post():
+        return client.post("/api/jobs", data={"file": (io.BytesIO(b"solid x"), "a.stl"),
+                                              "params": '{"profile": true}'},
+                           content_type="multipart/form-data")
+
+    app.config["MAX_CONCURRENT_JOBS"] = 10
+    app.config["PROFILING_ENABLED"] = False
+    assert "profile" not in post().json
+    app.config["PROFILING_ENABLED"] = True
+    body = post().json
+    assert body["profile"] is True
+    assert calls == [False, True]
+
+    # No profile.folded for a job that finished without one
+    with app.app_context():
+        storage.set_status(body["job_id"], state="finished", progress=1.0)
+    assert client.get(f"/api/jobs/{body['job_id']}/profile").status_code == 404
+
+
+def test_samplers_run_on_os_threads_under_eventlet():
+    import subprocess
+    import sys
+    import textwrap
+
+    import pytest
+
+    pytest.importorskip("eventlet")
+    # CPU-bound work in a green thread never yields: only real OS threads can sample it
+    code = textwrap.dedent("""
+        import eventlet
+        eventlet.monkey_patch()
+        import threading, time
+        import numpy as np
+        from backend.desolidify_engine.instrument import StageRecorder
+        from backend.services.memwatch import MemoryWatch
+        from backend.services.nativethreads import native_threading
+        from backend.services.profiler import StackSampler
+
+        def busy():
+            block = np.ones(64 * 1024 * 1024 // 8)
+            block += 1
+            end = time.perf_counter() + 0.3
+            while time.perf_counter() < end:
+                sum(range(1000))
+
+        assert native_threading() is not threading
+        sampler = StackSampler(native_threading().get_ident(), 0.005).start()
+        watch = MemoryWatch(StageRecorder(), interval=0.005).start()
+        busy()
+        watch.stop()
+        sampler.stop()
+        assert sampler.samples > 5, sampler.samples
+        assert any(":busy" in s for s in sampler.counts), list(sampler.counts)[:3]
+        assert watch.peak - watch.baseline > 32 * 1024 * 1024
+    """)
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,79 @@
+import io
+import os
+
+import pytest
+
+from backend.services import cache, storage
+
+
+@pytest.fixture
+def no_queue(monkeypatch):
+    """Accept jobs without running the engine (they stay queued)."""
+    import backend.services.queue as queue
+
+    submitted = []
+    monkeypatch.setattr(queue, "submit_perforate",
+                        lambda job_id, params, cache_key=None, **kw: submitted.append((job_id, cache_key)) or "t")
+    return submitted
+
+
+def _post(client, data=b"stl-bytes" * 100, params='{"voxel": 0.5}'):
+    return client.post("/api/jobs", data={"file": (io.BytesIO(data), "part.stl"), "params": params},
+                       content_type="multipart/form-data")
+
+
+def test_identical_submission_attaches_to_running_job(app, client, no_queue):
+    first = _post(client).json
+    with app.app_context():
+        storage.set_status(first["job_id"], state="running", progress=0.3)
+    again = _post(client).json
+    assert again["coalesced"] is True
+    assert again["job_id"] == first["job_id"]
+    assert len(no_queue) == 1
+
+    # A different input is a new job of its own
+    other = _post(client, data=b"other")
+    assert other.status_code == 202 and "coalesced" not in other.json
+    assert len(no_queue) == 2
+
+
+def test_finished_result_is_reused_via_hard_link(app, client, no_queue):
+    first = _post(client).json
+    jid, key = no_queue[0]
+    with app.app_context():
+        storage.write_result(jid, b"result" * 50)
+        storage.set_status(jid, state="finished", progress=1.0)
+        cache.release(jid)
+        cache.store(key, jid)
+
+    hit = _post(client).json
+    assert hit["cached"] is True and hit["job_id"] != first["job_id"]
+    with app.app_context():
+        assert storage.get_status(hit["job_id"])["state"] == "finished"
+        out = storage.job_dir(hit["job_id"]) / storage.RESULT_NAME
+        assert out.read_bytes() == b"result" * 50
+        assert os.stat(out).st_nlink >= 2
+    assert client.get(hit["result_url"]).data == b"result" * 50
+    # Different (effective) params → miss
+    assert "cached" not in _post(client, params='{"voxel": 1.2}').json
+
+
+def test_cache_key_canonicalizes_params():
+    a = cache.cache_key("abc", {"voxel": 0.3, "chunk": 100_000})
+    b = cache.cache_key("abc", {"voxel": 0.1, "chunk": 2_000_000})  # clamps to 0.2 ≠ 0.3
+    c = cache.cache_key("abc", {"voxel": 0.3, "chunk": 2_000_000})  # chunk size is not geometry
+    assert a == c
+    assert a != b
+
+
+def test_evict_is_size_bounded(app):
+    with app.app_context():
+        for i in range(3):
+            jid = storage.new_job()
+            storage.write_result(jid, bytes([i]) * 1000)
+            cache.store(f"k{i}", jid)
+        root = storage._base_dir() / ".cache"
+        os.utime(root / "k0", (1, 1))
+        cache.evict(2500)
+        assert not (root / "k0").exists()
+        assert (root / "k2").exists()
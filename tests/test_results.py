@@ -0,0 +1,51 @@
+import gzip
+import hashlib
+import io
+
+from backend.services import storage
+
+
+def _finished_job(app, data: bytes) -> str:
+    with app.app_context():
+        jid = storage.new_job()
+        storage.write_result(jid, io.BytesIO(data))
+        storage.set_status(jid, state="finished", progress=1.0, message="Completed")
+    return jid
+
+
+def test_write_result_produces_gzip_and_hash(app):
+    data = bytes(range(256)) * 1000
+    with app.app_context():
+        jid = storage.new_job()
+        storage.write_result(jid, data)
+        d = storage.job_dir(jid)
+        info = storage.read_result_info(jid)
+    assert (d / storage.RESULT_NAME).read_bytes() == data
+    assert gzip.decompress((d / storage.RESULT_GZIP_NAME).read_bytes()) == data
+    assert info["sha256"] == hashlib.sha256(data).hexdigest()
+    assert info["size"] == len(data)
+    assert not [p for p in d.iterdir() if p.name.startswith(storage.RESULT_NAME) and p.name not in
+                (storage.RESULT_NAME, storage.RESULT_GZIP_NAME)]
+
+
+def test_result_negotiates_gzip_and_range(app, client):
+    data = b"solid-ish" * 5000
+    jid = _finished_job(app, data)
+    sha = hashlib.sha256(data).hexdigest()
+
+    plain = client.get(f"/api/jobs/{jid}/result")
+    assert plain.status_code == 200
+    assert plain.data == data
+    assert plain.headers["ETag"] == f'"{sha}"'
+    assert "Content-Encoding" not in plain.headers
+
+    gz = client.get(f"/api/jobs/{jid}/result", headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(gz.data) == data
+
+    part = client.get(f"/api/jobs/{jid}/result", headers={"Range": "bytes=100-199"})
+    assert part.status_code == 206
+    assert part.data == data[100:200]
+
+    cached = client.get(f"/api/jobs/{jid}/result", headers={"If-None-Match": f'"{sha}"'})
+    assert cached.status_code == 304
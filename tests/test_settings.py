@@ -23,3 +23,16 @@ def test_coerce_and_clamp_params():
     out = coerce_and_clamp_params(params)
     # spacing must be clamped to the minimum defined in PARAM_SPECS
     assert out["spacing"] >= 8.0
+
+
+def test_settings_fingerprint_ignores_only_non_geometry_fields():
+    from dataclasses import replace
+
+    from backend.desolidify_engine.cli import settings_stamp
+    from backend.desolidify_engine.settings import Settings, settings_fingerprint
+
+    s = Settings()
+    assert settings_stamp(s) == settings_fingerprint(s)
+    assert settings_fingerprint(replace(s, chunk_pts=100_000, mem_retry=False)) == settings_fingerprint(s)
+    assert settings_fingerprint(replace(s, volume_dtype="int8")) != settings_fingerprint(s)
+    assert settings_fingerprint(s, input="abc") != settings_fingerprint(s)
@@ -0,0 +1,49 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from backend.desolidify_engine import warmup
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_create_app_does_not_import_the_engine_stack():
+    code = (
+        "import sys\n"
+        "from backend.app import create_app\n"
+        "create_app()\n"
+        "heavy = [m for m in ('trimesh', 'skimage', 'scipy', 'numba', 'pyrender',"
+        " 'backend.desolidify_engine.engine') if m in sys.modules]\n"
+        "print(','.join(heavy))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+
+def test_engine_package_exports_resolve_lazily():
+    import backend.desolidify_engine as pkg
+
+    assert pkg.Settings().voxel > 0
+    assert callable(pkg.perforate_mesh_sdf)
+    assert "warm_up" in dir(pkg)
+
+
+def test_health_reports_startup_and_warmup(client):
+    body = client.get("/api/health").get_json()
+    assert body["startup"]["create_app_s"] >= 0
+    assert body["startup"]["import_s"] >= 0
+    assert body["warmup"]["state"] in ("idle", "running", "done", "error")
+
+
+def test_warm_up_runs_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(warmup, "_tiny_perforation", lambda: calls.append(1))
+    warmup._reset_for_tests()
+    try:
+        first = warmup.warm_up()
+        second = warmup.warm_up()
+    finally:
+        warmup._reset_for_tests()
+    assert first["state"] == "done" and "perforation" in first["timings"]
+    assert second == first
+    assert calls == [1]
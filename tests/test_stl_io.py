@@ -0,0 +1,60 @@
+import numpy as np
+import trimesh
+
+from backend.desolidify_engine.engine import load_mesh_any, load_mesh_bytes
+from backend.desolidify_engine.stl_io import STL_RECORD, load_binary_stl, weld_vertices, write_binary_stl
+
+
+def test_binary_stl_fast_path_matches_trimesh(tmp_path):
+    src = trimesh.creation.icosphere(subdivisions=3)
+    path = tmp_path / "sphere.stl"
+    src.export(path)
+
+    mesh = load_mesh_any(path)
+    ref = trimesh.load_mesh(str(path))
+    assert len(mesh.vertices) == len(ref.vertices)
+    assert len(mesh.faces) == len(ref.faces)
+    assert np.isclose(mesh.volume, ref.volume)
+
+    from_bytes = load_mesh_bytes(path.read_bytes())
+    assert np.array_equal(from_bytes.faces, mesh.faces)
+
+
+def test_ascii_stl_falls_back_to_trimesh():
+    ascii_stl = trimesh.creation.box().export(file_type="stl_ascii")
+    data = ascii_stl.encode() if isinstance(ascii_stl, str) else ascii_stl
+    assert load_binary_stl(data) is None
+    assert len(load_mesh_bytes(data).faces) == 12
+
+
+def test_weld_vertices_is_exact():
+    rng = np.random.default_rng(0)
+    base = rng.random((500, 3)).astype(np.float32)
+    corners = base[rng.integers(0, len(base), 6000)]
+    corners[0] = [-0.0, 0.0, 1.0]
+    corners[1] = [0.0, -0.0, 1.0]
+    verts, inverse = weld_vertices(corners)
+    assert np.array_equal(verts[inverse], corners + np.float32(0.0))
+    assert len(verts) == len(np.unique(corners + np.float32(0.0), axis=0))
+    assert inverse[0] == inverse[1]
+
+
+def test_write_binary_stl_roundtrip(tmp_path):
+    import io
+
+    src = trimesh.creation.icosphere(subdivisions=2)
+    buf = io.BytesIO()
+    n = write_binary_stl(buf, src.vertices, src.faces, chunk_faces=7)
+    data = buf.getvalue()
+    assert n == len(src.faces)
+    assert len(data) == 84 + 50 * n
+
+    ref = np.frombuffer(trimesh.exchange.stl.export_stl(src), dtype=STL_RECORD, offset=84)
+    got = np.frombuffer(data, dtype=STL_RECORD, offset=84)
+    assert np.array_equal(got["vertices"], ref["vertices"])
+    assert np.array_equal(got["normal"], ref["normal"])
+
+    no_normals = io.BytesIO()
+    write_binary_stl(no_normals, src.vertices, src.faces)
+    back = load_mesh_bytes(no_normals.getvalue())
+    assert np.allclose(back.face_normals, src.face_normals, atol=1e-5)
@@ -0,0 +1,118 @@
+import pytest
+import trimesh
+
+from backend.services import storage
+from backend.tasks import perforate
+
+
+def test_run_writes_streamed_result(app):
+    from backend.tasks.perforate import run
+
+    cup = trimesh.creation.cylinder(radius=15.0, height=12.0, sections=48)
+    with app.app_context():
+        jid = storage.new_job()
+        cup.export(storage.job_dir(jid) / "input.stl")
+        run(jid, {"voxel": 1.2, "spacing": 10.0, "radius": 2.0, "orientations": "z"})
+        st = storage.get_status(jid)
+        info = storage.read_result_info(jid)
+        out = storage.job_dir(jid) / storage.RESULT_NAME
+
+    assert st["state"] == "finished", st
+    assert info["size"] == out.stat().st_size
+    result = trimesh.load_mesh(str(out))
+    assert len(result.faces) > 0
+
+
+def test_run_records_stage_metrics(app, client):
+    from backend.services import metrics
+    from backend.tasks.perforate import run
+
+    metrics.reset()
+    cup = trimesh.creation.cylinder(radius=15.0, height=12.0, sections=48)
+    with app.app_context():
+        jid = storage.new_job()
+        cup.export(storage.job_dir(jid) / "input.stl")
+        run(jid, {"voxel": 1.2, "spacing": 10.0, "radius": 2.0, "orientations": "z"})
+        m = storage.read_metrics(jid)
+
+    assert m["state"] == "finished"
+    for stage in ("load", "process", "grid_setup", "hole_fields", "signed_distance",
+                  "marching_cubes", "post_process", "export", "write"):
+        assert m["stages"][stage] >= 0.0, stage
+    assert m["grid"]["points"] == m["grid"]["nx"] * m["grid"]["ny"] * m["grid"]["nz"]
+    assert m["triangles_out"] > 0
+
+    r = client.get(f"/api/jobs/{jid}/metrics")
+    assert r.status_code == 200 and r.get_json()["stages"] == m["stages"]
+
+    text = client.get("/api/metrics").get_data(as_text=True)
+    assert 'desolidify_stage_seconds_count{stage="signed_distance"} 1' in text
+    assert 'desolidify_jobs_total{state="finished"} 1' in text
+    assert "desolidify_queue_depth 0" in text
+
+
+def test_progress_callback_reports_moving_eta(monkeypatch):
+    calls = []
+    monkeypatch.setattr(perforate, "_set_progress", lambda jid, f, eta_seconds=None, phase=None: calls.append((f, eta_seconds)))
+    now = [0.0]
+    cb = perforate._progress_cb("j", clock=lambda: now[0])
+    for k in range(1, 5):
+        now[0] += 2.0  # 2 s per 10 % slice
+        cb(k / 10)
+    assert calls[-1][0] == 0.4
+    assert calls[-1][1] == pytest.approx(12.0)
+
+
+def test_phase_progress_weights_and_order():
+    from backend.services.progress import PhaseProgress
+
+    calls = []
+    weights = {"load": 0.1, "sampling": 0.5, "marching_cubes": 0.1,
+               "post_process": 0.1, "export": 0.1, "thumbnail": 0.1}
+    phases = PhaseProgress(lambda f, p: calls.append((round(f, 6), p)), weights=weights)
+    phases.enter("load")
+    phases.update("sampling", 0.5)
+    assert calls[-1] == (0.35, "sampling")
+    phases.update("post_process", 0.5)
+    assert calls[-1] == (0.75, "post_process")
+    # An earlier phase cannot pull progress back
+    phases.update("sampling", 1.0)
+    assert calls[-1] == (0.75, "post_process")
+
+    phases = PhaseProgress(lambda f, p: calls.append((round(f, 6), p)), weights=weights)
+    phases.merge("marching_cubes", into="sampling")
+    phases.update("sampling", 1.0)
+    assert calls[-1] == (0.7, "sampling")
+
+
+def test_run_reports_phases(app, monkeypatch):
+    from backend.tasks.perforate import run
+
+    seen = []
+    monkeypatch.setattr(perforate, "_set_progress",
+                        lambda jid, f, eta_seconds=None, phase=None: seen.append((f, phase)))
+    cup = trimesh.creation.cylinder(radius=15.0, height=12.0, sections=48)
+    with app.app_context():
+        jid = storage.new_job()
+        cup.export(storage.job_dir(jid) / "input.stl")
+        run(jid, {"voxel": 1.2, "spacing": 10.0, "radius": 2.0, "orientations": "z"})
+
+    order = []
+    for _, phase in seen:
+        if phase and (not order or order[-1] != phase):
+            order.append(phase)
+    assert order == ["load", "sampling", "marching_cubes", "post_process", "export", "thumbnail"]
+    fracs = [f for f, _ in seen]
+    assert fracs == sorted(fracs)
+    # Sampling no longer reaches 100 %: later phases keep their share
+    assert max(f for f, p in seen if p == "sampling") < 0.95
+
+
+def test_set_progress_writes_phase(app):
+    from backend.services.progress import set_progress
+
+    with app.app_context():
+        jid = storage.new_job()
+        set_progress(jid, 0.5, phase="export")
+        st = storage.get_status(jid)
+    assert st["phase"] == "export" and st["message"] == "Writing STL"
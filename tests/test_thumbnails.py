@@ -0,0 +1,89 @@
+from backend.services import storage
+
+
+def test_thumbnail_pending_then_served(app, client):
+    with app.app_context():
+        jid = storage.new_job()
+    assert client.get(f"/api/jobs/{jid}/thumbnail").status_code == 202
+    assert client.get("/api/jobs/nope/thumbnail").status_code == 404
+
+    png = b"\x89PNG\r\n\x1a\n" + b"0" * 32
+    with app.app_context():
+        storage.write_result(jid, b"stl")
+        storage.write_thumbnail(jid, png)
+    r = client.get(f"/api/jobs/{jid}/thumbnail")
+    assert r.status_code == 200
+    assert r.mimetype == "image/png"
+    assert r.data == png
+    assert client.get(f"/api/jobs/{jid}/thumbnail", headers={"If-None-Match": r.headers["ETag"]}).status_code == 304
+
+
+def test_numpy_backend_renders_mesh(app, monkeypatch):
+    import io
+
+    import numpy as np
+    import trimesh
+    from PIL import Image
+
+    from backend.services import previewer, softrender
+
+    mesh = trimesh.creation.annulus(r_min=10, r_max=14, height=20, sections=64)
+    app.config["PREVIEW_BACKEND"] = "numpy"
+    with app.app_context():
+        png = previewer.mesh_to_png_bytes(mesh, size=(160, 120))
+    img = np.asarray(Image.open(io.BytesIO(png)))
+    assert img.shape == (120, 160, 4)
+    covered = img[..., 3] == 255
+    assert 0.05 < covered.mean() < 0.6
+    # Shaded, not flat: lit and shadowed sides differ
+    assert np.ptp(img[covered][:, 0]) > 40
+
+    # The stdlib encoder round-trips through a real PNG decoder
+    rgba = softrender.render_mesh_rgba(mesh.vertices, mesh.faces, (64, 48),
+                                       eye=mesh.centroid + 30.0, target=mesh.centroid)
+    monkeypatch.setattr(softrender, "Image", None)
+    raw = softrender.encode_png(rgba)
+    assert (np.asarray(Image.open(io.BytesIO(raw))) == rgba).all()
+
+
+def test_on_request_render_releases_renderers(app, client, monkeypatch):
+    import trimesh
+
+    from backend.services import previewer
+
+    released = []
+    monkeypatch.setattr(previewer, "release_renderers", lambda: released.append(True))
+    app.config["PREVIEW_BACKEND"] = "numpy"
+    with app.app_context():
+        jid = storage.new_job()
+        storage.write_result(jid, trimesh.creation.box(extents=(10, 10, 10)).export(file_type="stl"))
+    r = client.get(f"/api/jobs/{jid}/thumbnail")
+    assert r.status_code == 200 and r.mimetype == "image/png"
+    assert released == [True]
+
+
+def test_render_error_falls_back_without_disabling_gl(app, monkeypatch):
+    import threading
+    from unittest import mock
+
+    import trimesh
+
+    from backend.services import previewer
+
+    fake = mock.MagicMock()
+    fake.OffscreenRenderer.return_value.render.side_effect = RuntimeError("bad mesh")
+    monkeypatch.setattr(previewer, "pyrender", fake)
+    monkeypatch.setattr(previewer, "Image", mock.MagicMock())
+    monkeypatch.setattr(previewer, "_gl_broken", False)
+    monkeypatch.setattr(previewer, "_pool", threading.local())
+    app.config["PREVIEW_BACKEND"] = "auto"
+    mesh = trimesh.creation.box(extents=(10, 10, 10))
+
+    with app.app_context():
+        # A per-render failure falls back for that call only
+        assert previewer.mesh_to_png_bytes(mesh, size=(32, 24)).startswith(b"\x89PNG")
+        assert previewer._gl_broken is False
+        # Failing to create the GL context disables pyrender for the process
+        fake.OffscreenRenderer.side_effect = RuntimeError("no display")
+        assert previewer.mesh_to_png_bytes(mesh, size=(32, 24)).startswith(b"\x89PNG")
+        assert previewer._gl_broken is True
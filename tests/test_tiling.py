@@ -0,0 +1,120 @@
+import os
+import time
+
+import trimesh
+from scipy.spatial import cKDTree
+
+from backend.desolidify_engine import tiling
+from backend.desolidify_engine.accuracy import topology
+from backend.desolidify_engine.engine import perforate_mesh_sdf
+from backend.desolidify_engine.settings import Settings
+from backend.services import storage
+
+TRAY = dict(extents=(40.3, 30.7, 5.3))  # faces off the sample planes (no exact zeros)
+
+
+def _settings(**kw):
+    return Settings(**{"voxel": 1.0, "spacing": 8.0, "radius": 2.0, "orientations": "xyz",
+                       "mem_retry": False, **kw})
+
+
+def test_plan_tiles_bounds_points_and_shares_seams():
+    mesh = trimesh.creation.box(**TRAY)
+    tiles = tiling.plan_tiles(mesh, _settings(), 8_000)
+    assert len(tiles) > 1
+    nz = 9  # 5 mm part + 2 × 2 mm padding at 1 mm
+    assert max(t.points(nz) for t in tiles) <= 8_000 * 1.5
+    xs = sorted({(t.i0, t.i1) for t in tiles})
+    assert xs[0][0] == 0
+    for (a0, a1), (b0, b1) in zip(xs, xs[1:]):
+        assert b0 == a1 - 1  # one shared sample column
+    assert tiling.plan_tiles(mesh, _settings(), 10 ** 9) == [tiling.Tile(0, 0, xs[-1][1], 0, tiles[-1].j1)]
+
+
+def test_tiled_surface_matches_single_grid():
+    mesh = trimesh.creation.box(**TRAY)
+    ref = perforate_mesh_sdf(mesh, _settings())
+    out = tiling.perforate_tiled(mesh, _settings(), 8_000)
+
+    assert topology(out) == topology(ref)
+    d_out, _ = cKDTree(ref.vertices).query(out.vertices)
+    d_ref, _ = cKDTree(out.vertices).query(ref.vertices)
+    assert max(d_out.max(), d_ref.max()) < 1e-4
+    # Face counts may differ by a few near-zero-area slivers (float rounding decides
+    # which coincident vertices merge); the surface itself is the same
+    assert abs(out.area - ref.area) < 1e-6 * ref.area
+
+
+def test_board_claims_leases_and_stitches(tmp_path):
+    mesh = trimesh.creation.box(**TRAY)
+    src = tmp_path / "input.stl"
+    mesh.export(src)
+    s = _settings()
+    tiles = tiling.plan_tiles(mesh, s, 8_000)
+    board = tiling.TileBoard.create(tmp_path / "tiles", src, s, tiles)
+
+    # Another worker holds tile 0 with a fresh heartbeat, tile 1 with a stale one
+    assert board.try_claim(0, "other", lease_s=60)
+    assert board.try_claim(1, "other", lease_s=60)
+    old = time.time() - 600
+    os.utime(board.root / "1.claim", (old, old))
+
+    done = tiling.TileBoard(board.root).work("me", lease_s=60)
+    assert done == len(tiles) - 1
+    assert not board.done() and 0 not in board.finished()
+
+    board.release(0)
+    assert board.work("me", lease_s=60) == 1
+    assert board.done()
+    assert topology(board.stitch()) == topology(tiling.perforate_tiled(mesh, s, 8_000))
+
+
+def test_task_runs_tiled_job(app, monkeypatch):
+    from backend.tasks import perforate
+    from backend.tasks.perforate import run
+
+    fracs = []
+    monkeypatch.setattr(perforate, "_set_progress",
+                        lambda jid, f, eta_seconds=None, phase=None: fracs.append(f))
+    app.config["TILE_MAX_POINTS"] = 8_000
+    with app.app_context():
+        jid = storage.new_job()
+        trimesh.creation.box(**TRAY).export(storage.job_dir(jid) / "input.stl")
+        run(jid, {"voxel": 1.0, "spacing": 8.0, "radius": 2.0, "orientations": "xyz"})
+        st = storage.get_status(jid)
+        m = storage.read_metrics(jid)
+        tiles_left = (storage.job_dir(jid) / tiling.TILE_DIRNAME).exists()
+
+    assert st["state"] == "finished", st
+    assert m["tiles"] > 1 and m["tiles_local"] == m["tiles"]
+    assert "grid" not in m and m["tile_grid"]["points"] <= 8_000 * 1.5
+    assert not tiles_left
+    # Per-tile marching cubes must not pull overall progress back
+    assert fracs == sorted(fracs)
+
+
+def test_board_heartbeats_through_non_sliced_stages(tmp_path, monkeypatch):
+    mesh = trimesh.creation.box(**TRAY)
+    src = tmp_path / "input.stl"
+    mesh.export(src)
+    s = _settings()
+    board = tiling.TileBoard.create(tmp_path / "tiles", src, s, tiling.plan_tiles(mesh, s, 10 ** 9))
+
+    beats = []
+
+    def fake_tile(mesh, s, tile, progress, recorder):
+        # No per-slice callback at all: only stage events and sub-step reports
+        for name in ("sdf_3d", "marching_cubes"):
+            with recorder.stage(name):
+                recorder.report(name, 0.5)
+        return mesh
+
+    monkeypatch.setattr(tiling, "run_tile", fake_tile)
+    monkeypatch.setattr(tiling, "_HEARTBEAT_S", -1.0)  # beat on every chance
+    monkeypatch.setattr(board, "heartbeat", lambda k: beats.append(k))
+    rec = tiling.StageRecorder()
+    assert board.work("me", lease_s=60, recorder=rec) == 1
+
+    # Load, start, report and end of both stages, then once more before the write
+    assert beats == [0] * 8
+    assert not rec._listeners and not rec._progress_listeners